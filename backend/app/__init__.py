@@ -1,10 +1,12 @@
-from flask import Flask
-from flask_socketio import SocketIO
-from .routes import main_bp
-from .admin import admin_bp
-from .websocket import register_socketio_events
-
 def create_app():
+    # Imported here so that `import app.main` (FastAPI) does not load Flask, flask_socketio
+    # and the admin blueprint's pandas
+    from flask import Flask
+    from flask_socketio import SocketIO
+    from .routes import main_bp
+    from .admin import admin_bp
+    from .websocket import register_socketio_events
+    
     app = Flask(__name__)
     app.config['SECRET_KEY'] = 'your-secret-key-here'
     
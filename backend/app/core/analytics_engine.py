@@ -1,4 +1,4 @@
-import numpy as np
+import random
 from typing import Dict, List
 
 class AnalyticsEngine:
@@ -7,14 +7,14 @@ class AnalyticsEngine:
     async def get_predictions(self) -> Dict[str, any]:
         """Generate basic prediction data"""
         # Sample predictive analytics
-        next_week_forecast = np.random.uniform(80, 90)
-        confidence = np.random.uniform(70, 100)
+        next_week_forecast = random.uniform(80, 90)
+        confidence = random.uniform(70, 100)
         
         # Generate sample factors
         factors = {
-            'historical_trend': np.random.uniform(0, 1),
-            'external_factors': np.random.uniform(0, 1),
-            'engagement_levels': np.random.uniform(0, 1)
+            'historical_trend': random.uniform(0, 1),
+            'external_factors': random.uniform(0, 1),
+            'engagement_levels': random.uniform(0, 1)
         }
         
         recommendations = [
@@ -0,0 +1,248 @@
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Pre-aggregated attendance counts for ad-hoc analytics.
+#
+# The cube holds, for every date, one cell per combination of
+#
+#     office x department x title x manager x status
+#
+# that occurs, with the number of records and their summed meeting minutes
+# and engagement scores. Any group-by over these dimensions (plus date and
+# month), with filters and a date range, is then answered by adding cells up.
+# Each (group-by, filters) combination also keeps its per-date rollups, so a
+# repeated query, over any date range, costs dates x groups.
+#
+# Office, department, title and manager come from the employee directory, so
+# a directory change rebuilds the cube; attendance changes only recompute the
+# changed dates (with_dates). Like the status index, a published cube's cells
+# are never mutated: updates return a new cube sharing the unchanged dates'
+# cells and rollups.
+
+DIMENSIONS = ('office', 'department', 'title', 'manager', 'status')
+GROUP_BY = ('date', 'month') + DIMENSIONS
+STATUSES = ('Present', 'Partial', 'Absent')
+MAX_GROUP_ROWS = 5000
+# (group-by, filters) combinations whose per-date rollups a cube keeps
+CUBE_ROLLUPS = int(os.getenv('CUBE_ROLLUPS', '32'))
+
+# Position of each dimension in a cell key
+_KEY_INDEX = {name: position for position, name in enumerate(DIMENSIONS)}
+_STATUS_INDEX = {status: position for position, status in enumerate(STATUSES)}
+
+
+def _number(value):
+    # Whole minutes and scores stay ints: small ones are shared objects
+    if type(value) in (int, float):
+        return value
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def aggregate_date(date_data: Dict[str, Any], employee_data: Dict[str, Any],
+                   keys: Optional[Dict[Tuple, Tuple]] = None) -> Dict[Tuple, Tuple]:
+    """
+    Cells of one date: dimension key -> (records, minutes, engagement).
+    
+    keys maps each dimension key to one shared tuple; the same keys recur
+    on every date, so sharing them keeps the cube a fraction of the history.
+    """
+    if keys is None:
+        keys = {}
+    cells: Dict[Tuple, List] = {}
+    for email, record in date_data.items():
+        if not isinstance(record, dict):
+            continue
+        employee = employee_data.get(email) or {}
+        key = (
+            employee.get('office') or record.get('location') or 'Unknown',
+            employee.get('department') or 'Unknown',
+            employee.get('title') or 'Unknown',
+            employee.get('manager') or 'Unknown',
+            record.get('status') or 'Unknown'
+        )
+        cell = cells.get(key)
+        if cell is None:
+            cell = cells[keys.setdefault(key, key)] = [0, 0, 0]
+        cell[0] += 1
+        cell[1] += _number(record.get('duration_minutes'))
+        cell[2] += _number(record.get('engagement_score'))
+    return {key: tuple(cell) for key, cell in cells.items()}
+
+
+class AttendanceCube:
+    """Per-date attendance cells, rollups over them and the queries"""
+
+    def __init__(self, dates: Optional[Dict[str, Dict[Tuple, Tuple]]] = None,
+                 rollups: Optional['OrderedDict[Tuple, Dict[str, Dict[Tuple, List[float]]]]'] = None,
+                 keys: Optional[Dict[Tuple, Tuple]] = None):
+        self.dates = dates or {}
+        # Shared dimension key tuples, see aggregate_date()
+        self._keys = keys if keys is not None else {}
+        self.sorted_dates = sorted(self.dates)
+        # (grouped dimensions, filters) -> date -> group -> totals, least recently used first
+        self._rollups = rollups if rollups is not None else OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, attendance_data: Dict[str, Dict[str, Any]], employee_data: Dict[str, Any]) -> 'AttendanceCube':
+        keys = {}
+        return cls({date: aggregate_date(date_data, employee_data, keys) for date, date_data in attendance_data.items()},
+                   keys=keys)
+
+    @classmethod
+    def from_cells(cls, rows: Iterable[Tuple]) -> 'AttendanceCube':
+        """Build from pre-grouped (date, *DIMENSIONS, records, minutes, engagement) rows, e.g. AttendanceStore.cube_cells()"""
+        keys = {}
+        dates: Dict[str, Dict[Tuple, Tuple]] = {}
+        for date, *key, records, minutes, engagement in rows:
+            key = tuple(key)
+            cells = dates.get(date)
+            if cells is None:
+                cells = dates[date] = {}
+            cells[keys.setdefault(key, key)] = (records, minutes or 0, engagement or 0)
+        return cls(dates, keys=keys)
+
+    def with_dates(self, updates: Dict[str, Optional[Dict[str, Any]]], employee_data: Dict[str, Any]) -> 'AttendanceCube':
+        """A copy with whole dates re-aggregated, or removed when None; other dates keep their rollups"""
+        dates = dict(self.dates)
+        for date, date_data in updates.items():
+            if date_data is None:
+                dates.pop(date, None)
+            else:
+                dates[date] = aggregate_date(date_data, employee_data, self._keys)
+        with self._lock:
+            rollups = OrderedDict(
+                (spec, {date: groups for date, groups in per_date.items() if date not in updates})
+                for spec, per_date in self._rollups.items()
+            )
+        return AttendanceCube(dates, rollups, self._keys)
+
+    @property
+    def cell_count(self) -> int:
+        return sum(len(cells) for cells in self.dates.values())
+
+    def query(self, group_by: Iterable[str] = (), filters: Optional[Dict[str, Iterable[str]]] = None,
+              start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Aggregate the cells of dates in [start, end] (inclusive, YYYY-MM-DD).
+
+        group_by lists dimensions from GROUP_BY; filters maps a dimension to the
+        values to keep. Each row holds its group values, records, the count of
+        each status, attendance_rate (Present / records) and the average
+        minutes and engagement. Raises ValueError for an unknown dimension
+        or a malformed date.
+
+        The first query of a (dimensions, filters) combination sums the cells
+        of each date once; later ones, over any date range, add up those
+        per-date rollups.
+        """
+        group_by = tuple(group_by)
+        unknown = [name for name in group_by if name not in GROUP_BY]
+        unknown += [name for name in (filters or {}) if name not in DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown dimension {', '.join(unknown)}; expected one of {', '.join(GROUP_BY)}")
+        for bound in (start, end):
+            if bound:
+                datetime.strptime(bound, '%Y-%m-%d')  # ValueError names the bad date
+
+        filter_spec = tuple(sorted((name, tuple(sorted(set(values)))) for name, values in (filters or {}).items()))
+        dimensions = tuple(name for name in group_by if name in _KEY_INDEX)
+        per_date = self._rollup(dimensions, filter_spec)
+        dates = self.sorted_dates[bisect_left(self.sorted_dates, start) if start else 0:
+                                  bisect_right(self.sorted_dates, end) if end else len(self.sorted_dates)]
+
+        # Rollup groups follow `dimensions`; date and month are added per date in group_by order
+        positions = {name: position for position, name in enumerate(dimensions)}
+        groups: Dict[Tuple, List[float]] = {}
+        key_groups: Dict[Tuple, Optional[Tuple]] = {}
+        scanned = 0
+        for date in dates:
+            date_groups = per_date.get(date)
+            if date_groups is None:
+                date_groups = self._rollup_date(date, dimensions, filter_spec, key_groups)
+                per_date[date] = date_groups
+                scanned += len(self.dates[date])
+            for group, totals in date_groups.items():
+                key = tuple(date if name == 'date' else date[:7] if name == 'month' else group[positions[name]]
+                            for name in group_by)
+                merged = groups.get(key)
+                if merged is None:
+                    groups[key] = list(totals)
+                else:
+                    for position, value in enumerate(totals):
+                        merged[position] += value
+
+        rows = []
+        for group, (records, minutes, engagement, present, partial, absent) in sorted(groups.items()):
+            row = dict(zip(group_by, group))
+            row.update({
+                'records': records,
+                'present': present,
+                'partial': partial,
+                'absent': absent,
+                'attendance_rate': round(present / records * 100, 1) if records else 0,
+                'avg_duration_minutes': round(minutes / records, 1) if records else 0,
+                'avg_engagement': round(engagement / records, 1) if records else 0
+            })
+            rows.append(row)
+
+        return {
+            'group_by': list(group_by),
+            'filters': {name: list(values) for name, values in filter_spec},
+            'start': dates[0] if dates else start,
+            'end': dates[-1] if dates else end,
+            'dates': len(dates),
+            'cells_scanned': scanned,
+            'truncated': len(rows) > MAX_GROUP_ROWS,
+            'rows': rows[:MAX_GROUP_ROWS]
+        }
+
+    def _rollup(self, dimensions: Tuple[str, ...], filter_spec: Tuple) -> Dict[str, Dict[Tuple, List[float]]]:
+        """Per-date rollups of one (dimensions, filters) combination, kept for the CUBE_ROLLUPS latest ones"""
+        spec = (dimensions, filter_spec)
+        with self._lock:
+            per_date = self._rollups.get(spec)
+            if per_date is None:
+                per_date = self._rollups[spec] = {}
+                while len(self._rollups) > CUBE_ROLLUPS:
+                    self._rollups.popitem(last=False)
+            self._rollups.move_to_end(spec)
+        return per_date
+
+    def _rollup_date(self, date: str, dimensions: Tuple[str, ...], filter_spec: Tuple,
+                     key_groups: Dict[Tuple, Optional[Tuple]]) -> Dict[Tuple, List[float]]:
+        """
+        One date's cells summed by dimensions, after the filters: group -> totals.
+        
+        key_groups memoizes each cell key's group (None when filtered out);
+        the same keys recur on every date, so a query shares it across dates.
+        """
+        group_positions = [_KEY_INDEX[name] for name in dimensions]
+        cell_filters = [(_KEY_INDEX[name], set(values)) for name, values in filter_spec]
+        groups: Dict[Tuple, List[float]] = {}
+        for key, (records, minutes, engagement) in self.dates[date].items():
+            if key in key_groups:
+                group = key_groups[key]
+            elif cell_filters and not all(key[position] in values for position, values in cell_filters):
+                group = key_groups[key] = None
+            else:
+                group = key_groups[key] = tuple(key[position] for position in group_positions)
+            if group is None:
+                continue
+            totals = groups.get(group)
+            if totals is None:
+                totals = groups[group] = [0, 0.0, 0.0, 0, 0, 0]
+            totals[0] += records
+            totals[1] += minutes
+            totals[2] += engagement
+            status = _STATUS_INDEX.get(key[4])
+            if status is not None:
+                totals[3 + status] += records
+        return groups
@@ -0,0 +1,116 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+# Raw attendance exports, streamed.
+#
+# Every stage is a generator: the processor yields (date, email, record)
+# one record at a time (row by row from SQLite under SQLite storage), rows
+# are formatted into CSV or NDJSON and buffered only up to CHUNK_BYTES, and
+# the optional gzip stage compresses each chunk as it passes. A multi-year
+# export of every employee therefore holds one chunk and one record in
+# memory, never the whole response.
+
+EXPORT_FIELDS = ('date', 'email', 'name', 'status', 'duration_minutes', 'engagement_score', 'location',
+                 'office', 'department', 'title', 'manager')
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson'
+}
+# Bytes of formatted rows gathered before a chunk is handed to the server
+CHUNK_BYTES = 64 * 1024
+
+
+def validate_range(start: Optional[str], end: Optional[str]):
+    """Raise ValueError for a malformed start or end date (YYYY-MM-DD)"""
+    for bound in (start, end):
+        if bound:
+            datetime.strptime(bound, '%Y-%m-%d')  # ValueError names the bad date
+
+
+def export_rows(records: Iterable[Tuple[str, str, Dict[str, Any]]], employee_data: Dict[str, Dict[str, Any]],
+                offices: Optional[Iterable[str]] = None, managers: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Flat export rows of (date, email, record) triples, joined to the directory.
+
+    Office falls back to the record's location, as in the cube. offices
+    and managers keep only rows matching one of the given values.
+    """
+    offices = set(offices) if offices else None
+    managers = set(managers) if managers else None
+    for date, email, record in records:
+        if not isinstance(record, dict):
+            continue
+        employee = employee_data.get(email) or {}
+        office = employee.get('office') or record.get('location') or 'Unknown'
+        manager = employee.get('manager') or 'Unknown'
+        if (offices is not None and office not in offices) or (managers is not None and manager not in managers):
+            continue
+        yield {
+            'date': date,
+            'email': email,
+            'name': record.get('name') or employee.get('name'),
+            'status': record.get('status') or 'Absent',
+            'duration_minutes': record.get('duration_minutes', record.get('duration')),
+            'engagement_score': record.get('engagement_score'),
+            'location': record.get('location'),
+            'office': office,
+            'department': employee.get('department') or 'Unknown',
+            'title': employee.get('title') or 'Unknown',
+            'manager': manager
+        }
+
+
+def csv_chunks(rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """CSV with a header row, in chunks of about CHUNK_BYTES"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def ndjson_chunks(rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """One JSON object per line, in chunks of about CHUNK_BYTES"""
+    lines = []
+    size = 0
+    for row in rows:
+        line = json.dumps(row, ensure_ascii=False, separators=(',', ':'))
+        lines.append(line)
+        size += len(line) + 1
+        if size >= CHUNK_BYTES:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+            lines, size = [], 0
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip-compress a chunk stream on the fly (a complete gzip member, for Content-Encoding: gzip)"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Whether an Accept-Encoding header allows gzip (and does not give it q=0)"""
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if coding.strip().lower() in ('gzip', '*'):
+            return params.replace(' ', '').lower() not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+
+def export_filename(fmt: str, start: Optional[str], end: Optional[str]) -> str:
+    return f"attendance-{start or 'first'}-to-{end or 'latest'}.{fmt}"
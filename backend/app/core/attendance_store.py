@@ -0,0 +1,474 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .history_delta import date_hash
+
+# Attendance kinds kept side by side in the same tables
+REGULAR = 'regular'
+RM = 'rm'
+
+# Dates written per transaction by import_dates()
+IMPORT_BATCH_DATES = 20
+# Directory snapshots kept after a new one is saved
+DIRECTORY_SNAPSHOTS = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    kind TEXT NOT NULL,
+    date TEXT NOT NULL,
+    total_count INTEGER NOT NULL,
+    present_count INTEGER NOT NULL,
+    partial_count INTEGER NOT NULL,
+    absent_count INTEGER NOT NULL,
+    source_hash TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (kind, date)
+);
+
+CREATE TABLE IF NOT EXISTS attendance (
+    kind TEXT NOT NULL,
+    date TEXT NOT NULL,
+    email TEXT NOT NULL,
+    name TEXT,
+    status TEXT,
+    duration_minutes NUMERIC,
+    engagement_score NUMERIC,
+    location TEXT,
+    record TEXT NOT NULL,
+    UNIQUE (kind, date, email)
+);
+CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance (date);
+CREATE INDEX IF NOT EXISTS idx_attendance_email_date ON attendance (email, date);
+
+CREATE TABLE IF NOT EXISTS employee_months (
+    kind TEXT NOT NULL,
+    month TEXT NOT NULL,
+    email TEXT NOT NULL,
+    recorded INTEGER NOT NULL,
+    present INTEGER NOT NULL,
+    absent INTEGER NOT NULL,
+    last_present TEXT,
+    first_seen TEXT NOT NULL,
+    PRIMARY KEY (kind, month, email)
+);
+
+CREATE TABLE IF NOT EXISTS directory_snapshots (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    source TEXT,
+    content_hash TEXT NOT NULL,
+    employees INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS directory (
+    snapshot_id INTEGER NOT NULL REFERENCES directory_snapshots (id),
+    email TEXT NOT NULL,
+    name TEXT,
+    title TEXT,
+    department TEXT,
+    office TEXT,
+    manager TEXT,
+    PRIMARY KEY (snapshot_id, email)
+);
+CREATE INDEX IF NOT EXISTS idx_directory_manager ON directory (snapshot_id, manager);
+
+CREATE TABLE IF NOT EXISTS sources (
+    name TEXT PRIMARY KEY,
+    signature TEXT NOT NULL,
+    imported_at REAL NOT NULL
+);
+"""
+
+_DIRECTORY_FIELDS = ('name', 'title', 'department', 'office', 'manager')
+
+
+def _number(value):
+    # Same coercion as the cube, so SQL sums match the in-memory ones
+    if type(value) in (int, float):
+        return value
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class AttendanceStore:
+    """
+    SQLite storage for attendance history, RM attendance and the directory.
+
+    One ``attendance`` row per (kind, date, email) carries the columns the
+    dashboard filters and aggregates on plus the full record as JSON, and
+    one ``meetings`` row per date carries its summary counts, so the history
+    chart never reads the records. Writes replace whole dates inside one
+    transaction, which makes an upload cost the rows of the dates it
+    touches, not the size of the history. Readers push their work down:
+    per-date summaries, the status stream behind the at-risk index, the
+    cube's grouped counts and a manager's reports are all single queries
+    through the (date), (email, date) and (snapshot, manager) indexes.
+
+    ``meetings.source_hash`` is the content hash of the date in the JSON
+    history it was last imported from. Importing compares hashes, so a
+    sync that changed one date writes one date, and a date changed by an
+    upload is not overwritten until the JSON source itself changes again.
+
+    ``employee_months`` holds each employee's status totals per month,
+    recomputed for the months a write touches. Summing them gives the
+    whole-history totals behind the at-risk list without reading the
+    records of months that are not resident.
+
+    ``sources`` remembers the stat signature of each JSON source at its
+    last import, so a restart with unchanged files skips hashing them.
+
+    The directory is kept as snapshots: a new one is written only when its
+    content changes, and the last DIRECTORY_SNAPSHOTS are kept.
+
+    Connections are opened per operation, as in SyncMetricsStore. The
+    database uses WAL so readers in other workers never wait for a writer;
+    set ``SQLITE_JOURNAL_MODE=DELETE`` when it sits on a filesystem without
+    shared memory support, such as a Docker bind mount on macOS.
+    """
+
+    def __init__(self, path, journal_mode: Optional[str] = None):
+        self.path = Path(path)
+        self.journal_mode = (journal_mode or os.getenv('SQLITE_JOURNAL_MODE', 'WAL')).upper()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        conn.execute("PRAGMA synchronous = NORMAL")
+        if not self._initialized:
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+            conn.executescript(_SCHEMA)
+            self._backfill_employee_months(conn)
+            self._initialized = True
+        return conn
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    # ==== WRITING ====
+
+    def upsert_dates(self, kind: str, updates: Dict[str, Optional[Dict[str, Any]]],
+                     source_hashes: Optional[Dict[str, str]] = None) -> int:
+        """
+        Replace whole dates (or remove them, when None) in one transaction.
+
+        ``source_hashes`` records which JSON content a date was imported
+        from; dates written without one (uploads) keep their previous hash.
+        Returns the number of attendance rows written.
+        """
+        source_hashes = source_hashes or {}
+        written = 0
+        with closing(self._connect()) as conn, conn:
+            for date, records in updates.items():
+                written += self._write_date(conn, kind, date, records, source_hashes.get(date))
+            self._refresh_months(conn, kind, {date[:7] for date in updates})
+        return written
+
+    def import_dates(self, kind: str, hashes: Dict[str, str],
+                     load: Callable[[Iterable[str]], Iterator[Tuple[str, Dict[str, Any]]]]) -> List[str]:
+        """
+        Bring the store in line with a JSON source, writing only what changed.
+
+        ``hashes`` holds the source's per-date content hashes and ``load``
+        yields (date, records) for the requested dates. Dates whose hash
+        differs from the stored source hash are rewritten, IMPORT_BATCH_DATES
+        per transaction; dates imported earlier and since removed from the
+        source are deleted. Dates that only ever came from uploads are kept.
+        Returns the changed dates.
+        """
+        stored = self.source_hashes(kind)
+        changed = [date for date, digest in hashes.items() if stored.get(date) != digest]
+        removed = [date for date, digest in stored.items() if digest is not None and date not in hashes]
+
+        batch: Dict[str, Optional[Dict[str, Any]]] = dict.fromkeys(removed)
+        if changed:
+            for date, records in load(changed):
+                batch[date] = records
+                if len(batch) >= IMPORT_BATCH_DATES:
+                    self.upsert_dates(kind, batch, hashes)
+                    batch = {}
+        if batch:
+            self.upsert_dates(kind, batch, hashes)
+        return changed + removed
+
+    def set_source_signature(self, name: str, signature: str):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("INSERT OR REPLACE INTO sources (name, signature, imported_at) VALUES (?, ?, ?)",
+                         (name, signature, time.time()))
+
+    def apply_source_changes(self, kind: str, updates: Dict[str, Optional[Dict[str, Any]]]) -> List[str]:
+        """
+        Apply dates changed in the JSON source (None removes one), skipping
+        those the store already holds at that content. Every worker applies
+        the same sync delta; only the first one writes. Returns the dates written.
+        """
+        stored = self.source_hashes(kind)
+        hashes = {date: date_hash(records) for date, records in updates.items() if records is not None}
+        pending = {date: records for date, records in updates.items()
+                   if (stored.get(date) != hashes[date] if records is not None else date in stored)}
+        if pending:
+            self.upsert_dates(kind, pending, hashes)
+        return list(pending)
+
+    def _write_date(self, conn: sqlite3.Connection, kind: str, date: str,
+                    records: Optional[Dict[str, Any]], source_hash: Optional[str]) -> int:
+        conn.execute("DELETE FROM attendance WHERE kind = ? AND date = ?", (kind, date))
+        if records is None:
+            conn.execute("DELETE FROM meetings WHERE kind = ? AND date = ?", (kind, date))
+            return 0
+
+        rows = []
+        counts = {'Present': 0, 'Partial': 0, 'Absent': 0}
+        for email, record in records.items():
+            if not isinstance(record, dict):
+                continue
+            status = record.get('status')
+            if status in counts:
+                counts[status] += 1
+            rows.append((kind, date, email, record.get('name'), status,
+                         _number(record.get('duration_minutes')), _number(record.get('engagement_score')),
+                         record.get('location'), json.dumps(record, ensure_ascii=False, separators=(',', ':'))))
+        conn.executemany(
+            "INSERT INTO attendance (kind, date, email, name, status, duration_minutes, engagement_score, location, record)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        conn.execute(
+            """
+            INSERT INTO meetings (kind, date, total_count, present_count, partial_count, absent_count, source_hash, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (kind, date) DO UPDATE SET
+                total_count = excluded.total_count,
+                present_count = excluded.present_count,
+                partial_count = excluded.partial_count,
+                absent_count = excluded.absent_count,
+                source_hash = COALESCE(excluded.source_hash, meetings.source_hash),
+                updated_at = excluded.updated_at
+            """,
+            (kind, date, len(records), counts['Present'], counts['Partial'], counts['Absent'], source_hash, time.time())
+        )
+        return len(rows)
+
+    @staticmethod
+    def _refresh_months(conn: sqlite3.Connection, kind: str, months: Iterable[str]):
+        """Recompute employee_months for whole months; records without a status count as Absent"""
+        for month in months:
+            conn.execute("DELETE FROM employee_months WHERE kind = ? AND month = ?", (kind, month))
+            conn.execute(
+                """
+                INSERT INTO employee_months (kind, month, email, recorded, present, absent, last_present, first_seen)
+                SELECT ?, ?, email, COUNT(*),
+                       SUM(COALESCE(status, 'Absent') = 'Present'),
+                       SUM(COALESCE(status, 'Absent') = 'Absent'),
+                       MAX(CASE WHEN status = 'Present' THEN date END),
+                       MIN(date || ' ' || printf('%012d', rowid))
+                FROM attendance
+                WHERE kind = ? AND date >= ? AND date < ?
+                GROUP BY email
+                """,
+                (kind, month, kind, f"{month}-01", f"{month}-32")
+            )
+
+    def _backfill_employee_months(self, conn: sqlite3.Connection):
+        """Fill employee_months for a database written before the table existed"""
+        if conn.execute("SELECT 1 FROM employee_months LIMIT 1").fetchone() is not None:
+            return
+        months = conn.execute("SELECT DISTINCT kind, substr(date, 1, 7) FROM meetings").fetchall()
+        with conn:
+            for kind, month in months:
+                self._refresh_months(conn, kind, [month])
+
+    def save_directory(self, employee_data: Dict[str, Dict[str, Any]], source: Optional[str] = None) -> int:
+        """Snapshot the directory unless the latest snapshot already matches; returns the snapshot id"""
+        digest = hashlib.sha256(
+            json.dumps(employee_data, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        ).hexdigest()
+        with closing(self._connect()) as conn, conn:
+            latest = conn.execute(
+                "SELECT id, content_hash FROM directory_snapshots ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+            if latest and latest[1] == digest:
+                return latest[0]
+
+            snapshot_id = conn.execute(
+                "INSERT INTO directory_snapshots (created_at, source, content_hash, employees) VALUES (?, ?, ?, ?)",
+                (time.time(), source, digest, len(employee_data))
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO directory (snapshot_id, email, name, title, department, office, manager)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((snapshot_id, email) + tuple(info.get(field) for field in _DIRECTORY_FIELDS)
+                 for email, info in employee_data.items())
+            )
+            stale = "SELECT id FROM directory_snapshots ORDER BY id DESC LIMIT -1 OFFSET ?"
+            conn.execute(f"DELETE FROM directory WHERE snapshot_id IN ({stale})", (DIRECTORY_SNAPSHOTS,))
+            conn.execute(f"DELETE FROM directory_snapshots WHERE id IN ({stale})", (DIRECTORY_SNAPSHOTS,))
+        return snapshot_id
+
+    # ==== READING ====
+
+    def source_signature(self, name: str) -> Optional[str]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT signature FROM sources WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def source_hashes(self, kind: str) -> Dict[str, Optional[str]]:
+        with closing(self._connect()) as conn:
+            return dict(conn.execute("SELECT date, source_hash FROM meetings WHERE kind = ?", (kind,)))
+
+    def date_versions(self, kind: str) -> Dict[str, str]:
+        """date -> a token that changes whenever the date is rewritten"""
+        with closing(self._connect()) as conn:
+            return {date: repr(updated_at) for date, updated_at in
+                    conn.execute("SELECT date, updated_at FROM meetings WHERE kind = ?", (kind,))}
+
+    def dates(self, kind: str) -> List[str]:
+        with closing(self._connect()) as conn:
+            return [row[0] for row in conn.execute("SELECT date FROM meetings WHERE kind = ? ORDER BY date", (kind,))]
+
+    def recent_dates(self, kind: str, limit: int) -> List[str]:
+        """The latest `limit` dates, oldest first"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT date FROM meetings WHERE kind = ? ORDER BY date DESC LIMIT ?",
+                                (kind, limit)).fetchall()
+        return [row[0] for row in reversed(rows)]
+
+    def load_dates(self, kind: str, dates: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Records of the given dates (all dates when None) in their original order"""
+        where = "kind = ?"
+        params: List[Any] = [kind]
+        if dates is not None:
+            dates = list(dates)
+            if not dates:
+                return {}
+            where += f" AND date IN ({', '.join('?' * len(dates))})"
+            params += dates
+
+        loaded: Dict[str, Dict[str, Any]] = {}
+        with closing(self._connect()) as conn:
+            # A meeting whose records were all removed is still a (empty) date
+            for (date,) in conn.execute(f"SELECT date FROM meetings WHERE {where} ORDER BY date", params):
+                loaded[date] = {}
+            for date, email, record in conn.execute(
+                    f"SELECT date, email, record FROM attendance WHERE {where} ORDER BY date, rowid", params):
+                loaded[date][email] = json.loads(record)
+        return loaded
+
+    def iter_records(self, kind: str, start: Optional[str] = None,
+                     end: Optional[str] = None) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """(date, email, record) of the dates in [start, end], by date in original order, streamed one row at a time"""
+        with closing(self._connect()) as conn:
+            for date, email, record in conn.execute(
+                    "SELECT date, email, record FROM attendance WHERE kind = ? AND date >= ? AND date <= ?"
+                    " ORDER BY date, rowid", (kind, start or '', end or '9999-12-31')):
+                yield date, email, json.loads(record)
+
+    def date_summaries(self, kind: str) -> Dict[str, Dict[str, Any]]:
+        """Per-date summaries in the processor's historical_data layout"""
+        summaries = {}
+        with closing(self._connect()) as conn:
+            for date, total, present, partial, absent in conn.execute(
+                    "SELECT date, total_count, present_count, partial_count, absent_count"
+                    " FROM meetings WHERE kind = ? ORDER BY date", (kind,)):
+                summaries[date] = {
+                    'attendance_rate': (present / total * 100) if total > 0 else 0,
+                    'present_count': present,
+                    'partial_count': partial,
+                    'absent_count': absent,
+                    'total_count': total
+                }
+        return summaries
+
+    def iter_statuses(self, kind: str, since: Optional[str] = None) -> Iterator[Tuple[str, str, Optional[str]]]:
+        """(date, email, status) of every record (from date or month ``since`` on), by date, streamed from the (date) index"""
+        with closing(self._connect()) as conn:
+            yield from conn.execute(
+                "SELECT date, email, status FROM attendance WHERE kind = ? AND date >= ? ORDER BY date, rowid",
+                (kind, since or '')
+            )
+
+    def email_statuses(self, kind: str, email: str, before: str) -> Iterator[Tuple[str, Optional[str]]]:
+        """(date, status) of one employee's records dated before ``before``, from the (email, date) index"""
+        with closing(self._connect()) as conn:
+            yield from conn.execute(
+                "SELECT date, status FROM attendance WHERE email = ? AND date < ? AND kind = ?", (email, before, kind)
+            )
+
+    def employee_totals(self, kind: str, before: str) -> Iterator[Tuple[str, int, int, int, Optional[str]]]:
+        """
+        (email, recorded, present, absent, last_present) summed over the months
+        before ``before`` (YYYY-MM), in order of each employee's first record.
+        """
+        with closing(self._connect()) as conn:
+            yield from conn.execute(
+                """
+                SELECT email, SUM(recorded), SUM(present), SUM(absent), MAX(last_present)
+                FROM employee_months
+                WHERE kind = ? AND month < ?
+                GROUP BY email
+                ORDER BY MIN(first_seen)
+                """,
+                (kind, before)
+            )
+
+    def cube_cells(self, kind: str = REGULAR) -> Iterator[Tuple]:
+        """
+        Attendance cube cells grouped in SQL against the latest directory snapshot:
+        (date, office, department, title, manager, status, records, minutes, engagement).
+        """
+        with closing(self._connect()) as conn:
+            yield from conn.execute(
+                """
+                SELECT a.date,
+                       COALESCE(NULLIF(d.office, ''), NULLIF(a.location, ''), 'Unknown') AS office,
+                       COALESCE(NULLIF(d.department, ''), 'Unknown') AS department,
+                       COALESCE(NULLIF(d.title, ''), 'Unknown') AS title,
+                       COALESCE(NULLIF(d.manager, ''), 'Unknown') AS manager,
+                       COALESCE(NULLIF(a.status, ''), 'Unknown') AS status,
+                       COUNT(*), SUM(a.duration_minutes), SUM(a.engagement_score)
+                FROM attendance a
+                LEFT JOIN directory d
+                    ON d.snapshot_id = (SELECT MAX(id) FROM directory_snapshots) AND d.email = a.email
+                WHERE a.kind = ?
+                GROUP BY a.date, office, department, title, manager, status
+                ORDER BY a.date
+                """,
+                (kind,)
+            )
+
+    def direct_reports(self, managers: Iterable[str]) -> Dict[str, List[str]]:
+        """Emails reporting to each of the given manager names in the latest directory snapshot"""
+        managers = list(managers)
+        reports: Dict[str, List[str]] = {manager: [] for manager in managers}
+        if not managers:
+            return reports
+        with closing(self._connect()) as conn:
+            for manager, email in conn.execute(
+                    "SELECT manager, email FROM directory"
+                    " WHERE snapshot_id = (SELECT MAX(id) FROM directory_snapshots)"
+                    f" AND manager IN ({', '.join('?' * len(managers))})", managers):
+                reports[manager].append(email)
+        return reports
+
+    def stats(self) -> Dict[str, Any]:
+        """Sizes for /health/ready"""
+        with closing(self._connect()) as conn:
+            dates, rows = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(total_count), 0) FROM meetings WHERE kind = ?", (REGULAR,)
+            ).fetchone()
+        return {
+            'backend': 'sqlite',
+            'path': str(self.path),
+            'journal_mode': self.journal_mode.lower(),
+            'dates': dates,
+            'rows': rows,
+            'size_bytes': self.path.stat().st_size if self.path.exists() else 0
+        }
@@ -0,0 +1,180 @@
+import base64
+import binascii
+import json
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+# Pre-sorted rows of one date's detailed attendance, for paging.
+#
+# The drilldown used to format, sort and return every attendee of a date on
+# each request. An index formats the rows once and keeps, per sort order (and
+# per status, the common filter), the sort keys and row ids in order. A page
+# is then a binary search for the cursor plus a short forward scan:
+#
+#     index.page(sort='-duration', status='Present', limit=50)
+#     index.page(sort='-duration', status='Present', limit=50, cursor=page['next_cursor'])
+#
+# Cursors are keyset cursors: the sort key of the last row returned, which
+# always ends with the email, so a page starts right after that row even if
+# rows were added or removed in between. Indexes are immutable apart from
+# the lazily built orders; the processor builds a new one when data changes.
+
+STATUS_ORDER = {'Present': 1, 'Partial': 2, 'Absent': 3}
+SORTS = ('status', 'name', 'office', 'department', 'title', 'duration', 'engagement')
+MAX_PAGE_SIZE = 1000
+
+
+def format_duration(duration_minutes) -> str:
+    """Minutes as '1h 5m' / '45m' / '0m'"""
+    if duration_minutes and duration_minutes > 0:
+        hours = int(duration_minutes // 60)
+        minutes = int(duration_minutes % 60)
+        return f"{hours}h {minutes}m" if hours > 0 else f"{minutes}m"
+    return "0m"
+
+
+def encode_cursor(key: Tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple:
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(key, list) or not key:
+        raise ValueError("Invalid cursor")
+    return tuple(key)
+
+
+class AttendeeIndex:
+    """Formatted attendee rows of one date with lazily built sort orders"""
+
+    def __init__(self, date: str, date_data: Dict[str, Any], employee_data: Dict[str, Any]):
+        self.date = date
+        self.rows: List[Dict[str, Any]] = []
+        self._minutes: List[float] = []
+        self._search: List[str] = []
+        self._orders: Dict[Tuple[str, Optional[str]], Tuple[List[Tuple], List[int]]] = {}
+
+        for email, attendance in date_data.items():
+            # Use the actual name from the data, fall back to employee directory
+            emp_info = employee_data.get(email, {})
+            row = {
+                'email': email,
+                'name': attendance.get('name', emp_info.get('name', 'Unknown')),
+                'title': emp_info.get('title', 'Unknown'),
+                'department': emp_info.get('department', 'Unknown'),
+                'office': emp_info.get('office', attendance.get('location', 'Unknown')),
+                'status': attendance.get('status', 'Unknown'),
+                'join_time': 'N/A',  # Not available in this data format
+                'leave_time': 'N/A',  # Not available in this data format
+                'duration': format_duration(attendance.get('duration_minutes', 0)),
+                'engagement_score': attendance.get('engagement_score', 0),
+                'location': attendance.get('location', 'Unknown')
+            }
+            self.rows.append(row)
+            self._minutes.append(attendance.get('duration_minutes', 0) or 0)
+            self._search.append(' '.join(str(row[field]) for field in ('name', 'email', 'title')).lower())
+
+        self.counts = {status: 0 for status in STATUS_ORDER}
+        for row in self.rows:
+            if row['status'] in self.counts:
+                self.counts[row['status']] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Whole-date totals, independent of filters and paging"""
+        total = len(self.rows)
+        present = self.counts['Present']
+        return {
+            'date': self.date,
+            'total_employees': total,
+            'present_count': present,
+            'partial_count': self.counts['Partial'],
+            'absent_count': self.counts['Absent'],
+            'attendance_rate': round((present / total * 100) if total > 0 else 0, 1)
+        }
+
+    def _sort_key(self, sort: str, row_id: int) -> Tuple:
+        row = self.rows[row_id]
+        name = str(row['name']).lower()
+        if sort == 'status':
+            key = (STATUS_ORDER.get(row['status'], 4), name)
+        elif sort == 'duration':
+            key = (float(self._minutes[row_id]), name)
+        elif sort == 'engagement':
+            key = (float(row['engagement_score'] or 0), name)
+        elif sort == 'name':
+            key = (name,)
+        else:
+            key = (str(row[sort]).lower(), name)
+        return key + (row['email'],)
+
+    def _order(self, sort: str, status: Optional[str]) -> Tuple[List[Tuple], List[int]]:
+        order = self._orders.get((sort, status))
+        if order is None:
+            row_ids = range(len(self.rows)) if status is None else \
+                [row_id for row_id, row in enumerate(self.rows) if row['status'] == status]
+            keyed = sorted((self._sort_key(sort, row_id), row_id) for row_id in row_ids)
+            order = ([key for key, _ in keyed], [row_id for _, row_id in keyed])
+            self._orders[(sort, status)] = order
+        return order
+
+    def page(self, sort: str = 'status', status: Optional[str] = None, office: Optional[str] = None,
+             department: Optional[str] = None, q: Optional[str] = None, limit: Optional[int] = None,
+             cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One page of attendees in sort order ('-name' for descending).
+
+        status, office and department match exactly (case-insensitive for the
+        last two), q is a substring of name, email or title. Without limit
+        every matching row is returned.
+        """
+        descending = sort.startswith('-')
+        field = sort.lstrip('-')
+        if field not in SORTS:
+            raise ValueError(f"Unknown sort '{sort}', expected one of {', '.join(SORTS)}")
+        if limit is not None:
+            limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+        keys, row_ids = self._order(field, status or None)
+        if cursor:
+            after = decode_cursor(cursor)
+            try:
+                start = bisect_left(keys, after) - 1 if descending else bisect_right(keys, after)
+            except TypeError:  # A cursor from a different sort order
+                raise ValueError("Cursor does not match the sort order")
+        else:
+            start = len(keys) - 1 if descending else 0
+        positions = range(start, -1, -1) if descending else range(start, len(keys))
+
+        office = office.lower() if office else None
+        department = department.lower() if department else None
+        q = q.lower() if q else None
+        rows = self.rows
+        page, last_key, has_more = [], None, False
+        for position in positions:
+            row_id = row_ids[position]
+            row = rows[row_id]
+            if office and str(row['office']).lower() != office:
+                continue
+            if department and str(row['department']).lower() != department:
+                continue
+            if q and q not in self._search[row_id]:
+                continue
+            if limit is not None and len(page) == limit:
+                has_more = True
+                break
+            page.append(row)
+            last_key = keys[position]
+
+        return {
+            'detailed_attendees': page,
+            'page': {
+                'sort': sort,
+                'limit': limit,
+                'returned': len(page),
+                'has_more': has_more,
+                'next_cursor': encode_cursor(last_key) if has_more else None
+            }
+        }
@@ -0,0 +1,214 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from itertools import count
+from typing import Any, Dict, Optional
+
+from .metrics import BROADCAST_SECONDS, STREAM_CLIENTS
+
+DELIVERY_SECONDS = BROADCAST_SECONDS.labels('websocket', 'deliver')
+FANOUT_SECONDS = BROADCAST_SECONDS.labels('websocket', 'fanout')
+
+
+class ClientConnection:
+    """
+    A single WebSocket client with its own bounded send queue.
+
+    Updates are queued as pre-serialized text and drained by a dedicated
+    writer task, so a slow browser only ever delays itself. Queued updates
+    that share a coalesce key are replaced in place, which means a client that
+    falls behind skips straight to the newest periodic snapshot instead of
+    replaying every stale one.
+    """
+
+    def __init__(self, websocket, max_queue: int, max_dropped: int, send_timeout: float):
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.max_dropped = max_dropped
+        self.send_timeout = send_timeout
+        # key -> (payload, perf_counter() when queued)
+        self.pending: "OrderedDict[Any, tuple]" = OrderedDict()
+        self.wakeup = asyncio.Event()
+        self.dropped = 0
+        self.coalesced = 0
+        self.sent = 0
+        self.closed = False
+        self.writer_task: Optional[asyncio.Task] = None
+
+    def enqueue(self, key: Any, payload: str) -> bool:
+        """Queue a serialized update; returns False once the client is too far behind"""
+        if self.closed:
+            return False
+
+        if key in self.pending:
+            # Newer snapshot supersedes the queued one, keep its queue position
+            self.pending[key] = (payload, time.perf_counter())
+            self.coalesced += 1
+        else:
+            if len(self.pending) >= self.max_queue:
+                self.pending.popitem(last=False)
+                self.dropped += 1
+                if self.dropped > self.max_dropped:
+                    return False
+            self.pending[key] = (payload, time.perf_counter())
+
+        self.wakeup.set()
+        return True
+
+    async def run_writer(self):
+        """Drain the queue to the socket until the client goes away"""
+        try:
+            while not self.closed:
+                if not self.pending:
+                    self.wakeup.clear()
+                    await self.wakeup.wait()
+                    continue
+
+                _, (payload, queued_at) = self.pending.popitem(last=False)
+                await asyncio.wait_for(self.websocket.send_text(payload), timeout=self.send_timeout)
+                self.sent += 1
+                DELIVERY_SECONDS.observe(time.perf_counter() - queued_at)
+                # A successful send means the client caught up again
+                if not self.pending:
+                    self.dropped = 0
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            # Send failures and timeouts both mean the client is gone. Close the socket as
+            # well: a browser that never sends would otherwise stay connected and go stale
+            # instead of reconnecting
+            self.closed = True
+            try:
+                await self.websocket.close(code=1013)  # Try again later
+            except Exception:
+                pass
+        finally:
+            self.closed = True
+
+
+class WebSocketBroadcaster:
+    """
+    Fan-out of dashboard updates to all connected WebSocket clients.
+
+    Each update is serialized exactly once and handed to every client's
+    bounded queue without awaiting any socket, so ``broadcast`` costs
+    O(clients) dictionary inserts regardless of how slow individual browsers
+    are. Clients that drop more than ``max_dropped`` updates in a row are
+    disconnected.
+    """
+
+    def __init__(self, max_queue: int = 16, max_dropped: int = 64, send_timeout: float = 10.0):
+        self.max_queue = max_queue
+        self.max_dropped = max_dropped
+        self.send_timeout = send_timeout
+        self.clients: Dict[Any, ClientConnection] = {}
+        self._message_ids = count()
+        self.stats = {
+            'broadcasts': 0,
+            'disconnected_slow_clients': 0,
+            'last_broadcast_ms': 0.0
+        }
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+    async def register(self, websocket) -> ClientConnection:
+        """Start a writer task for a newly accepted WebSocket"""
+        client = ClientConnection(websocket, self.max_queue, self.max_dropped, self.send_timeout)
+        client.writer_task = asyncio.create_task(client.run_writer())
+        client.writer_task.add_done_callback(lambda _: self._forget(websocket))
+        self.clients[websocket] = client
+        STREAM_CLIENTS.labels('websocket').inc()
+        return client
+
+    def _forget(self, websocket):
+        """Writer task finished: the client is gone for good"""
+        self.clients.pop(websocket, None)
+        STREAM_CLIENTS.labels('websocket').dec()
+
+    async def unregister(self, websocket):
+        """Stop the writer task of a client that disconnected"""
+        client = self.clients.pop(websocket, None)
+        if client and client.writer_task:
+            client.closed = True
+            client.writer_task.cancel()
+
+    def send(self, websocket, update_data: dict, coalesce_key: Optional[str] = None) -> bool:
+        """Queue an update for a single client"""
+        client = self.clients.get(websocket)
+        if not client:
+            return False
+        key = coalesce_key or ('msg', next(self._message_ids))
+        return client.enqueue(key, self.serialize(update_data))
+
+    def broadcast(self, update_data: dict, coalesce_key: Optional[str] = None) -> int:
+        """
+        Queue an update for every connected client.
+
+        Pass ``coalesce_key`` for snapshot-style updates (e.g. periodic data
+        pushes) where only the newest one matters to a lagging client; leave
+        it unset for discrete events that must all be delivered.
+        Returns the number of clients the update was queued for.
+        """
+        if not self.clients:
+            return 0
+
+        started = time.perf_counter()
+        payload = self.serialize(update_data)
+        key = coalesce_key or ('msg', next(self._message_ids))
+
+        queued = 0
+        lagging = []
+        for websocket, client in self.clients.items():
+            if client.enqueue(key, payload):
+                queued += 1
+            else:
+                lagging.append(websocket)
+
+        for websocket in lagging:
+            asyncio.create_task(self._disconnect_slow_client(websocket))
+
+        elapsed = time.perf_counter() - started
+        FANOUT_SECONDS.observe(elapsed)
+        self.stats['broadcasts'] += 1
+        self.stats['last_broadcast_ms'] = round(elapsed * 1000, 3)
+        return queued
+
+    async def _disconnect_slow_client(self, websocket):
+        """Drop a client that fell too far behind"""
+        self.stats['disconnected_slow_clients'] += 1
+        await self.unregister(websocket)
+        try:
+            await websocket.close(code=1013)  # Try again later
+        except Exception:
+            pass
+
+    async def close_all(self):
+        """Stop every writer task, used on shutdown"""
+        for websocket in list(self.clients):
+            await self.unregister(websocket)
+
+    @staticmethod
+    def serialize(update_data: dict) -> str:
+        """Serialize an update once for all clients"""
+        return json.dumps(update_data, default=_json_default, separators=(',', ':'))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get broadcaster statistics for health checks"""
+        return {
+            **self.stats,
+            'connected_clients': len(self.clients),
+            'queued_messages': sum(len(c.pending) for c in self.clients.values()),
+            'dropped_messages': sum(c.dropped for c in self.clients.values())
+        }
+
+
+def _json_default(value):
+    """Serialize datetimes and numpy scalars the way send_json callers expect"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
@@ -0,0 +1,196 @@
+import json
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows, where the sync daemon runs
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def locked_file(lock_path):
+    """Hold an exclusive cross-process lock on ``lock_path`` (created if missing)"""
+    with open(lock_path, 'a+b') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class ChangeBus:
+    """
+    Host-local publish/subscribe channel for data changes.
+
+    Publishers (upload handlers in any gunicorn worker, the sync script)
+    append a change entry to a small version file in the data directory under
+    an exclusive file lock. Subscribers watch the version file with a single
+    ``stat`` per poll interval and receive every entry newer than the last
+    version they applied, so a worker can reload just the files and dates
+    that changed. Only the most recent ``keep`` entries are retained; a
+    subscriber that falls further behind is told to do a full reload.
+    """
+
+    VERSION_FILE = '.data_version.json'
+    LOCK_FILE = '.data_version.lock'
+
+    def __init__(self, directory, keep: int = 50, poll_interval: float = 0.25):
+        self.directory = Path(directory)
+        self.version_path = self.directory / self.VERSION_FILE
+        self.lock_path = self.directory / self.LOCK_FILE
+        self.keep = keep
+        self.poll_interval = poll_interval
+
+        self._callback: Optional[Callable[[List[Dict[str, Any]], bool, int], None]] = None
+        self._seen_version = 0
+        self._seen_stat = None
+        self._pid = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._poll_lock = threading.Lock()
+
+    # ==== PUBLISHING ====
+
+    def publish(self, files: Iterable[str], dates: Iterable[str] = (), sections: Iterable[str] = (),
+                **extra) -> int:
+        """Publish a committed change and return its version number"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        with self._locked():
+            state = self.read_state()
+            version = state['version'] + 1
+            entry = {
+                'version': version,
+                'files': sorted(set(files)),
+                'dates': sorted(set(dates)),
+                'sections': sorted(set(sections)),
+                'origin': self._current_origin(),
+                'published_at': time.time(),
+                **extra
+            }
+            changes = (state['changes'] + [entry])[-self.keep:]
+            self._write_state({'version': version, 'changes': changes})
+
+        return version
+
+    def read_state(self) -> Dict[str, Any]:
+        """Read the current version and retained change entries"""
+        try:
+            with open(self.version_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            return {'version': int(state.get('version', 0)), 'changes': state.get('changes', [])}
+        except (FileNotFoundError, ValueError):
+            return {'version': 0, 'changes': []}
+
+    def current_version(self) -> int:
+        return self.read_state()['version']
+
+    def changes_since(self, version: int) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Entries newer than ``version``.
+
+        The second value is False when entries were already pruned, in which
+        case the caller cannot reload incrementally.
+        """
+        state = self.read_state()
+        entries = [e for e in state['changes'] if e['version'] > version]
+        complete = state['version'] <= version or (bool(entries) and entries[0]['version'] == version + 1)
+        return entries, complete
+
+    def _write_state(self, state: Dict[str, Any]):
+        """Atomically replace the version file so readers never see a partial write"""
+        tmp_path = self.version_path.with_name(f"{self.VERSION_FILE}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.version_path)
+
+    def _locked(self):
+        """Exclusive cross-process lock around read-modify-write of the version file"""
+        return locked_file(self.lock_path)
+
+    # ==== SUBSCRIBING ====
+
+    def ensure_subscribed(self, callback: Callable[[List[Dict[str, Any]], bool, int], None], since: int):
+        """
+        Start (or restart after a fork) the subscriber thread for this process.
+
+        ``callback(entries, complete, version)`` receives the entries published
+        by other processes since ``since``, whether they form a complete
+        sequence, and the version the subscriber has now caught up to.
+
+        Cheap enough to call on every request: it only compares PIDs once the
+        thread is running. On first start the subscriber catches up
+        synchronously so the calling request never sees stale data.
+        """
+        if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+            return
+
+        self._pid = os.getpid()
+        self._callback = callback
+        self._seen_version = since
+        self._seen_stat = None
+        self._stop.clear()
+        self.poll_once()
+
+        self._thread = threading.Thread(target=self._run, name='change-bus-subscriber', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def poll_once(self) -> bool:
+        """Deliver pending changes if the version file moved; returns True if any were delivered"""
+        with self._poll_lock:
+            try:
+                stat = self.version_path.stat()
+                signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            except FileNotFoundError:
+                return False
+
+            if signature == self._seen_stat:
+                return False
+            self._seen_stat = signature
+
+            entries, complete = self.changes_since(self._seen_version)
+            if not entries:
+                return False
+
+            # Skip our own publications; this worker already applied them
+            foreign = [e for e in entries if e.get('origin') != self._current_origin()]
+            self._seen_version = entries[-1]['version']
+            if foreign or not complete:
+                self._callback(foreign, complete, self._seen_version)
+            return True
+
+    def _current_origin(self) -> str:
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"❌ Change bus subscriber error: {e}")
+                time.sleep(1)
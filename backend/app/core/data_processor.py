@@ -1,16 +1,30 @@
 import asyncio
 import json
-import numpy as np
 import csv
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Any
 from pathlib import Path
 import os
 import sys
 import random
-from collections import defaultdict
-import pandas as pd
-from werkzeug.utils import secure_filename
+import statistics
+import threading
+import time
+from collections import OrderedDict
+
+from .attendance_cube import AttendanceCube
+from .attendance_export import EXPORT_FORMATS, csv_chunks, export_filename, export_rows, ndjson_chunks, validate_range
+from .attendance_store import REGULAR, RM, AttendanceStore
+from .attendee_index import AttendeeIndex
+from .excel_export import ExcelExportJobs, build_workbook, export_key, generated_at
+from .history_delta import HistoryDeltaLog, date_hash
+from .history_lake import HistoryLake, duckdb
+from .history_partitions import MonthCache, PartitionedStatuses, resident_start
+from .metrics import DATA_VERSION, record_ingestion, timed
+from .runtime_stats import process_memory, worker_count
+from .snapshot import SnapshotStore
+from .status_index import ABSENT, MISSING, PRESENT, StatusIndex
+from .tracing import get_logger, span
 
 # Add the parent directory to sys.path to import the original attendance tracker
 sys.path.append(str(Path(__file__).parent.parent.parent.parent))
@@ -20,6 +34,45 @@ sys.path.append(str(Path(__file__).parent.parent.parent.parent))
 #     AttendanceStatus, AlertSeverity, TrendDirection, HistoricalData, AttendanceHistory
 # )
 
+# Dashboard sections affected by each kind of data change
+DASHBOARD_SECTIONS = ('metrics', 'alerts', 'regional_data', 'attendance_history', 'at_risk_employees')
+DIRECTORY_SECTIONS = ('regional_data', 'at_risk_employees')
+
+# Dates whose pre-sorted detailed-attendance index each worker keeps
+ATTENDEE_INDEX_DATES = int(os.getenv('ATTENDEE_INDEX_DATES', '8'))
+
+# DASHBOARD_STORAGE=sqlite keeps the history in an AttendanceStore (SQLITE_PATH,
+# default data/attendance.db) and only its latest SQLITE_RESIDENT_MONTHS months in
+# memory, reading older months on demand into a cache of COLD_MONTHS_CACHE_MB;
+# the default, 'files', holds the whole JSON history in memory
+STORAGE_BACKEND = os.getenv('DASHBOARD_STORAGE', 'files')
+SQLITE_RESIDENT_MONTHS = int(os.getenv('SQLITE_RESIDENT_MONTHS', '3'))
+COLD_MONTHS_CACHE_MB = int(os.getenv('COLD_MONTHS_CACHE_MB', '64'))
+
+# ANALYTICS_ENGINE=duckdb mirrors the history to monthly Parquet partitions
+# (LAKE_DIR, default data/history_parquet) and answers the history, at-risk,
+# regional and cube queries with DuckDB instead of the in-memory indexes
+ANALYTICS_ENGINE = os.getenv('ANALYTICS_ENGINE', 'memory')
+
+logger = get_logger(__name__)
+
+
+def share_record_values(records: Dict[str, Dict[str, Any]]):
+    """
+    Intern the string values of loaded records in place.
+    
+    Names, statuses and offices repeat on every date, but json.load and the
+    CSV reader give each occurrence its own object. Sharing them shrinks the
+    loaded history by about a third, and fewer objects means fewer pages a
+    forked worker unshares by touching them (see gunicorn_config.py).
+    """
+    intern = sys.intern
+    for record in records.values():
+        if isinstance(record, dict):
+            for key, value in record.items():
+                if type(value) is str:
+                    record[key] = intern(value)
+
 class AttendanceDataProcessor:
     """
     Data processor that integrates with your existing attendance_tracker_v3.py
@@ -36,36 +89,332 @@ class AttendanceDataProcessor:
         self.employee_data = {}
         self.attendance_data = {}
         self.rm_attendance_data = {}
-        # Set data directory based on environment
-        self.data_dir = Path(__file__).parent.parent.parent / 'data'
+        # Packed statuses of attendance_data for whole-history scans, kept in step with it
+        self.status_index = StatusIndex()
+        # Pre-aggregated counts by date x office x department x title x manager x status
+        # (None under SQLite storage until the first analytics query builds it)
+        self.cube = AttendanceCube()
+        self._cube_lock = threading.Lock()
+        self._cube_generation = 0
+        # date -> (data_version, date_data, employee_data, AttendeeIndex), most recently used last
+        self._attendee_indexes = OrderedDict()
+        self._attendee_index_lock = threading.Lock()
+        # Set data directory based on environment (DASHBOARD_DATA_DIR overrides backend/data)
+        self.data_dir = Path(os.getenv('DASHBOARD_DATA_DIR') or Path(__file__).parent.parent.parent / 'data')
+        self.storage = STORAGE_BACKEND
+        self._store = None
+        # SQLite storage: first resident month, cold months' per-employee totals and the cold month cache
+        self._resident_start = ''
+        self._archive = {}
+        self.cold_months = MonthCache(self._load_month, COLD_MONTHS_CACHE_MB * 1024 * 1024)
+        self.analytics_engine = ANALYTICS_ENGINE
+        self._lake = None
+        self._excel_exports = None
+        if self.analytics_engine == 'duckdb' and duckdb is None:
+            logger.warning("⚠️  ANALYTICS_ENGINE=duckdb but duckdb is not installed; using the in-memory engine")
+        # Bumped every time an upload, sync or refresh commits new data
+        self.data_version = 0
+        self._change_listeners = []
+        # Optional cross-worker ChangeBus, see attach_change_bus()
+        self.change_bus = None
+        self.reload_stats = {
+            'reloads': 0,
+            'full_reloads': 0,
+            'last_version': None,
+            'last_latency_ms': None,
+            'avg_latency_ms': None,
+            'max_latency_ms': None,
+            'last_apply_ms': None
+        }
+        # When and how quickly the full data set was last loaded
+        self.load_stats = {'loaded_at': None, 'load_ms': None}
+        # Cleared while start_warmup() loads the data in the background
+        self._warm = threading.Event()
+        self._warm.set()
+        self._warmup_thread = None
         
     async def initialize(self):
         """Initialize the data processor"""
+        # Read the bus version before loading: a change published during the load is
+        # then still newer than data_version, and the subscriber replays it
+        bus_version = self.change_bus.current_version() if self.change_bus else None
         try:
             # Load existing attendance history
             await self.load_historical_data()
-            print("✅ Data processor initialized successfully")
+            # Index the latest date ahead of time; it is the drilldown's first page
+            if self.attendance_data:
+                self._attendee_index(max(self.attendance_data))
+            logger.info("✅ Data processor initialized successfully")
         except Exception as e:
-            print(f"⚠️  Warning: Could not initialize data processor: {e}")
+            logger.warning("⚠️  Warning: Could not initialize data processor", error=str(e))
             # Create sample data for demo
             await self.create_sample_data()
+        self._mark_changed(DASHBOARD_SECTIONS, version=bus_version)
+    
+    def start_warmup(self):
+        """
+        Load the data on a background thread so the server can start answering right away.
+        
+        The cheap part runs inline: the current snapshot's files are handed to the
+        kernel's readahead, so they are in the page cache by the time the thread
+        parses them. Requests that need data wait on wait_until_warm(); readiness
+        reports 'loading' until then. A fork (gunicorn's preload) waits for the
+        warmup first, so workers never inherit a half-loaded processor.
+        """
+        if self._warmup_thread is None:
+            os.register_at_fork(before=self._finish_warmup_before_fork)
+        self._warm.clear()
+        self._prefetch_snapshot()
+        self._warmup_thread = threading.Thread(target=self._warmup, name='processor-warmup', daemon=True)
+        self._warmup_thread.start()
+    
+    def _warmup(self):
+        try:
+            asyncio.run(self.initialize())
+        finally:
+            self._warm.set()
+    
+    def wait_until_warm(self, timeout: Optional[float] = None) -> bool:
+        """Block until start_warmup() has loaded the data; False if the timeout ran out first"""
+        return self._warm.wait(timeout)
+    
+    @property
+    def warm(self) -> bool:
+        return self._warm.is_set()
+    
+    def _finish_warmup_before_fork(self):
+        thread = self._warmup_thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join()
+    
+    def _prefetch_snapshot(self):
+        """Ask the kernel to start reading the snapshot's data files (a cold container start is I/O bound)"""
+        prefetched = 0
+        for name in (self.history_file, self.rm_history_file, self.employee_file):
+            try:
+                fd = os.open(self.snapshots.path(name), os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                prefetched += os.fstat(fd).st_size
+                if hasattr(os, 'posix_fadvise'):
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+        self.load_stats['snapshot_bytes'] = prefetched
+    
+    @property
+    def snapshots(self) -> SnapshotStore:
+        """Versioned data files; reads always resolve to the last complete version"""
+        return SnapshotStore(self.data_dir)
+    
+    @property
+    def store(self) -> Optional[AttendanceStore]:
+        """SQLite storage when DASHBOARD_STORAGE=sqlite, else None"""
+        if self.storage != 'sqlite':
+            return None
+        path = Path(os.getenv('SQLITE_PATH') or self.data_dir / 'attendance.db')
+        if self._store is None or self._store.path != path:
+            self._store = AttendanceStore(path)
+        return self._store
+    
+    @property
+    def lake(self) -> Optional[HistoryLake]:
+        """Parquet history queried with DuckDB when ANALYTICS_ENGINE=duckdb (and duckdb is installed), else None"""
+        if self.analytics_engine != 'duckdb' or duckdb is None:
+            return None
+        path = Path(os.getenv('LAKE_DIR') or self.data_dir / 'history_parquet')
+        if self._lake is None or self._lake.root != path:
+            self._lake = HistoryLake(path)
+        return self._lake
+    
+    @property
+    def excel_exports(self) -> ExcelExportJobs:
+        """Excel report jobs and their workbooks (EXPORT_DIR, default data/exports)"""
+        path = Path(os.getenv('EXPORT_DIR') or self.data_dir / 'exports')
+        if self._excel_exports is None or self._excel_exports.directory != path:
+            self._excel_exports = ExcelExportJobs(path)
+        return self._excel_exports
+    
+    @property
+    def history_log(self) -> HistoryDeltaLog:
+        """Attendance history base file plus the delta chain written by the sync script"""
+        return HistoryDeltaLog(self.snapshots.current_dir(), self.history_file)
+    
+    def add_change_listener(self, callback):
+        """Register a callback(version, sections) invoked after new data commits"""
+        self._change_listeners.append(callback)
+    
+    def attach_change_bus(self, change_bus):
+        """Share commits with other workers (and the sync daemon) through a ChangeBus"""
+        self.change_bus = change_bus
+    
+    def follow_changes(self):
+        """Subscribe this process to the change bus; safe to call on every request and after fork"""
+        if self.change_bus:
+            self.change_bus.ensure_subscribed(self._on_bus_changes, self.data_version)
+    
+    def _on_bus_changes(self, entries: List[Dict[str, Any]], complete: bool, version: int):
+        """Change bus callback, runs on the subscriber thread"""
+        try:
+            asyncio.run(self.apply_bus_changes(entries, complete, version))
+        except Exception as e:
+            logger.error("❌ Error applying data changes from other workers", error=str(e))
+    
+    @timed('apply_bus_changes')
+    async def apply_bus_changes(self, entries: List[Dict[str, Any]], complete: bool, version: int):
+        """Apply changes published by other processes, reloading only what changed"""
+        started = time.perf_counter()
+        
+        if complete:
+            files = set()
+            dates = set()
+            sections = set()
+            full_history = False
+            deltas = []
+            for entry in entries:
+                files.update(entry.get('files', []))
+                dates.update(entry.get('dates', []))
+                sections.update(entry.get('sections') or DASHBOARD_SECTIONS)
+                if self.history_file in entry.get('files', []):
+                    if not entry.get('dates'):
+                        full_history = True
+                    deltas.append((entry.get('snapshot'), entry.get('delta')) if entry.get('delta') else None)
+            
+            # Sync deltas carry exactly the changed dates, so skip reading the history at all
+            if deltas and all(deltas) and self._apply_history_deltas(deltas):
+                files.discard(self.history_file)
+            await self.reload_changed(files, None if full_history else dates)
+        else:
+            # Missed too many versions to know what changed
+            await self.load_historical_data()
+            sections = set(DASHBOARD_SECTIONS)
+            self.reload_stats['full_reloads'] += 1
+        
+        self._mark_changed(sorted(sections), version=version)
+        self._record_reload(entries, version, started)
     
+    @timed('apply_pushed_change')
+    def apply_pushed_change(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply a change the sync daemon pushed to this worker, without waiting for the next bus poll.
+
+        The same entry is on the change bus, so this just delivers it (and
+        anything published before it) now; other workers still pick it up
+        from the bus. Without a bus the pushed entry is applied directly.
+        Blocking: call it from a request thread, not the event loop.
+        """
+        started = time.perf_counter()
+        version = entry.get('version')
+
+        if self.change_bus:
+            self.follow_changes()
+            self.change_bus.poll_once()
+        if version is None or self.data_version < version:
+            complete = version is None or version == self.data_version + 1
+            asyncio.run(self.apply_bus_changes([entry], complete, version if version is not None else self.data_version + 1))
+
+        return {
+            'version': self.data_version,
+            'apply_ms': round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    def readiness(self) -> Dict[str, Any]:
+        """
+        Readiness report for /health/ready.
+        
+        Ready once the data is loaded and this worker has applied every
+        change published on the bus.
+        """
+        bus_version = self.change_bus.current_version() if self.change_bus else None
+        behind = max(0, bus_version - self.data_version) if bus_version is not None else 0
+        
+        snapshot = self.snapshots.current()
+        snapshot_info = {
+            'version': snapshot['version'],
+            'age_seconds': round(time.time() - snapshot['created_at'], 1)
+        } if snapshot else None
+        
+        loaded = self.load_stats['loaded_at'] is not None and self.warm
+        return {
+            'ready': loaded and behind == 0,
+            'status': 'ready' if loaded and behind == 0 else ('catching_up' if loaded else 'loading'),
+            'data_version': self.data_version,
+            'bus_version': bus_version,
+            'versions_behind': behind,
+            'dates_loaded': len(self.attendance_data),
+            'load': {
+                'loaded_at': datetime.fromtimestamp(self.load_stats['loaded_at']).isoformat() if loaded else None,
+                'load_ms': self.load_stats['load_ms'],
+                'snapshot_bytes': self.load_stats.get('snapshot_bytes')
+            },
+            'snapshot': snapshot_info,
+            'workers': {'count': worker_count(), 'pid': os.getpid()},
+            'memory': process_memory(),
+            'storage': dict(self.store.stats(), resident_from=self._resident_start,
+                            cold_months=self.cold_months.stats()) if self.store is not None else {'backend': 'files'},
+            'analytics_engine': 'duckdb' if self.lake is not None else 'memory',
+            'reload': self.reload_stats
+        }
+    
+    def _record_reload(self, entries: List[Dict[str, Any]], version: int, started: float):
+        """Track publish-to-applied latency of cross-worker reloads"""
+        stats = self.reload_stats
+        stats['reloads'] += 1
+        stats['last_version'] = version
+        stats['last_apply_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        if entries:
+            latency_ms = round((time.time() - entries[-1].get('published_at', time.time())) * 1000, 2)
+            stats['last_latency_ms'] = latency_ms
+            stats['max_latency_ms'] = max(stats['max_latency_ms'] or 0, latency_ms)
+            previous_avg = stats['avg_latency_ms'] or 0
+            stats['avg_latency_ms'] = round(previous_avg + (latency_ms - previous_avg) / stats['reloads'], 2)
+    
+    def _commit_change(self, sections, files=(), dates=()):
+        """Publish a local commit to other workers, then bump the data version"""
+        version = None
+        if self.change_bus and files:
+            try:
+                version = self.change_bus.publish(files, dates, sections)
+            except Exception as e:
+                logger.error("❌ Error publishing data change", error=str(e))
+        self._mark_changed(sections, version=version)
+    
+    def _mark_changed(self, sections, version: Optional[int] = None):
+        """Bump the data version and notify listeners which dashboard sections changed"""
+        self.data_version = version if version is not None else self.data_version + 1
+        DATA_VERSION.set(self.data_version)
+        for callback in self._change_listeners:
+            try:
+                callback(self.data_version, tuple(sections))
+            except Exception as e:
+                logger.error("❌ Error notifying change listener", error=str(e))
+    
+    @timed('load_historical_data')
     async def load_historical_data(self):
         """Load historical attendance data from your existing JSON file"""
+        started = time.perf_counter()
         try:
             # Check for data in the container data directory first
-            history_path = self.data_dir / self.history_file
+            history_path = self.snapshots.path(self.history_file)
             
-            print(f"🔍 Looking for history file at: {history_path}")
-            print(f"🔍 File exists: {history_path.exists()}")
+            logger.info("🔍 Looking for history file", path=str(history_path), exists=history_path.exists())
             
-            if history_path.exists():
-                with open(history_path, 'r', encoding='utf-8') as f:
-                    self.attendance_data = json.load(f)
+            if self.store is not None:
+                await self._load_from_store(history_path)
+            elif history_path.exists():
+                with span('history.read') as stage:
+                    self.attendance_data = self.history_log.load()
+                    for records in self.attendance_data.values():
+                        share_record_values(records)
+                    rows = sum(len(records) for records in self.attendance_data.values())
+                    stage.set(dates=len(self.attendance_data), rows=rows)
+                record_ingestion('history_load', started, rows)
                     
                 # Process historical data into aggregated format
-                self.historical_data = self._process_attendance_data()
-                print(f"✅ Loaded attendance data for {len(self.attendance_data)} dates")
+                with span('history.aggregate', dates=len(self.attendance_data)):
+                    self.historical_data = self._process_attendance_data()
+                logger.info("✅ Loaded attendance data", dates=len(self.attendance_data), rows=rows)
                 
                 # Load Regional Manager attendance data
                 await self.load_rm_attendance_data()
@@ -73,37 +422,146 @@ class AttendanceDataProcessor:
                 # Load employee data
                 await self.load_employee_data()
             else:
-                print("⚠️  No historical data found, creating sample data")
+                logger.warning("⚠️  No historical data found, creating sample data")
                 await self.create_sample_data()
+            
+            self._sync_lake()
                 
         except Exception as e:
-            print(f"❌ Error loading historical data: {e}")
+            logger.error("❌ Error loading historical data", error=str(e))
             await self.create_sample_data()
+        
+        self.load_stats.update(loaded_at=time.time(), load_ms=round((time.perf_counter() - started) * 1000, 2))
+    
+    async def _load_from_store(self, history_path: Path):
+        """Import JSON history changes into the store, then load the latest dates and the history aggregates"""
+        started = time.perf_counter()
+        if history_path.exists():
+            with span('store.import', kind=REGULAR) as stage:
+                stage.set(dates=len(self._import_history()))
+        
+        if not self.store.dates(REGULAR):
+            logger.warning("⚠️  No historical data found, creating sample data")
+            await self.create_sample_data()
+            return
+        
+        with span('store.read') as stage:
+            self._load_resident()
+            rows = sum(summary['total_count'] for summary in self.historical_data.values())
+            stage.set(dates=len(self.historical_data), resident=len(self.attendance_data), rows=rows)
+        record_ingestion('history_load', started, rows)
+        logger.info("✅ Loaded attendance data from SQLite", dates=len(self.historical_data),
+                    resident=len(self.attendance_data), path=str(self.store.path))
+        
+        await self.load_rm_attendance_data()
+        await self.load_employee_data()
+    
+    def _import_history(self) -> List[str]:
+        """Write the JSON history's changed dates into the store, unless its files are unchanged since the last import"""
+        history_log = self.history_log
+        signature = self._history_signature()
+        if signature is None or signature == self.store.source_signature(self.history_file):
+            return []
+        
+        def load(dates):
+            wanted = set(dates)
+            return ((date, records) for date, records in history_log.iter_dates() if date in wanted)
+        
+        changed = self.store.import_dates(REGULAR, history_log.current_hashes(), load)
+        self.store.set_source_signature(self.history_file, signature)
+        if changed:
+            logger.info("✅ Imported attendance history into SQLite", dates=len(changed))
+        return changed
+    
+    def _history_signature(self) -> Optional[str]:
+        """Stat signature of the current JSON history (base and manifest), or None when there is none"""
+        history_log = self.history_log
+        signature = []
+        for path in (history_log.base_path, history_log.manifest_path):
+            try:
+                stat = path.stat()
+                signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return json.dumps(signature) if signature[0] else None
+    
+    def _load_resident(self):
+        """Swap in the store's per-date summaries, the resident months' records and status index, and the cold months' totals"""
+        store = self.store
+        historical_data = store.date_summaries(REGULAR)
+        start = resident_start(historical_data, SQLITE_RESIDENT_MONTHS)
+        attendance_data = store.load_dates(REGULAR, [date for date in historical_data if date >= start])
+        for records in attendance_data.values():
+            share_record_values(records)
+        status_index = StatusIndex.from_statuses(store.iter_statuses(REGULAR, since=start))
+        archive = self._load_archive(start)
+        
+        self.attendance_data = attendance_data
+        self.status_index = status_index
+        self._archive = archive
+        self._resident_start = start
+        self.historical_data = historical_data
+        self.cold_months.invalidate()
+    
+    def _load_archive(self, start: str) -> Dict[str, tuple]:
+        """Per-employee status totals of the months before start, from the store's precomputed month rows"""
+        return {email: (recorded, present, absent, last_present) for email, recorded, present, absent, last_present
+                in self.store.employee_totals(REGULAR, before=start)}
+    
+    def _load_month(self, month: str) -> Dict[str, Dict[str, Any]]:
+        """Records of one cold month, for the month cache"""
+        loaded = self.store.load_dates(REGULAR, [date for date in self.historical_data if date[:7] == month])
+        for records in loaded.values():
+            share_record_values(records)
+        return loaded
+    
+    def _copy_date(self, date_str: str) -> Dict[str, Any]:
+        """
+        A private copy of a date's records (loaded from the store when the date
+        is not resident) for an upload to add records to; the live dict is only
+        ever replaced through _replace_dates.
+        """
+        if date_str in self.attendance_data:
+            return dict(self.attendance_data[date_str])
+        stored = self.store.load_dates(REGULAR, [date_str]).get(date_str) if self.store is not None else None
+        return dict(stored or {})
     
     async def load_rm_attendance_data(self):
         """Load Regional Manager attendance data from JSON file"""
+        started = time.perf_counter()
         try:
-            rm_history_path = self.data_dir / self.rm_history_file
+            rm_history_path = self.snapshots.path(self.rm_history_file)
 
             if rm_history_path.exists():
-                with open(rm_history_path, 'r', encoding='utf-8') as f:
-                    self.rm_attendance_data = json.load(f)
-                print(f"✅ Loaded Regional Manager attendance data for {len(self.rm_attendance_data)} dates")
+                with span('rm_history.read'), open(rm_history_path, 'r', encoding='utf-8') as f:
+                    rm_attendance_data = json.load(f)
+                for records in rm_attendance_data.values():
+                    share_record_values(records)
+                if self.store is not None:
+                    # Regional managers are a handful of rows per date, so they stay resident as well
+                    with span('store.import', kind=RM):
+                        self.store.import_dates(RM, {date: date_hash(records) for date, records in rm_attendance_data.items()},
+                                                lambda dates: ((date, rm_attendance_data[date]) for date in dates))
+                self.rm_attendance_data = rm_attendance_data
+                record_ingestion('rm_history_load', started, sum(len(records) for records in self.rm_attendance_data.values()))
+                logger.info("✅ Loaded Regional Manager attendance data", dates=len(self.rm_attendance_data))
         except Exception as e:
-            print(f"❌ Error loading Regional Manager attendance data: {e}")
+            logger.error("❌ Error loading Regional Manager attendance data", error=str(e))
 
     async def load_employee_data(self):
         """Load employee data from CSV file"""
+        started = time.perf_counter()
         try:
-            employee_path = self.data_dir / self.employee_file
+            employee_path = self.snapshots.path(self.employee_file)
             
             if employee_path.exists():
-                with open(employee_path, 'r', encoding='utf-8') as f:
+                employee_data = {}
+                with span('directory.read'), open(employee_path, 'r', encoding='utf-8') as f:
                     csv_reader = csv.DictReader(f)
                     for row in csv_reader:
                         email = row.get('email', '').strip()
                         if email and '@' in email:
-                            self.employee_data[email] = {
+                            employee_data[email] = {
                                 "name": row.get('name', '').strip('"'),
                                 "title": row.get('title', '').strip('"'),
                                 "department": row.get('department', '').strip('"'),
@@ -111,32 +569,215 @@ class AttendanceDataProcessor:
                                 "manager": row.get('manager', '').strip('"'),
                                 "email": email
                             }
-                print(f"✅ Loaded {len(self.employee_data)} employee records")
+                share_record_values(employee_data)
+                # Swap in one step so concurrent readers never see a half-loaded directory
+                self.employee_data = employee_data
+                if self.store is not None:
+                    with span('store.directory', employees=len(employee_data)):
+                        self.store.save_directory(employee_data, source=self.employee_file)
+                if self.lake is not None:
+                    with span('lake.directory', employees=len(employee_data)):
+                        self.lake.write_directory(employee_data)
+                record_ingestion('directory_load', started, len(employee_data))
+                logger.info("✅ Loaded employee records", employees=len(self.employee_data))
+            # The cube's dimensions come from the directory; this also builds it after a history load
+            self._rebuild_cube()
         except Exception as e:
-            print(f"❌ Error loading employee data: {e}")
+            logger.error("❌ Error loading employee data", error=str(e))
     
     def _process_attendance_data(self) -> Dict[str, Dict[str, Any]]:
-        """Process raw attendance data into historical format"""
+        """Process raw attendance data into historical format (and rebuild the status index)"""
+        self.status_index = StatusIndex.build(self.attendance_data)
         processed_data = {}
         
         for date_str, date_data in self.attendance_data.items():
-            total_employees = len(date_data)
-            present_count = sum(1 for emp in date_data.values() if emp.get('status') == 'Present')
-            partial_count = sum(1 for emp in date_data.values() if emp.get('status') == 'Partial')
-            absent_count = sum(1 for emp in date_data.values() if emp.get('status') == 'Absent')
-            
-            attendance_rate = (present_count / total_employees * 100) if total_employees > 0 else 0
-            
-            processed_data[date_str] = {
-                'attendance_rate': attendance_rate,
-                'present_count': present_count,
-                'partial_count': partial_count,
-                'absent_count': absent_count,
-                'total_count': total_employees
-            }
+            processed_data[date_str] = self._summarize_date(date_data)
         
         return processed_data
     
+    def _summarize_date(self, date_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Aggregate one date of attendance records into its historical summary"""
+        total_employees = len(date_data)
+        present_count = sum(1 for emp in date_data.values() if emp.get('status') == 'Present')
+        partial_count = sum(1 for emp in date_data.values() if emp.get('status') == 'Partial')
+        absent_count = sum(1 for emp in date_data.values() if emp.get('status') == 'Absent')
+        
+        attendance_rate = (present_count / total_employees * 100) if total_employees > 0 else 0
+        
+        return {
+            'attendance_rate': attendance_rate,
+            'present_count': present_count,
+            'partial_count': partial_count,
+            'absent_count': absent_count,
+            'total_count': total_employees
+        }
+    
+    def _apply_history_deltas(self, deltas: List[tuple]) -> bool:
+        """Apply sync delta files in order; returns False if one is gone (already compacted or pruned)"""
+        try:
+            updates = {}
+            for snapshot, name in deltas:
+                delta_dir = self.data_dir / snapshot if snapshot else self.snapshots.current_dir()
+                upserts, removed = HistoryDeltaLog(delta_dir, self.history_file).read_delta(name)
+                updates.update(upserts)
+                updates.update(dict.fromkeys(removed))
+        except (OSError, ValueError) as e:
+            logger.warning("⚠️  Could not apply attendance deltas, reloading history instead", error=str(e))
+            return False
+        
+        with span('history.apply_deltas', deltas=len(deltas), dates=len(updates)):
+            if self.store is not None:
+                self.store.apply_source_changes(REGULAR, updates)
+            self._replace_dates(updates)
+        logger.info("✅ Applied attendance deltas", deltas=len(deltas), dates=len(updates))
+        return True
+    
+    @timed('reload_changed')
+    async def reload_changed(self, files, dates=None):
+        """Reload only the changed data files, and only the given dates of the attendance history"""
+        if self.history_file in files and self.store is not None:
+            # Changes made through another worker are already in the store; the sync's are in the JSON files
+            with span('store.import', kind=REGULAR):
+                self._import_history()
+            with span('store.read', dates=len(dates) if dates else 'all'):
+                if dates:
+                    loaded = self.store.load_dates(REGULAR, dates)
+                    self._replace_dates({date: loaded.get(date) for date in dates})
+                else:
+                    self._load_resident()
+                    self._sync_lake()
+                    if self.employee_file not in files:
+                        self._rebuild_cube()
+            logger.info("✅ Reloaded attendance history from SQLite", dates=len(dates) if dates else 'all')
+        elif self.history_file in files:
+            with span('history.read'):
+                loaded = self.history_log.load()
+            
+            with span('history.aggregate', dates=len(dates) if dates else len(loaded)):
+                if dates:
+                    self._replace_dates({date: loaded.get(date) for date in dates})
+                else:
+                    for records in loaded.values():
+                        share_record_values(records)
+                    self.attendance_data = loaded
+                    self.historical_data = self._process_attendance_data()
+                    self._sync_lake()
+                    if self.employee_file not in files:
+                        self._rebuild_cube()
+            logger.info("✅ Reloaded attendance history", dates=len(dates) if dates else 'all')
+        
+        if self.rm_history_file in files:
+            await self.load_rm_attendance_data()
+        
+        if self.employee_file in files:
+            await self.load_employee_data()
+    
+    def _replace_dates(self, updates: Dict[str, Optional[Dict[str, Any]]]):
+        """
+        Replace (or remove, when None) whole dates of attendance data.
+        
+        Builds new top-level dicts and swaps them in, so request threads that
+        are iterating the old ones are never affected.
+        """
+        attendance_data = dict(self.attendance_data)
+        historical_data = dict(getattr(self, 'historical_data', {}) or {})
+        cube = self.cube.with_dates(updates, self.employee_data) if self.cube is not None and self.lake is None else self.cube
+        
+        for date_str, date_data in updates.items():
+            if date_data is None:
+                attendance_data.pop(date_str, None)
+                historical_data.pop(date_str, None)
+            else:
+                share_record_values(date_data)
+                attendance_data[date_str] = date_data
+                historical_data[date_str] = self._summarize_date(date_data)
+        
+        status_updates = updates
+        start, archive = self._resident_start, self._archive
+        if self.store is not None:
+            # Only the latest months stay in memory; older ones are read from the store when asked for
+            start = resident_start(historical_data, SQLITE_RESIDENT_MONTHS)
+            for date_str in [date for date in attendance_data if date < start]:
+                del attendance_data[date_str]
+            status_updates = {date: date_data for date, date_data in updates.items() if date >= start}
+            status_updates.update((date, None) for date in self.status_index.columns if date < start)
+            if start != self._resident_start or any(date < start for date in updates):
+                # The window moved or a cold month changed: re-sum the cold months' totals
+                archive = self._load_archive(start)
+            self.cold_months.invalidate(updates)
+            self._cube_generation += 1
+        status_index = self.status_index.with_dates(status_updates)
+        
+        self.attendance_data = attendance_data
+        self.status_index = status_index
+        self._archive = archive
+        self._resident_start = start
+        self.cube = cube
+        self.historical_data = historical_data
+        self._sync_lake(updates)
+    
+    def _rebuild_cube(self):
+        """Re-aggregate the whole attendance cube (after a full history load or a directory change)"""
+        if self.lake is not None:
+            # Cube queries go to DuckDB, so holding the cube as well would only cost memory
+            self.cube = AttendanceCube()
+            return
+        if self.store is not None:
+            # Built from the store by the first analytics query, so a load never scans the whole history
+            self._cube_generation += 1
+            self.cube = None
+            return
+        with span('cube.build', dates=len(self.status_index.columns)) as stage:
+            self.cube = AttendanceCube.build(self.attendance_data, self.employee_data)
+            stage.set(cells=self.cube.cell_count)
+    
+    def _attendance_cube(self) -> AttendanceCube:
+        """The attendance cube, grouping it in SQL first if it has not been built since the last change"""
+        cube = self.cube
+        if cube is not None:
+            return cube
+        with self._cube_lock:
+            cube = self.cube
+            if cube is None:
+                generation = self._cube_generation
+                with span('cube.build', dates=len(self.historical_data)) as stage:
+                    # Grouped in SQL against the directory snapshot saved with employee_data
+                    cube = AttendanceCube.from_cells(self.store.cube_cells(REGULAR))
+                    stage.set(cells=cube.cell_count)
+                if generation == self._cube_generation:
+                    self.cube = cube
+        return cube
+    
+    def _sync_lake(self, dates: Optional[Iterable[str]] = None):
+        """Rewrite the lake's months that hold changed dates (every month when dates is None)"""
+        lake = self.lake
+        if lake is None:
+            return
+        months = None if dates is None else {date[:7] for date in dates}
+        try:
+            with span('lake.sync', months=len(months) if months is not None else 'all') as stage:
+                source = None
+                if self.store is not None:
+                    versions = self.store.date_versions(REGULAR)
+                    load = lambda wanted: self.store.load_dates(REGULAR, wanted).items()
+                else:
+                    # The JSON history is what attendance_data was loaded from (or just saved to)
+                    if months is None:
+                        source = self._history_signature()
+                        if source is not None and source == lake.source_signature():
+                            return
+                        versions = self.history_log.current_hashes()
+                    else:
+                        versions = {date: date_hash(records) for date, records in self.attendance_data.items()
+                                    if date[:7] in months}
+                    load = lambda wanted: ((date, self.attendance_data[date]) for date in wanted)
+                changed = lake.sync(versions, load, months, source)
+                stage.set(changed=len(changed))
+            if changed:
+                logger.info("✅ Wrote Parquet history", months=len(changed), path=str(lake.root))
+        except Exception as e:
+            logger.error("❌ Error writing Parquet history", error=str(e))
+    
     async def create_sample_data(self):
         """Create sample data for demonstration purposes"""
         # Create sample historical data
@@ -150,8 +791,8 @@ class AttendanceDataProcessor:
             # Generate sample attendance data
             sample_dates.append({
                 'date': date_str,
-                'attendance_rate': np.random.uniform(75, 95),
-                'present_count': np.random.randint(300, 400),
+                'attendance_rate': random.uniform(75, 95),
+                'present_count': random.randrange(300, 400),
                 'total_count': 400
             })
         
@@ -163,8 +804,9 @@ class AttendanceDataProcessor:
                 'total_count': data['total_count']
             }
         
-        print("📊 Created sample historical data for demo")
+        logger.info("📊 Created sample historical data for demo")
     
+    @timed('get_current_metrics')
     async def get_current_metrics(self) -> Dict[str, Any]:
         """Get current attendance metrics from real data"""
         try:
@@ -185,19 +827,15 @@ class AttendanceDataProcessor:
                 # Calculate average engagement score for present employees
                 engagement_scores = [emp.get('engagement_score', 0) for emp in recent_data.values() 
                                    if emp.get('status') in ['Present', 'Partial'] and emp.get('engagement_score', 0) > 0]
-                avg_engagement = np.mean(engagement_scores) if engagement_scores else 0
+                avg_engagement = statistics.fmean(engagement_scores) if engagement_scores else 0
                 
-                # Calculate week-over-week change if we have enough data
+                # Week-over-week change against the previous meeting's summary (historical_data
+                # covers every date; attendance_data only the resident months under SQLite storage)
                 week_change = 0
-                if len(self.attendance_data) >= 2:
-                    sorted_dates = sorted(self.attendance_data.keys())
-                    if len(sorted_dates) >= 2:
-                        prev_date = sorted_dates[-2]
-                        prev_data = self.attendance_data[prev_date]
-                        prev_present = sum(1 for emp in prev_data.values() if emp.get('status') == 'Present')
-                        prev_total = len(prev_data)
-                        prev_rate = (prev_present / prev_total * 100) if prev_total > 0 else 0
-                        week_change = attendance_rate - prev_rate
+                historical_data = self.historical_data
+                prev_date = max((date for date in historical_data if date < recent_date), default=None)
+                if prev_date is not None:
+                    week_change = attendance_rate - historical_data[prev_date].get('attendance_rate', 0)
                 
                 metrics = {
                     'total_employees': total_employees,
@@ -218,7 +856,7 @@ class AttendanceDataProcessor:
                 return self._get_default_metrics()
             
         except Exception as e:
-            print(f"Error getting current metrics: {e}")
+            logger.error("Error getting current metrics", error=str(e))
             return self._get_default_metrics()
     
     def _get_default_metrics(self) -> Dict[str, Any]:
@@ -235,6 +873,7 @@ class AttendanceDataProcessor:
             'data_source': 'sample'
         }
     
+    @timed('get_active_alerts')
     async def get_active_alerts(self) -> List[Dict[str, Any]]:
         """Get active alerts and notifications"""
         alerts = []
@@ -278,6 +917,7 @@ class AttendanceDataProcessor:
         
         return alerts
     
+    @timed('get_regional_breakdown')
     async def get_regional_breakdown(self) -> List[Dict[str, Any]]:
         """Get manager and team performance data"""
         try:
@@ -298,21 +938,27 @@ class AttendanceDataProcessor:
                     elif 'Area Manager' in title:
                         area_managers[email] = emp_info
                 
+                # SQLite storage looks up every manager's reports in one indexed query
+                teams = None
+                if self.store is not None:
+                    teams = self.store.direct_reports({info.get('name', '').strip('"') for info in
+                                                       [*regional_managers.values(), *area_managers.values()]})
+                
                 # Process Regional Managers first
                 for manager_email, manager_info in regional_managers.items():
-                    manager_data.append(self._create_manager_data(manager_email, manager_info, recent_data, 'Regional Manager'))
+                    manager_data.append(self._create_manager_data(manager_email, manager_info, recent_data, 'Regional Manager', teams))
                 
                 # Process Area Managers
                 for manager_email, manager_info in area_managers.items():
-                    manager_data.append(self._create_manager_data(manager_email, manager_info, recent_data, 'Area Manager'))
+                    manager_data.append(self._create_manager_data(manager_email, manager_info, recent_data, 'Area Manager', teams))
             
             # If no real data, fall back to sample data
             if not manager_data:
                 regions = ['Texas', 'Florida', 'California', 'Arizona', 'Nevada']
                 
                 for region in regions:
-                    total_employees = np.random.randint(30, 60)
-                    present_count = int(total_employees * np.random.uniform(0.7, 0.95))
+                    total_employees = random.randrange(30, 60)
+                    present_count = int(total_employees * random.uniform(0.7, 0.95))
                     attendance_rate = (present_count / total_employees) * 100
                     
                     manager_data.append({
@@ -320,22 +966,22 @@ class AttendanceDataProcessor:
                         'manager_title': 'Regional Manager',
                         'manager_email': f'manager.{region.lower()}@redstone.com',
                         'manager_office': region,
-                        'manager_personal_attendance': round(np.random.uniform(80, 100), 1),
-                        'manager_current_status': np.random.choice(['Present', 'Absent']),
-                        'manager_current_attendance': np.random.randint(0, 2),
+                        'manager_personal_attendance': round(random.uniform(80, 100), 1),
+                        'manager_current_status': random.choice(['Present', 'Absent']),
+                        'manager_current_attendance': random.randrange(0, 2),
                         'team_size': total_employees - 1,
                         'team_attendance_rate': round(attendance_rate, 1),
                         'team_present_count': present_count,
-                        'team_engagement_score': round(np.random.uniform(60, 90), 1),
-                        'team_four_week_rate': round(np.random.uniform(70, 95), 1),
-                        'team_at_risk_count': np.random.randint(0, 8),
+                        'team_engagement_score': round(random.uniform(60, 90), 1),
+                        'team_four_week_rate': round(random.uniform(70, 95), 1),
+                        'team_at_risk_count': random.randrange(0, 8),
                         'region_name': region,
                         'total_employees': total_employees,
                         'present_count': present_count,
                         'attendance_rate': round(attendance_rate, 1),
-                        'risk_score': round(np.random.uniform(10, 80), 1),
-                        'at_risk_count': np.random.randint(0, 8),
-                        'trend': np.random.choice(['improving', 'stable', 'declining'])
+                        'risk_score': round(random.uniform(10, 80), 1),
+                        'at_risk_count': random.randrange(0, 8),
+                        'trend': random.choice(['improving', 'stable', 'declining'])
                     })
             
             # Sort by attendance rate (lowest first for attention)
@@ -344,21 +990,23 @@ class AttendanceDataProcessor:
             return manager_data
             
         except Exception as e:
-            print(f"Error getting regional breakdown: {e}")
+            logger.error("Error getting regional breakdown", error=str(e))
             return []
     
+    @timed('get_attendance_history')
     async def get_attendance_history(self, weeks: int = 8) -> Dict[str, Any]:
         """Get historical attendance data from real data"""
         try:
             historical_points = []
             
             # Use real historical data if available
-            if hasattr(self, 'historical_data') and self.historical_data:
+            history = self.lake.date_summaries() if self.lake is not None else getattr(self, 'historical_data', None)
+            if history:
                 # Sort available dates
-                sorted_dates = sorted(self.historical_data.keys())
+                sorted_dates = sorted(history.keys())
                 
                 for date_str in sorted_dates:
-                    data = self.historical_data[date_str]
+                    data = history[date_str]
                     historical_points.append({
                         'date': date_str,
                         'attendance_rate': round(data.get('attendance_rate', 0), 1),
@@ -375,8 +1023,8 @@ class AttendanceDataProcessor:
                     
                     historical_points.append({
                         'date': date_str,
-                        'attendance_rate': round(np.random.uniform(75, 95), 1),
-                        'present_count': np.random.randint(300, 400),
+                        'attendance_rate': round(random.uniform(75, 95), 1),
+                        'present_count': random.randrange(300, 400),
                         'total_count': 400
                     })
             
@@ -385,12 +1033,12 @@ class AttendanceDataProcessor:
             
             # Calculate average and trend
             rates = [point['attendance_rate'] for point in historical_points]
-            average_rate = np.mean(rates) if rates else 0
+            average_rate = statistics.fmean(rates) if rates else 0
             
             # Simple trend calculation
             if len(rates) >= 2:
-                recent_avg = np.mean(rates[-3:]) if len(rates) >= 3 else rates[-1]
-                older_avg = np.mean(rates[:3]) if len(rates) >= 3 else rates[0]
+                recent_avg = statistics.fmean(rates[-3:]) if len(rates) >= 3 else rates[-1]
+                older_avg = statistics.fmean(rates[:3]) if len(rates) >= 3 else rates[0]
                 if recent_avg > older_avg + 2:
                     trend = 'improving'
                 elif recent_avg < older_avg - 2:
@@ -408,7 +1056,7 @@ class AttendanceDataProcessor:
             }
             
         except Exception as e:
-            print(f"Error getting attendance history: {e}")
+            logger.error("Error getting attendance history", error=str(e))
             return {
                 'data': [],
                 'weeks': weeks,
@@ -416,42 +1064,27 @@ class AttendanceDataProcessor:
                 'trend': 'stable'
             }
     
+    @timed('get_at_risk_employees')
     async def get_at_risk_employees(self) -> List[Dict[str, Any]]:
         """Get employees who are at risk based on attendance patterns from real data"""
         try:
             at_risk_employees = []
             
             if hasattr(self, 'attendance_data') and self.attendance_data and hasattr(self, 'employee_data'):
-                # Calculate attendance rates for each employee across all available dates
-                employee_attendance = defaultdict(lambda: {'total': 0, 'present': 0, 'absent': 0})
-                
-                # Count attendance for each employee
-                for date_str, date_data in self.attendance_data.items():
-                    for email, attendance in date_data.items():
-                        employee_attendance[email]['total'] += 1
-                        
-                        status = attendance.get('status', 'Absent')
-                        if status == 'Present':
-                            employee_attendance[email]['present'] += 1
-                        elif status == 'Absent':
-                            employee_attendance[email]['absent'] += 1
+                # Attendance counts of each employee across all available dates
+                status_index = self._statuses()
                 
                 # Find employees with poor attendance
-                for email, stats in employee_attendance.items():
-                    if stats['total'] > 0:
-                        attendance_rate = (stats['present'] / stats['total']) * 100
+                for email, total, present, absent in status_index.all_counts():
+                    if total > 0:
+                        attendance_rate = (present / total) * 100
                         
                         # Consider employees with <50% attendance as at-risk
                         if attendance_rate < 50:
                             emp_info = self.employee_data.get(email, {})
                             
                             # Find last attendance date
-                            last_attendance_date = None
-                            for date_str in sorted(self.attendance_data.keys(), reverse=True):
-                                if email in self.attendance_data[date_str]:
-                                    if self.attendance_data[date_str][email].get('status') == 'Present':
-                                        last_attendance_date = date_str
-                                        break
+                            last_attendance_date = status_index.last_present(email)
                             
                             at_risk_employees.append({
                                 'id': email.replace('@', '_').replace('.', '_'),
@@ -461,7 +1094,7 @@ class AttendanceDataProcessor:
                                 'role': emp_info.get('title', 'Unknown'),
                                 'risk_score': round(100 - attendance_rate, 1),
                                 'four_week_rate': round(attendance_rate, 1),
-                                'current_streak': stats['absent'],
+                                'current_streak': absent,
                                 'trend': 'declining',
                                 'last_attendance': last_attendance_date or 'Never'
                             })
@@ -481,30 +1114,31 @@ class AttendanceDataProcessor:
                         'id': f'emp_{i+1}',
                         'name': name,
                         'email': f'{name.lower().replace(" ", ".")}.{i+1}@redstone.com',
-                        'location': np.random.choice(['Texas', 'Florida', 'California']),
+                        'location': random.choice(['Texas', 'Florida', 'California']),
                         'role': 'Community Manager',
-                        'risk_score': round(np.random.uniform(75, 95), 1),
-                        'four_week_rate': round(np.random.uniform(0, 40), 1),
+                        'risk_score': round(random.uniform(75, 95), 1),
+                        'four_week_rate': round(random.uniform(0, 40), 1),
                         'current_streak': 0,
                         'trend': 'declining',
-                        'last_attendance': (datetime.now() - timedelta(days=np.random.randint(7, 30))).strftime('%Y-%m-%d')
+                        'last_attendance': (datetime.now() - timedelta(days=random.randrange(7, 30))).strftime('%Y-%m-%d')
                     })
             
             return at_risk_employees
             
         except Exception as e:
-            print(f"Error getting at-risk employees: {e}")
+            logger.error("Error getting at-risk employees", error=str(e))
             return []
     
+    @timed('get_region_detail')
     async def get_region_detail(self, region_name: str) -> Dict[str, Any]:
         """Get detailed data for a specific region"""
         # Generate sample regional detail
         return {
             'region_name': region_name,
-            'total_employees': np.random.randint(40, 80),
-            'present_count': np.random.randint(25, 70),
-            'attendance_rate': round(np.random.uniform(70, 95), 1),
-            'manager_count': np.random.randint(3, 8),
+            'total_employees': random.randrange(40, 80),
+            'present_count': random.randrange(25, 70),
+            'attendance_rate': round(random.uniform(70, 95), 1),
+            'manager_count': random.randrange(3, 8),
             'at_risk_employees': await self.get_at_risk_employees(),
             'top_performers': [
                 {'name': 'Top Performer 1', 'streak': 12},
@@ -516,12 +1150,13 @@ class AttendanceDataProcessor:
         """Acknowledge an alert"""
         try:
             # In a real implementation, this would update the database
-            print(f"Alert {alert_id} acknowledged")
+            logger.info("Alert acknowledged", alert_id=alert_id)
             return True
         except Exception as e:
-            print(f"Error acknowledging alert: {e}")
+            logger.error("Error acknowledging alert", error=str(e))
             return False
     
+    @timed('refresh_data')
     async def refresh_data(self):
         """Refresh data from source"""
         try:
@@ -529,112 +1164,155 @@ class AttendanceDataProcessor:
             # or reload data from the source files
             await self.load_historical_data()
             self.last_refresh = datetime.now()
-            print("📊 Data refreshed successfully")
+            self._commit_change(DASHBOARD_SECTIONS, files=[self.history_file, self.rm_history_file, self.employee_file])
+            logger.info("📊 Data refreshed successfully")
         except Exception as e:
-            print(f"Error refreshing data: {e}")
+            logger.error("Error refreshing data", error=str(e))
             raise
     
-    async def get_detailed_attendance_by_date(self, date: str) -> Dict[str, Any]:
-        """Get detailed attendance for a specific date"""
-        try:
-            if hasattr(self, 'attendance_data') and self.attendance_data:
-                # Check if the date exists in our data
-                if date in self.attendance_data:
-                    date_data = self.attendance_data[date]
-                    detailed_attendees = []
-                    
-                    for email, attendance in date_data.items():
-                        # Get employee info
-                        emp_info = self.employee_data.get(email, {})
-                        
-                        # Format duration from minutes to readable format
-                        duration_minutes = attendance.get('duration_minutes', 0)
-                        if duration_minutes > 0:
-                            hours = int(duration_minutes // 60)
-                            minutes = int(duration_minutes % 60)
-                            if hours > 0:
-                                duration_str = f"{hours}h {minutes}m"
-                            else:
-                                duration_str = f"{minutes}m"
-                        else:
-                            duration_str = "0m"
-                        
-                        # Use the actual name from the data, fall back to employee directory
-                        display_name = attendance.get('name', emp_info.get('name', 'Unknown'))
-                        
-                        attendee_info = {
-                            'email': email,
-                            'name': display_name,
-                            'title': emp_info.get('title', 'Unknown'),
-                            'department': emp_info.get('department', 'Unknown'),
-                            'office': emp_info.get('office', attendance.get('location', 'Unknown')),
-                            'status': attendance.get('status', 'Unknown'),
-                            'join_time': 'N/A',  # Not available in this data format
-                            'leave_time': 'N/A',  # Not available in this data format
-                            'duration': duration_str,
-                            'engagement_score': attendance.get('engagement_score', 0),
-                            'location': attendance.get('location', 'Unknown')
-                        }
-                        detailed_attendees.append(attendee_info)
-                    
-                    # Sort by status (Present first, then Partial, then Absent)
-                    status_order = {'Present': 1, 'Partial': 2, 'Absent': 3}
-                    detailed_attendees.sort(key=lambda x: status_order.get(x['status'], 4))
-                    
-                    # Calculate summary stats
-                    total_employees = len(detailed_attendees)
-                    present_count = sum(1 for emp in detailed_attendees if emp['status'] == 'Present')
-                    partial_count = sum(1 for emp in detailed_attendees if emp['status'] == 'Partial')
-                    absent_count = sum(1 for emp in detailed_attendees if emp['status'] == 'Absent')
-                    
-                    return {
-                        'date': date,
-                        'total_employees': total_employees,
-                        'present_count': present_count,
-                        'partial_count': partial_count,
-                        'absent_count': absent_count,
-                        'attendance_rate': round((present_count / total_employees * 100) if total_employees > 0 else 0, 1),
-                        'detailed_attendees': detailed_attendees
-                    }
-                else:
-                    return None
-            else:
-                return None
-        except Exception as e:
-            print(f"Error getting detailed attendance for date {date}: {e}")
+    @timed('get_detailed_attendance_by_date')
+    async def get_detailed_attendance_by_date(self, date: str, status: Optional[str] = None,
+                                              office: Optional[str] = None, department: Optional[str] = None,
+                                              q: Optional[str] = None, sort: str = 'status',
+                                              limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get detailed attendance for a specific date, optionally filtered and paged.
+        
+        The summary counts cover the whole date; detailed_attendees holds the
+        matching page and page.next_cursor continues it. Raises ValueError for
+        an unknown sort or a malformed cursor.
+        """
+        index = self._attendee_index(date)
+        if index is None:
+            return None
+        result = index.summary()
+        result.update(index.page(sort=sort, status=status, office=office, department=department,
+                                 q=q, limit=limit, cursor=cursor))
+        return result
+    
+    def _attendee_index(self, date: str) -> Optional[AttendeeIndex]:
+        """Pre-sorted attendee index of one date, rebuilt once its data or the directory changes"""
+        date_data = self.attendance_data.get(date) if self.attendance_data else None
+        if date_data is None and (self.store is None or date not in self.historical_data):
             return None
+        
+        employee_data = self.employee_data
+        with self._attendee_index_lock:
+            cached = self._attendee_indexes.get(date)
+            if cached and cached[0] == self.data_version and cached[1] is date_data and cached[2] is employee_data:
+                self._attendee_indexes.move_to_end(date)
+                return cached[3]
+        
+        # Not resident (SQLite storage): read through the cold month cache; the cache entry then holds None for it
+        records = date_data if date_data is not None else self.cold_months.date(date) or {}
+        with span('detailed_attendance.index', date=date, rows=len(records)):
+            index = AttendeeIndex(date, records, employee_data)
+        with self._attendee_index_lock:
+            self._attendee_indexes[date] = (self.data_version, date_data, employee_data, index)
+            self._attendee_indexes.move_to_end(date)
+            while len(self._attendee_indexes) > ATTENDEE_INDEX_DATES:
+                self._attendee_indexes.popitem(last=False)
+        return index
     
+    @timed('get_available_dates')
     async def get_available_dates(self) -> List[str]:
         """Get a list of dates with available attendance data"""
         try:
             if hasattr(self, 'attendance_data') and self.attendance_data:
-                # Return sorted list of available dates
-                dates = sorted(self.attendance_data.keys())
+                # Every loaded date, including the cold months SQLite storage keeps out of memory
+                dates = sorted(self.historical_data)
                 return dates
             else:
                 return []
         except Exception as e:
-            print(f"Error getting available dates: {e}")
+            logger.error("Error getting available dates", error=str(e))
             return []
     
+    @timed('query_attendance_cube')
+    async def query_attendance_cube(self, group_by: List[str], filters: Optional[Dict[str, List[str]]] = None,
+                                    start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, Any]:
+        """Group-by query over the attendance cube (or the Parquet lake); raises ValueError for an unknown dimension"""
+        if self.lake is not None:
+            return self.lake.query(group_by, filters, start, end)
+        return self._attendance_cube().query(group_by, filters, start, end)
+    
+    def export_attendance(self, fmt: str, start: Optional[str] = None, end: Optional[str] = None,
+                          offices: Optional[List[str]] = None, managers: Optional[List[str]] = None) -> Iterator[bytes]:
+        """
+        Raw attendance records of [start, end] as CSV or NDJSON chunks, optionally
+        limited to some offices and managers (see attendance_export). Raises
+        ValueError for an unknown format or a malformed date before streaming.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format {fmt}; expected one of {', '.join(EXPORT_FORMATS)}")
+        validate_range(start, end)
+        rows = export_rows(self._iter_records(start, end), self.employee_data, offices, managers)
+        return csv_chunks(rows) if fmt == 'csv' else ndjson_chunks(rows)
+    
+    def start_excel_export(self, start: Optional[str] = None, end: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Start building the Excel report of [start, end] in the background (see
+        excel_export) and return its job. A report already built for the
+        current data version is returned finished, and None is returned when
+        EXPORT_MAX_JOBS reports are already building. Raises ValueError for a
+        malformed date.
+        """
+        validate_range(start, end)
+        version = self.data_version
+        employee_data = self.employee_data
+        summaries = {date_str: summary for date_str, summary in self.historical_data.items()
+                     if not ((start and date_str < start) or (end and date_str > end))}
+        key = export_key(version, start, end, summaries)
+        meta = {'data_version': version, 'start': start, 'end': end, 'generated_at': generated_at(),
+                'filename': export_filename('xlsx', start, end)}
+        
+        def build(path, progress):
+            with span('excel_export', job=key, dates=len(summaries)) as stage:
+                build_workbook(path, self._iter_records(start, end), employee_data, summaries, meta, progress)
+                stage.set(bytes=path.stat().st_size)
+        
+        job = self.excel_exports.start(key, build, meta)
+        logger.info("📗 Excel export requested", job=key, state=job['state'] if job else 'refused', start=start, end=end)
+        return job
+    
+    def excel_export_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status of an Excel report job, or None for an unknown (or pruned) job"""
+        return self.excel_exports.status(job_id) if job_id.isalnum() else None
+    
+    def excel_export_path(self, job_id: str) -> Optional[Path]:
+        """Workbook of a finished Excel report job, else None"""
+        job = self.excel_export_status(job_id)
+        return self.excel_exports.path(job_id) if job and job['state'] == 'done' else None
+    
+    def _iter_records(self, start: Optional[str], end: Optional[str]) -> Iterator[tuple]:
+        """(date, email, record) of every date in [start, end]: streamed from the store, or from the data loaded when streaming starts"""
+        if self.store is not None:
+            yield from self.store.iter_records(REGULAR, start, end)
+            return
+        attendance_data = self.attendance_data
+        for date_str in sorted(attendance_data):
+            if (start and date_str < start) or (end and date_str > end):
+                continue
+            for email, record in attendance_data[date_str].items():
+                yield date_str, email, record
+    
+    def _statuses(self):
+        """Per-employee status totals: the lake's under ANALYTICS_ENGINE=duckdb, else the status index (plus the cold months' under SQLite storage)"""
+        if self.lake is not None:
+            return self.lake.statuses()
+        if self.store is not None:
+            start = self._resident_start
+            return PartitionedStatuses(self.status_index, self._archive, start,
+                                       lambda email: self.store.email_statuses(REGULAR, email, before=start))
+        return self.status_index
+    
     def _calculate_employee_attendance(self, employee_email: str) -> Dict[str, Any]:
         """Calculate attendance rate for a specific employee"""
         try:
             if not hasattr(self, 'attendance_data') or not self.attendance_data:
                 return {'rate': 0, 'total': 0, 'present': 0, 'absent': 0}
             
-            total_days = 0
-            present_days = 0
-            absent_days = 0
-            
-            for date_str, date_data in self.attendance_data.items():
-                if employee_email in date_data:
-                    total_days += 1
-                    status = date_data[employee_email].get('status', 'Absent')
-                    if status == 'Present':
-                        present_days += 1
-                    elif status == 'Absent':
-                        absent_days += 1
+            total_days, present_days, absent_days = self._statuses().counts(employee_email)
             
             rate = (present_days / total_days * 100) if total_days > 0 else 0
             
@@ -645,7 +1323,7 @@ class AttendanceDataProcessor:
                 'absent': absent_days
             }
         except Exception as e:
-            print(f"Error calculating attendance for {employee_email}: {e}")
+            logger.error("Error calculating attendance", employee=employee_email, error=str(e))
             return {'rate': 0, 'total': 0, 'present': 0, 'absent': 0}
     
     def _calculate_employee_attendance_with_rm(self, employee_email: str, manager_type: str) -> Dict[str, Any]:
@@ -654,26 +1332,17 @@ class AttendanceDataProcessor:
             if not hasattr(self, 'attendance_data') or not self.attendance_data:
                 return {'rate': 0, 'total': 0, 'present': 0, 'absent': 0}
             
-            total_days = 0
-            present_days = 0
-            absent_days = 0
-            
-            # First check regular attendance data for all dates
-            for date_str, date_data in self.attendance_data.items():
-                if employee_email in date_data:
-                    total_days += 1
-                    status = date_data[employee_email].get('status', 'Absent')
-                    if status == 'Present':
-                        present_days += 1
-                    elif status == 'Absent':
-                        absent_days += 1
+            # First count regular attendance data for all dates
+            statuses = self._statuses()
+            total_days, present_days, absent_days = statuses.counts(employee_email)
             
             # For Regional Managers, also check the RM attendance data for all dates
             if manager_type == 'Regional Manager' and hasattr(self, 'rm_attendance_data') and self.rm_attendance_data:
                 for date_str, rm_date_data in self.rm_attendance_data.items():
                     if employee_email in rm_date_data:
                         # Check if we already counted this date in regular attendance
-                        if date_str not in self.attendance_data or employee_email not in self.attendance_data[date_str]:
+                        regular_status = statuses.status(date_str, employee_email)
+                        if regular_status == MISSING:
                             total_days += 1
                             status = rm_date_data[employee_email].get('status', 'Absent')
                             if status == 'Present':
@@ -683,13 +1352,12 @@ class AttendanceDataProcessor:
                         else:
                             # If we have both regular and RM data for the same date, prefer RM data for Regional Managers
                             # Remove the regular attendance count and add RM data
-                            regular_status = self.attendance_data[date_str][employee_email].get('status', 'Absent')
                             rm_status = rm_date_data[employee_email].get('status', 'Absent')
                             
                             # Adjust counts by removing regular data and adding RM data
-                            if regular_status == 'Present':
+                            if regular_status == PRESENT:
                                 present_days -= 1
-                            elif regular_status == 'Absent':
+                            elif regular_status == ABSENT:
                                 absent_days -= 1
                             
                             if rm_status == 'Present':
@@ -706,7 +1374,7 @@ class AttendanceDataProcessor:
                 'absent': absent_days
             }
         except Exception as e:
-            print(f"Error calculating attendance with RM data for {employee_email}: {e}")
+            logger.error("Error calculating attendance with RM data", employee=employee_email, error=str(e))
             return {'rate': 0, 'total': 0, 'present': 0, 'absent': 0}
     
     def _calculate_team_performance(self, team_member_emails: List[str], recent_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -752,7 +1420,7 @@ class AttendanceDataProcessor:
                 'at_risk_count': at_risk_count
             }
         except Exception as e:
-            print(f"Error calculating team performance: {e}")
+            logger.error("Error calculating team performance", error=str(e))
             return {
                 'attendance_rate': 0,
                 'present_count': 0,
@@ -760,7 +1428,8 @@ class AttendanceDataProcessor:
                 'at_risk_count': 0
             }
     
-    def _create_manager_data(self, manager_email: str, manager_info: Dict[str, Any], recent_data: Dict[str, Any], manager_type: str) -> Dict[str, Any]:
+    def _create_manager_data(self, manager_email: str, manager_info: Dict[str, Any], recent_data: Dict[str, Any], manager_type: str,
+                             teams: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
         """Create manager data object with personal and team performance"""
         try:
             # Calculate manager's personal attendance (including RM data for Regional Managers)
@@ -771,10 +1440,13 @@ class AttendanceDataProcessor:
             manager_name = manager_info.get('name', '').strip('"')
             
             # Look for employees who report to this manager
-            for email, emp_info in self.employee_data.items():
-                emp_manager = emp_info.get('manager', '').strip('"')
-                if emp_manager == manager_name and email != manager_email:
-                    team_members.append(email)
+            if teams is not None:
+                team_members = [email for email in teams.get(manager_name, ()) if email != manager_email]
+            else:
+                for email, emp_info in self.employee_data.items():
+                    emp_manager = emp_info.get('manager', '').strip('"')
+                    if emp_manager == manager_name and email != manager_email:
+                        team_members.append(email)
             
             # Calculate team performance
             team_stats = self._calculate_team_performance(team_members, recent_data)
@@ -822,56 +1494,70 @@ class AttendanceDataProcessor:
                 'trend': 'stable'  # Would need historical data for real trend
             }
         except Exception as e:
-            print(f"Error creating manager data for {manager_email}: {e}")
+            logger.error("Error creating manager data", manager=manager_email, error=str(e))
             return {}
     
+    @timed('process_directory_file')
     async def process_directory_file(self, file_path: str) -> bool:
         """Process uploaded directory file and update employee data"""
+        started = time.perf_counter()
         try:
             import pandas as pd
             
             # Determine file type and read accordingly
-            if file_path.endswith('.csv'):
-                # Try different encodings for CSV files
-                try:
-                    df = pd.read_csv(file_path, encoding='utf-8')
-                except UnicodeDecodeError:
+            with span('directory.parse', file=os.path.basename(file_path)) as stage:
+                if file_path.endswith('.csv'):
+                    # Try different encodings for CSV files
                     try:
-                        df = pd.read_csv(file_path, encoding='latin-1')
+                        df = pd.read_csv(file_path, encoding='utf-8')
                     except UnicodeDecodeError:
-                        df = pd.read_csv(file_path, encoding='cp1252')
-            elif file_path.endswith(('.xlsx', '.xls')):
-                df = pd.read_excel(file_path)
-            else:
-                raise ValueError(f"Unsupported file type: {file_path}")
+                        try:
+                            df = pd.read_csv(file_path, encoding='latin-1')
+                        except UnicodeDecodeError:
+                            df = pd.read_csv(file_path, encoding='cp1252')
+                elif file_path.endswith(('.xlsx', '.xls')):
+                    df = pd.read_excel(file_path)
+                else:
+                    raise ValueError(f"Unsupported file type: {file_path}")
+                stage.set(rows=len(df))
             
             # Process the directory data
-            updated_count = 0
-            for _, row in df.iterrows():
-                email = str(row.get('email', '')).strip()
-                if email and '@' in email:
-                    self.employee_data[email] = {
-                        "name": str(row.get('name', '')).strip('"'),
-                        "title": str(row.get('title', '')).strip('"'),
-                        "department": str(row.get('department', '')).strip('"'),
-                        "office": str(row.get('office', '')).strip('"'),
-                        "manager": str(row.get('manager', '')).strip('"'),
-                        "email": email
-                    }
-                    updated_count += 1
+            with span('directory.apply', rows=len(df)):
+                updated_count = 0
+                for _, row in df.iterrows():
+                    email = str(row.get('email', '')).strip()
+                    if email and '@' in email:
+                        self.employee_data[email] = {
+                            "name": str(row.get('name', '')).strip('"'),
+                            "title": str(row.get('title', '')).strip('"'),
+                            "department": str(row.get('department', '')).strip('"'),
+                            "office": str(row.get('office', '')).strip('"'),
+                            "manager": str(row.get('manager', '')).strip('"'),
+                            "email": email
+                        }
+                        updated_count += 1
             
-            # No need to save to file - just keep in memory for now
-            # The data processor will use the in-memory data
+            if self.store is not None:
+                self.store.save_directory(self.employee_data, source=os.path.basename(file_path))
+            if self.lake is not None:
+                self.lake.write_directory(self.employee_data)
+            self._rebuild_cube()
             
-            print(f"✅ Processed directory file: {updated_count} employees updated in memory")
+            # Persist the merged directory so other workers (and restarts) see it
+            self._save_employee_data()
+            self._commit_change(DIRECTORY_SECTIONS, files=[self.employee_file])
+            record_ingestion('directory_upload', started, updated_count)
+            logger.info("✅ Processed directory file", employees=updated_count)
             return True
             
         except Exception as e:
-            print(f"❌ Error processing directory file: {e}")
+            logger.error("❌ Error processing directory file", error=str(e))
             return False
     
+    @timed('process_attendance_file')
     async def process_attendance_file(self, file_path: str) -> bool:
         """Process uploaded attendance file and update attendance data"""
+        started = time.perf_counter()
         try:
             import pandas as pd
             import io
@@ -883,43 +1569,45 @@ class AttendanceDataProcessor:
                 # Try to read as Teams attendance report (UTF-16 format)
                 try:
                     # Read the file with UTF-16 encoding (Teams format)
-                    with open(file_path, 'r', encoding='utf-16-le') as f:
-                        content = f.read()
-                    
-                    lines = content.split('\n')
+                    with span('teams.parse', file=os.path.basename(file_path)) as stage:
+                        with open(file_path, 'r', encoding='utf-16-le') as f:
+                            content = f.read()
                     
-                    # Find the participants section
-                    data_start = None
-                    for i, line in enumerate(lines):
-                        if 'Name\tFirst Join' in line or 'Name\tEmail' in line:
-                            data_start = i
-                            break
+                        lines = content.split('\n')
                     
-                    if data_start is None:
-                        # Try to find participants section differently
+                        # Find the participants section
+                        data_start = None
                         for i, line in enumerate(lines):
-                            if 'Participants' in line:
-                                # Look for the next line with headers
-                                for j in range(i+1, len(lines)):
-                                    if 'Name\t' in lines[j] and 'Email' in lines[j]:
-                                        data_start = j
-                                        break
+                            if 'Name\tFirst Join' in line or 'Name\tEmail' in line:
+                                data_start = i
                                 break
                     
-                    if data_start is None:
-                        raise ValueError("Could not find participants section in Teams report")
+                        if data_start is None:
+                            # Try to find participants section differently
+                            for i, line in enumerate(lines):
+                                if 'Participants' in line:
+                                    # Look for the next line with headers
+                                    for j in range(i+1, len(lines)):
+                                        if 'Name\t' in lines[j] and 'Email' in lines[j]:
+                                            data_start = j
+                                            break
+                                    break
+                    
+                        if data_start is None:
+                            raise ValueError("Could not find participants section in Teams report")
                     
-                    # Extract participant data lines
-                    participant_lines = []
-                    for line in lines[data_start:]:
-                        if line.strip() and not line.startswith('3.') and not line.startswith('4.'):
-                            participant_lines.append(line)
+                        # Extract participant data lines
+                        participant_lines = []
+                        for line in lines[data_start:]:
+                            if line.strip() and not line.startswith('3.') and not line.startswith('4.'):
+                                participant_lines.append(line)
                     
-                    if len(participant_lines) < 2:  # Need at least header + 1 data row
-                        raise ValueError("No participant data found in Teams report")
+                        if len(participant_lines) < 2:  # Need at least header + 1 data row
+                            raise ValueError("No participant data found in Teams report")
                     
-                    # Parse as tab-separated values
-                    teams_df = pd.read_csv(io.StringIO('\n'.join(participant_lines)), sep='\t')
+                        # Parse as tab-separated values
+                        teams_df = pd.read_csv(io.StringIO('\n'.join(participant_lines)), sep='\t')
+                        stage.set(rows=len(teams_df))
                     
                     # Function to parse duration from Teams format (e.g., "1h 23m 45s")
                     def parse_duration(duration_str):
@@ -945,41 +1633,42 @@ class AttendanceDataProcessor:
                         return total_minutes
                     
                     # Process the Teams data
-                    if 'In-Meeting Duration' in teams_df.columns:
-                        teams_df['duration_minutes'] = teams_df['In-Meeting Duration'].apply(parse_duration)
-                    else:
-                        teams_df['duration_minutes'] = 0
+                    with span('teams.derive', rows=len(teams_df)):
+                        if 'In-Meeting Duration' in teams_df.columns:
+                            teams_df['duration_minutes'] = teams_df['In-Meeting Duration'].apply(parse_duration)
+                        else:
+                            teams_df['duration_minutes'] = 0
                     
-                    # Determine attendance status based on duration (80% of 60 minutes = 48 minutes)
-                    teams_df['attended_80_percent'] = teams_df['duration_minutes'] >= 48
+                        # Determine attendance status based on duration (80% of 60 minutes = 48 minutes)
+                        teams_df['attended_80_percent'] = teams_df['duration_minutes'] >= 48
                     
-                    # Clean email and name columns
-                    if 'Email' in teams_df.columns:
-                        teams_df['email_clean'] = teams_df['Email'].str.lower().str.strip()
-                    else:
-                        teams_df['email_clean'] = ''
+                        # Clean email and name columns
+                        if 'Email' in teams_df.columns:
+                            teams_df['email_clean'] = teams_df['Email'].str.lower().str.strip()
+                        else:
+                            teams_df['email_clean'] = ''
                     
-                    if 'Name' in teams_df.columns:
-                        teams_df['name_clean'] = teams_df['Name'].str.strip()
-                    else:
-                        teams_df['name_clean'] = ''
+                        if 'Name' in teams_df.columns:
+                            teams_df['name_clean'] = teams_df['Name'].str.strip()
+                        else:
+                            teams_df['name_clean'] = ''
                     
-                    # Calculate engagement score
-                    def calculate_engagement(row):
-                        score = 0
-                        if pd.notna(row.get('Engagement: Camera On', 0)) and row.get('Engagement: Camera On', 0) > 0:
-                            score += 30
-                        if pd.notna(row.get('Engagement: Unmute', 0)) and row.get('Engagement: Unmute', 0) > 0:
-                            score += 30
-                        reaction_cols = ['Engagement: Reaction-Applause', 'Engagement: Reaction-Laugh',
-                                        'Engagement: Reaction-Like', 'Engagement: Reaction-Love',
-                                        'Engagement: Reaction-Surprised', 'Engagement: Raise Hands']
-                        for col in reaction_cols:
-                            if pd.notna(row.get(col, 0)) and row.get(col, 0) > 0:
-                                score += 10
-                        return min(100, score)
+                        # Calculate engagement score
+                        def calculate_engagement(row):
+                            score = 0
+                            if pd.notna(row.get('Engagement: Camera On', 0)) and row.get('Engagement: Camera On', 0) > 0:
+                                score += 30
+                            if pd.notna(row.get('Engagement: Unmute', 0)) and row.get('Engagement: Unmute', 0) > 0:
+                                score += 30
+                            reaction_cols = ['Engagement: Reaction-Applause', 'Engagement: Reaction-Laugh',
+                                            'Engagement: Reaction-Like', 'Engagement: Reaction-Love',
+                                            'Engagement: Reaction-Surprised', 'Engagement: Raise Hands']
+                            for col in reaction_cols:
+                                if pd.notna(row.get(col, 0)) and row.get(col, 0) > 0:
+                                    score += 10
+                            return min(100, score)
                     
-                    teams_df['engagement_score'] = teams_df.apply(calculate_engagement, axis=1)
+                        teams_df['engagement_score'] = teams_df.apply(calculate_engagement, axis=1)
                     
                     # Get the meeting date from the filename or use current date
                     meeting_date = None
@@ -1018,76 +1707,78 @@ class AttendanceDataProcessor:
                     if not meeting_date:
                         meeting_date = datetime.now().strftime('%Y-%m-%d')
                     
-                    # Initialize date in attendance data if not exists
-                    if meeting_date not in self.attendance_data:
-                        self.attendance_data[meeting_date] = {}
+                    # Records go into a copy of the date, published by _save_attendance_data
+                    date_data = self._copy_date(meeting_date)
                     
                     # Process each participant
-                    processed_count = 0
-                    for _, participant in teams_df.iterrows():
-                        email = participant.get('email_clean', '').strip()
-                        name = participant.get('name_clean', '').strip()
-                        duration_minutes = participant.get('duration_minutes', 0)
-                        engagement_score = participant.get('engagement_score', 0)
+                    with span('teams.apply', rows=len(teams_df), date=meeting_date):
+                        processed_count = 0
+                        for _, participant in teams_df.iterrows():
+                            email = participant.get('email_clean', '').strip()
+                            name = participant.get('name_clean', '').strip()
+                            duration_minutes = participant.get('duration_minutes', 0)
+                            engagement_score = participant.get('engagement_score', 0)
                         
-                        # Skip if no email or name
-                        if not email and not name:
-                            continue
+                            # Skip if no email or name
+                            if not email and not name:
+                                continue
                         
-                        # Determine status based on duration
-                        if duration_minutes >= 48:  # 80% of 60 minutes
-                            status = 'Present'
-                        elif duration_minutes > 0:
-                            status = 'Partial'
-                        else:
-                            status = 'Absent'
+                            # Determine status based on duration
+                            if duration_minutes >= 48:  # 80% of 60 minutes
+                                status = 'Present'
+                            elif duration_minutes > 0:
+                                status = 'Partial'
+                            else:
+                                status = 'Absent'
                         
-                        # Use email as key, fall back to name if no email
-                        key = email if email else name
+                            # Use email as key, fall back to name if no email
+                            key = email if email else name
                         
-                        # Get employee name from directory if available
-                        emp_name = name
-                        if email and email in self.employee_data:
-                            emp_name = self.employee_data[email].get('name', name)
+                            # Get employee name from directory if available
+                            emp_name = name
+                            if email and email in self.employee_data:
+                                emp_name = self.employee_data[email].get('name', name)
                         
-                        # Add attendance record
-                        self.attendance_data[meeting_date][key] = {
-                            'name': emp_name,
-                            'status': status,
-                            'duration': duration_minutes,
-                            'duration_minutes': duration_minutes,
-                            'engagement_score': engagement_score,
-                            'location': self.employee_data.get(email, {}).get('office', 'Unknown') if email else 'Unknown'
-                        }
+                            # Add attendance record
+                            date_data[key] = {
+                                'name': emp_name,
+                                'status': status,
+                                'duration': duration_minutes,
+                                'duration_minutes': duration_minutes,
+                                'engagement_score': engagement_score,
+                                'location': self.employee_data.get(email, {}).get('office', 'Unknown') if email else 'Unknown'
+                            }
                         
-                        processed_count += 1
+                            processed_count += 1
                     
                     # Save updated attendance data
-                    await self._save_attendance_data()
+                    await self._save_attendance_data({meeting_date: date_data})
+                    record_ingestion('teams_report', started, processed_count)
                     
-                    print(f"✅ Processed Teams attendance file: {processed_count} participants for {meeting_date}")
+                    logger.info("✅ Processed Teams attendance file", participants=processed_count, date=meeting_date)
                     return True
                     
                 except Exception as teams_error:
-                    print(f"⚠️ Failed to process as Teams report: {teams_error}")
+                    logger.warning("⚠️ Failed to process as Teams report", error=str(teams_error))
                     # Fall back to regular CSV processing
                     pass
                 
                 # If Teams processing failed, try regular CSV processing
-                df = None
-                for encoding in ['utf-8', 'latin-1', 'cp1252']:
-                    for sep in [',', ';', '\t']:
-                        try:
-                            df = pd.read_csv(file_path, encoding=encoding, sep=sep, on_bad_lines='skip')
-                            if not df.empty and len(df.columns) > 1:
-                                break
-                        except (UnicodeDecodeError, pd.errors.ParserError):
-                            continue
-                    if df is not None and not df.empty:
-                        break
+                with span('attendance_csv.parse', file=os.path.basename(file_path)):
+                    df = None
+                    for encoding in ['utf-8', 'latin-1', 'cp1252']:
+                        for sep in [',', ';', '\t']:
+                            try:
+                                df = pd.read_csv(file_path, encoding=encoding, sep=sep, on_bad_lines='skip')
+                                if not df.empty and len(df.columns) > 1:
+                                    break
+                            except (UnicodeDecodeError, pd.errors.ParserError):
+                                continue
+                        if df is not None and not df.empty:
+                            break
                 
-                if df is None or df.empty:
-                    raise ValueError("Could not parse CSV file with any encoding/separator combination")
+                    if df is None or df.empty:
+                        raise ValueError("Could not parse CSV file with any encoding/separator combination")
                 
                 # Process regular CSV with expected columns: Date, Employee, Status
                 required_columns = ['Date', 'Employee', 'Status']
@@ -1098,41 +1789,41 @@ class AttendanceDataProcessor:
                 
                 df.columns = df.columns.str.lower()
                 
-                dates_processed = set()
-                for _, row in df.iterrows():
-                    date_str = str(row['date']).strip()
-                    email = str(row['employee']).strip()
-                    status = str(row['status']).strip()
-                    duration = row.get('duration', 0) if 'duration' in df.columns else 0
+                with span('attendance_csv.apply', rows=len(df)):
+                    updates = {}
+                    for _, row in df.iterrows():
+                        date_str = str(row['date']).strip()
+                        email = str(row['employee']).strip()
+                        status = str(row['status']).strip()
+                        duration = row.get('duration', 0) if 'duration' in df.columns else 0
                     
-                    # Parse date
-                    try:
-                        parsed_date = datetime.strptime(date_str, '%Y-%m-%d')
-                        date_str = parsed_date.strftime('%Y-%m-%d')
-                    except:
+                        # Parse date
                         try:
-                            parsed_date = datetime.strptime(date_str, '%m/%d/%Y')
+                            parsed_date = datetime.strptime(date_str, '%Y-%m-%d')
                             date_str = parsed_date.strftime('%Y-%m-%d')
                         except:
-                            continue
-                    
-                    if date_str not in self.attendance_data:
-                        self.attendance_data[date_str] = {}
+                            try:
+                                parsed_date = datetime.strptime(date_str, '%m/%d/%Y')
+                                date_str = parsed_date.strftime('%Y-%m-%d')
+                            except:
+                                continue
                     
-                    emp_name = self.employee_data.get(email, {}).get('name', email)
+                        if date_str not in updates:
+                            updates[date_str] = self._copy_date(date_str)
                     
-                    self.attendance_data[date_str][email] = {
-                        'name': emp_name,
-                        'status': status,
-                        'duration': duration,
-                        'duration_minutes': duration,
-                        'location': self.employee_data.get(email, {}).get('office', 'Unknown')
-                    }
+                        emp_name = self.employee_data.get(email, {}).get('name', email)
                     
-                    dates_processed.add(date_str)
+                        updates[date_str][email] = {
+                            'name': emp_name,
+                            'status': status,
+                            'duration': duration,
+                            'duration_minutes': duration,
+                            'location': self.employee_data.get(email, {}).get('office', 'Unknown')
+                        }
                 
-                await self._save_attendance_data()
-                print(f"✅ Processed regular CSV attendance file: {len(dates_processed)} dates updated")
+                await self._save_attendance_data(updates)
+                record_ingestion('attendance_csv', started, len(df))
+                logger.info("✅ Processed regular CSV attendance file", dates=len(updates))
                 return True
                 
             elif file_path.endswith(('.xlsx', '.xls')):
@@ -1154,11 +1845,9 @@ class AttendanceDataProcessor:
                             json_data = json.load(f)
                 
                 if isinstance(json_data, dict) and all(isinstance(v, dict) for v in json_data.values()):
-                    for date_str, date_data in json_data.items():
-                        self.attendance_data[date_str] = date_data
-                    
-                    await self._save_attendance_data()
-                    print(f"✅ Processed attendance JSON file: {len(json_data)} dates updated")
+                    await self._save_attendance_data(json_data)
+                    record_ingestion('attendance_json', started, sum(len(records) for records in json_data.values()))
+                    logger.info("✅ Processed attendance JSON file", dates=len(json_data))
                     return True
                 else:
                     raise ValueError("JSON file format not recognized")
@@ -1166,23 +1855,63 @@ class AttendanceDataProcessor:
                 raise ValueError(f"Unsupported file type: {file_path}")
             
         except Exception as e:
-            print(f"❌ Error processing attendance file: {e}")
+            logger.error("❌ Error processing attendance file", error=str(e))
             return False
     
-    async def _save_attendance_data(self):
-        """Save attendance data to JSON file"""
+    async def _save_attendance_data(self, updates: Dict[str, Dict[str, Any]]):
+        """
+        Save whole dates of attendance records to the JSON file (or to SQLite),
+        swap them into memory and announce them. The dicts in ``updates`` must
+        be new ones, never the live ``attendance_data[date]`` being read by
+        request threads.
+        """
+        dates = list(updates)
         try:
-            parent_dir = Path(__file__).parent.parent.parent.parent.parent
-            history_path = parent_dir / self.history_file
+            if self.store is not None:
+                with span('store.upsert', dates=len(updates)) as stage:
+                    stage.set(rows=self.store.upsert_dates(REGULAR, updates))
+                with span('history.aggregate', dates=len(updates)):
+                    self._replace_dates(updates)
+                self._commit_change(DASHBOARD_SECTIONS, files=[self.history_file], dates=dates)
+                logger.info("✅ Saved attendance data", path=str(self.store.path), dates=len(updates))
+                return
             
-            with open(history_path, 'w', encoding='utf-8') as f:
-                json.dump(self.attendance_data, f, indent=2, ensure_ascii=False)
+            # Commit a new snapshot version; compacting folds any pending sync deltas into the base file
+            attendance_data = {**self.attendance_data, **updates}
+            with span('history.serialize', dates=len(attendance_data)), self.snapshots.stage() as staged:
+                HistoryDeltaLog(staged.path, self.history_file).compact(attendance_data)
+            history_path = self.snapshots.path(self.history_file)
             
-            # Reprocess historical data
-            self.historical_data = self._process_attendance_data()
+            with span('history.aggregate', dates=len(updates)):
+                self._replace_dates(updates)
+            self._commit_change(DASHBOARD_SECTIONS, files=[self.history_file], dates=dates)
             
-            print(f"✅ Saved attendance data to {history_path}")
+            logger.info("✅ Saved attendance data", path=str(history_path))
             
         except Exception as e:
-            print(f"❌ Error saving attendance data: {e}")
+            logger.error("❌ Error saving attendance data", error=str(e))
             raise
+    
+    def _save_employee_data(self):
+        """Save the employee directory in the CSV layout load_employee_data reads"""
+        fieldnames = ['name', 'title', 'department', 'office', 'manager', 'email']
+        
+        def write(f):
+            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(self.employee_data.values())
+        
+        with span('directory.serialize', employees=len(self.employee_data)), self.snapshots.stage() as staged:
+            self._write_atomically(staged.path / self.employee_file, write, newline='')
+        logger.info("✅ Saved employee records", employees=len(self.employee_data),
+                    path=str(self.snapshots.path(self.employee_file)))
+    
+    def _write_atomically(self, path: Path, write, newline=None):
+        """Write a data file via a temp file and rename, so readers never see it half-written"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8', newline=newline) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
@@ -0,0 +1,71 @@
+import json
+import threading
+from collections import deque
+from typing import Any, Iterable, Optional, Set
+
+
+class ChangeStream:
+    """
+    Thread-safe record of data versions for Server-Sent Events streams.
+
+    The data processor publishes each committed version together with the
+    dashboard sections it touched; every open stream blocks in
+    ``wait_for_change`` until the version moves past the one it last sent.
+    Under gunicorn's gevent worker the condition variable is cooperative, so
+    thousands of idle streams cost one greenlet each.
+    """
+
+    def __init__(self, history: int = 64):
+        self._condition = threading.Condition()
+        self._history = deque(maxlen=history)
+        self.version = 0
+
+    def publish(self, version: int, sections: Iterable[str]):
+        """Record a new data version and wake every waiting stream"""
+        with self._condition:
+            self.version = version
+            self._history.append((version, frozenset(sections)))
+            self._condition.notify_all()
+
+    def wait_for_change(self, since: int, timeout: float) -> int:
+        """Block until the version differs from ``since`` or the timeout expires"""
+        with self._condition:
+            self._condition.wait_for(lambda: self.version != since, timeout=timeout)
+            return self.version
+
+    def sections_since(self, since: Optional[int]) -> Optional[Set[str]]:
+        """
+        Union of sections changed after ``since``.
+
+        Returns None when the history no longer reaches back that far (or the
+        caller has never seen a version), meaning everything must be resent.
+        """
+        if since is None:
+            return None
+        with self._condition:
+            entries = [(v, s) for v, s in self._history if v > since]
+            if not entries or entries[0][0] != since + 1:
+                return None if self.version != since else set()
+            changed = set()
+            for _, sections in entries:
+                changed.update(sections)
+            return changed
+
+
+def format_event(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    """Format a single Server-Sent Event frame"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    payload = data if isinstance(data, str) else json.dumps(data, default=_json_default)
+    for line in payload.splitlines() or ['']:
+        lines.append(f"data: {line}")
+    return '\n'.join(lines) + '\n\n'
+
+
+def _json_default(value):
+    """Serialize numpy scalars from the processor like jsonify would"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
@@ -0,0 +1,311 @@
+import hashlib
+import json
+import os
+import re
+import socket
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .attendance_export import export_rows
+from .change_bus import locked_file
+from .snapshot import write_atomically
+
+try:
+    import gevent
+    from gevent import monkey as gevent_monkey
+except ImportError:  # Only installed for the gevent gunicorn worker
+    gevent = gevent_monkey = None
+
+# Excel attendance reports, built in the background.
+#
+# A report is one write-only openpyxl workbook:
+#
+#     Summary            per-date counts of the range, then one row per manager
+#     <manager> ...      one sheet per manager: each direct report's totals over the range
+#     <date> ...         one sheet per meeting date: every record, joined to the directory
+#
+# Write-only sheets stream their rows to temporary files, and the records
+# are read in one pass in date order (row by row from SQLite under SQLite
+# storage): each date's sheet is written and closed before the next, while
+# per-employee counters for the manager sheets accumulate on the side. The
+# workbook therefore costs O(employees) memory, whatever the history length.
+#
+# Jobs are keyed by the data version and range, and their state lives in
+# small JSON files next to the workbooks (EXPORT_DIR, default data/exports),
+# so any gunicorn worker can report a job's progress or serve its workbook,
+# and asking again for an already built report is answered from the file.
+# At most EXPORT_MAX_JOBS reports build at once across all workers; a new
+# range asked for beyond that is refused until one finishes.
+
+# Workbooks kept in the export directory, newest first
+EXPORT_KEEP = int(os.getenv('EXPORT_KEEP', '10'))
+# Reports building at once, across all workers sharing the export directory
+EXPORT_MAX_JOBS = int(os.getenv('EXPORT_MAX_JOBS', '2'))
+# A running job whose status has not been updated for this long is considered dead, whatever
+# its worker. Progress is not written while the workbook is saved, so this is far longer than
+# the longest build; a job of a worker that exited is noticed right away (see _stale)
+STALE_JOB_SECONDS = 3600
+# Minimum seconds between two progress writes of one job
+PROGRESS_INTERVAL = 0.5
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+SUMMARY_SHEET = 'Summary'
+DATE_HEADER = ('Email', 'Name', 'Status', 'Minutes', 'Engagement', 'Office', 'Department', 'Title', 'Manager')
+MANAGER_HEADER = ('Email', 'Name', 'Title', 'Office', 'Dates recorded', 'Present', 'Partial', 'Absent',
+                  'Attendance rate %', 'Last present')
+
+_INVALID_TITLE = re.compile(r'[\[\]:*?/\\]')
+_HOST = socket.gethostname()
+# Keys of the jobs this process is building
+_building = set()
+
+
+def sheet_title(name: str, used: set) -> str:
+    """A unique worksheet title (Excel allows 31 characters and none of []:*?/\\)"""
+    base = _INVALID_TITLE.sub(' ', name or 'Unknown').strip()[:31] or 'Unknown'
+    title, suffix = base, 2
+    while title.lower() in used:
+        title = f"{base[:31 - len(str(suffix)) - 1]}~{suffix}"
+        suffix += 1
+    used.add(title.lower())
+    return title
+
+
+def _rate(present: int, total: int) -> float:
+    return round(present / total * 100, 1) if total else 0
+
+
+def build_workbook(path: Path, records: Iterable[Tuple[str, str, Dict[str, Any]]],
+                   employee_data: Dict[str, Dict[str, Any]], summaries: Dict[str, Dict[str, Any]],
+                   meta: Dict[str, Any], progress: Callable[[float, str], None]):
+    """
+    Write the report workbook to ``path``.
+
+    ``records`` yields (date, email, record) in date order, ``summaries``
+    holds the per-date counts of the same dates (the processor's
+    historical_data) and sizes the progress; ``progress(fraction, stage)``
+    is called as rows are written.
+    """
+    from openpyxl import Workbook  # Imports numpy when installed, so only once a report is built
+
+    workbook = Workbook(write_only=True)
+    used: set = set()
+    summary_sheet = workbook.create_sheet(sheet_title(SUMMARY_SHEET, used))
+
+    # Manager sheets are created up front so they sit before the date sheets
+    teams: Dict[str, List[str]] = {}
+    for email, info in employee_data.items():
+        teams.setdefault(info.get('manager') or 'Unknown', []).append(email)
+    manager_sheets = {manager: workbook.create_sheet(sheet_title(manager, used)) for manager in sorted(teams)}
+
+    # email -> [recorded, present, partial, absent, last present]
+    totals: Dict[str, List[Any]] = {}
+    expected = sum(summary.get('total_count', 0) for summary in summaries.values()) or 1
+    written = 0
+    date_sheet = None
+    current_date = None
+    for row in export_rows(records, employee_data):
+        date = row['date']
+        if date != current_date:
+            if date_sheet is not None:
+                date_sheet.close()
+            date_sheet = workbook.create_sheet(sheet_title(date, used))
+            date_sheet.append(DATE_HEADER)
+            current_date = date
+            progress(0.9 * written / expected, f"Writing {date}")
+        date_sheet.append((row['email'], row['name'], row['status'], row['duration_minutes'], row['engagement_score'],
+                           row['office'], row['department'], row['title'], row['manager']))
+
+        counters = totals.get(row['email'])
+        if counters is None:
+            counters = totals[row['email']] = [0, 0, 0, 0, None]
+        counters[0] += 1
+        status = row['status']
+        if status == 'Present':
+            counters[1] += 1
+            counters[4] = date
+        elif status == 'Partial':
+            counters[2] += 1
+        elif status == 'Absent':
+            counters[3] += 1
+        written += 1
+    if date_sheet is not None:
+        date_sheet.close()
+
+    # Employees with records but no directory entry report to 'Unknown'
+    for email in totals:
+        if email not in employee_data:
+            teams.setdefault('Unknown', []).append(email)
+    if 'Unknown' in teams and 'Unknown' not in manager_sheets:
+        manager_sheets['Unknown'] = workbook.create_sheet(sheet_title('Unknown', used))
+
+    manager_rows = []
+    for position, (manager, sheet) in enumerate(sorted(manager_sheets.items())):
+        progress(0.9 + 0.09 * position / max(len(manager_sheets), 1), f"Writing manager {manager}")
+        sheet.append(MANAGER_HEADER)
+        team_totals = [0, 0, 0, 0]
+        for email in sorted(teams[manager], key=lambda email: (employee_data.get(email) or {}).get('name') or email):
+            info = employee_data.get(email) or {}
+            recorded, present, partial, absent, last_present = totals.get(email) or (0, 0, 0, 0, None)
+            sheet.append((email, info.get('name'), info.get('title'), info.get('office'), recorded, present,
+                          partial, absent, _rate(present, recorded), last_present))
+            for index, value in enumerate((recorded, present, partial, absent)):
+                team_totals[index] += value
+        sheet.close()
+        manager_rows.append((manager, len(teams[manager])) + tuple(team_totals) +
+                            (_rate(team_totals[1], team_totals[0]),))
+
+    progress(0.99, "Writing summary")
+    summary_sheet.append(('Attendance report',))
+    summary_sheet.append(('Generated', meta.get('generated_at')))
+    summary_sheet.append(('Data version', meta.get('data_version')))
+    summary_sheet.append(('From', meta.get('start') or (min(summaries) if summaries else None)))
+    summary_sheet.append(('To', meta.get('end') or (max(summaries) if summaries else None)))
+    summary_sheet.append(())
+    summary_sheet.append(('Date', 'Records', 'Present', 'Partial', 'Absent', 'Attendance rate %'))
+    for date in sorted(summaries):
+        summary = summaries[date]
+        summary_sheet.append((date, summary.get('total_count', 0), summary.get('present_count', 0),
+                              summary.get('partial_count', 0), summary.get('absent_count', 0),
+                              round(summary.get('attendance_rate', 0), 1)))
+    summary_sheet.append(())
+    summary_sheet.append(('Manager', 'Team size', 'Records', 'Present', 'Partial', 'Absent', 'Attendance rate %'))
+    for row in manager_rows:
+        summary_sheet.append(row)
+    workbook.save(str(path))
+
+
+class ExcelExportJobs:
+    """
+    Background report builds with their progress, shared through the export directory.
+
+    ``start(key, build)`` returns the job for ``key``: finished when its
+    workbook exists, running when a live worker is building it, newly
+    started on a thread of this process otherwise, or None when
+    EXPORT_MAX_JOBS other jobs are already running. ``build(path, progress)``
+    writes the workbook to ``path``.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.lock_path = self.directory / '.exports.lock'
+
+    def start(self, key: str, build: Callable[[Path, Callable[[float, str], None]], None],
+              meta: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with locked_file(self.lock_path):
+            job = self.status(key)
+            if job is not None and (job['state'] == 'done' or (job['state'] == 'running' and not self._stale(job))):
+                return job
+            if self.running() >= EXPORT_MAX_JOBS:
+                return None
+            job = dict(meta or {}, id=key, state='running', progress=0.0, stage='Queued', host=_HOST, pid=os.getpid(),
+                       started_at=time.time(), updated_at=time.time(), finished_at=None, error=None)
+            self._write_status(job)
+            _building.add(key)
+
+        if gevent_monkey is not None and gevent_monkey.is_module_patched('threading'):
+            # A patched Thread is a greenlet: the CPU-bound build would hold the worker's
+            # only OS thread and stall every request until it finished
+            gevent.get_hub().threadpool.spawn(self._run, job, build)
+        else:
+            thread = threading.Thread(target=self._run, args=(job, build), name=f'excel-export-{key}', daemon=True)
+            thread.start()
+        return job
+
+    def running(self) -> int:
+        """Jobs currently building, in any worker (dead ones excluded)"""
+        count = 0
+        for path in self.directory.glob('*.json'):
+            job = self.status(path.stem)
+            if job is not None and job['state'] == 'running' and not self._stale(job):
+                count += 1
+        return count
+
+    def status(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._status_path(key), 'r', encoding='utf-8') as f:
+                job = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if job.get('state') == 'done' and not self.path(key).exists():
+            return None  # Pruned, or removed by hand
+        return job
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.xlsx"
+
+    def _run(self, job: Dict[str, Any], build: Callable):
+        key = job['id']
+        staging = self.directory / f".{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        last_write = [0.0]
+
+        def progress(fraction: float, stage: str):
+            now = time.time()
+            if now - last_write[0] >= PROGRESS_INTERVAL:
+                last_write[0] = now
+                job.update(progress=round(fraction, 3), stage=stage, updated_at=now)
+                self._write_status(job)
+
+        try:
+            try:
+                build(staging, progress)
+                os.replace(staging, self.path(key))
+                job.update(state='done', progress=1.0, stage='Done', finished_at=time.time(), updated_at=time.time(),
+                           size_bytes=self.path(key).stat().st_size)
+            except Exception as e:
+                job.update(state='failed', stage='Failed', error=str(e), finished_at=time.time(), updated_at=time.time())
+                try:
+                    staging.unlink()
+                except FileNotFoundError:
+                    pass
+            self._write_status(job)
+        finally:
+            _building.discard(key)
+        self._prune()
+
+    def _write_status(self, job: Dict[str, Any]):
+        write_atomically(self._status_path(job['id']), json.dumps(job).encode('utf-8'))
+
+    def _status_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    @staticmethod
+    def _stale(job: Dict[str, Any]) -> bool:
+        """A running job that no worker is building any more"""
+        if time.time() - job.get('updated_at', 0) > STALE_JOB_SECONDS:
+            return True
+        if job.get('host') != _HOST:
+            return False
+        if job.get('pid') == os.getpid():
+            return job['id'] not in _building
+        try:
+            os.kill(job.get('pid', 0), 0)
+        except ProcessLookupError:
+            return True  # Its worker exited (or was restarted)
+        except PermissionError:
+            pass
+        return False
+
+    def _prune(self):
+        """Delete all but the EXPORT_KEEP newest workbooks (and their status files)"""
+        workbooks = sorted(self.directory.glob('*.xlsx'), key=lambda path: path.stat().st_mtime, reverse=True)
+        for path in workbooks[EXPORT_KEEP:]:
+            for stale in (path, self._status_path(path.stem)):
+                try:
+                    stale.unlink()
+                except FileNotFoundError:
+                    pass
+
+
+def export_key(version: Any, start: Optional[str], end: Optional[str], summaries: Dict[str, Dict[str, Any]]) -> str:
+    """Job key of a report: the data version, the range and the range's per-date counts"""
+    payload = json.dumps([version, start, end, summaries], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:20]
+
+
+def generated_at() -> str:
+    return datetime.now().isoformat(timespec='seconds')
@@ -0,0 +1,77 @@
+from typing import Any, Dict, Iterable, Optional
+
+# Section selection and sparse fieldsets for /api/dashboard/data.
+#
+#     ?sections=metrics,alerts
+#     ?fields=metrics.attendance_rate,regional_data.manager_name,regional_data.attendance_rate
+#
+# sections= names whole sections; fields= names dotted paths whose first part
+# is a section. The response holds the union of both, and only those sections
+# are computed. A path keeps just the named keys of the objects it reaches,
+# through lists (regional_data.manager_name applies to every regional row).
+# Top-level metadata such as data_version and last_updated is always kept.
+
+
+class FieldSet:
+    """Sections to compute and the projection of each"""
+
+    def __init__(self, sections: Iterable[str], projections: Optional[Dict[str, Optional[dict]]] = None):
+        self.sections = tuple(sections)
+        # section -> nested {key: subtree or None for the whole value}; None keeps the whole section
+        self.projections = projections or {}
+
+    @classmethod
+    def parse(cls, sections: Optional[str], fields: Optional[str], available: Iterable[str]) -> 'FieldSet':
+        """Parse the query parameters; raises ValueError naming an unknown section"""
+        available = tuple(available)
+        if not sections and not fields:
+            return cls(available)
+
+        requested = set()
+        projections: Dict[str, Optional[dict]] = {}
+        for name in _split(sections):
+            requested.add(name)
+            projections[name] = None
+        for path in _split(fields):
+            head, *rest = path.split('.')
+            requested.add(head)
+            if not rest or (head in projections and projections[head] is None):
+                projections[head] = None
+                continue
+            node = projections.setdefault(head, {})
+            for key in rest[:-1]:
+                child = node.get(key, {})
+                if child is None:
+                    break
+                node = node.setdefault(key, child)
+            else:
+                node[rest[-1]] = None
+
+        unknown = sorted(requested - set(available))
+        if unknown:
+            raise ValueError(f"Unknown section {', '.join(unknown)}; expected one of {', '.join(available)}")
+        # Keep the server's section order
+        return cls([name for name in available if name in requested],
+                   {name: tree for name, tree in projections.items() if tree is not None})
+
+    def project(self, section: str, value: Any) -> Any:
+        tree = self.projections.get(section)
+        return value if tree is None else _project(value, tree)
+
+    def apply(self, sections: Dict[str, Any]) -> Dict[str, Any]:
+        """The requested sections of a computed section dict, projected"""
+        return {name: self.project(name, sections[name]) for name in self.sections if name in sections}
+
+
+def _split(value: Optional[str]):
+    return [part.strip() for part in (value or '').split(',') if part.strip()]
+
+
+def _project(value: Any, tree: Optional[dict]) -> Any:
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [_project(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {key: _project(value[key], subtree) for key, subtree in tree.items() if key in value}
+    return value
@@ -0,0 +1,245 @@
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .json_stream import iter_object_items
+from .snapshot import HashingReader
+
+
+def date_hash(date_data: Dict[str, Any]) -> str:
+    """Content hash of one date of attendance records, independent of key order"""
+    canonical = json.dumps(date_data, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class HistoryDeltaLog:
+    """
+    Attendance history stored as a base file plus a short chain of deltas.
+
+    The base file keeps its usual name and layout. Each delta holds only the
+    dates that were added or changed (and the dates removed) since the
+    previous state, and the manifest next to the base lists the delta chain
+    and a per-date content hash of the merged history. Appending a meeting
+    date therefore writes one date instead of the whole file, and readers
+    that already hold the previous state apply just the delta.
+
+    The chain is folded back into the base once it grows past
+    ``max_deltas`` files or ``compact_ratio`` of the base size. The manifest
+    records the base file's stat signature, so if anything else replaces the
+    base (an admin upload, a manual copy) the stale deltas are ignored.
+    """
+
+    MANIFEST_SUFFIX = '.manifest.json'
+
+    def __init__(self, directory, history_file: str = 'attendance_history.json',
+                 max_deltas: int = 20, compact_ratio: float = 0.5):
+        self.directory = Path(directory)
+        self.base_path = self.directory / history_file
+        self.manifest_path = self.directory / f"{self.base_path.stem}{self.MANIFEST_SUFFIX}"
+        self.max_deltas = max_deltas
+        self.compact_ratio = compact_ratio
+
+    # ==== READING ====
+
+    def read_manifest(self) -> Optional[Dict[str, Any]]:
+        """Manifest describing the current base, or None if missing or stale"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        if manifest.get('base_signature') != self._base_signature():
+            return None
+        return manifest
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Full attendance history: the base with every delta applied in order"""
+        with open(self.base_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        manifest = self.read_manifest()
+        for delta in (manifest or {}).get('deltas', []):
+            upserts, removed = self.read_delta(delta['file'])
+            data.update(upserts)
+            for date in removed:
+                data.pop(date, None)
+        return data
+
+    def iter_dates(self) -> Iterator[Tuple[str, Any]]:
+        """
+        Stream (date, records) pairs of the full history without loading it.
+
+        Base dates that a delta replaces or removes are skipped, and the
+        delta's dates follow at the end; memory is bounded by one date plus
+        the (small) delta chain.
+        """
+        manifest = self.read_manifest() or {}
+        overrides = {}
+        for delta in manifest.get('deltas', []):
+            upserts, removed = self.read_delta(delta['file'])
+            overrides.update(upserts)
+            overrides.update(dict.fromkeys(removed))
+
+        with open(self.base_path, 'rb') as f:
+            for date, date_data in iter_object_items(f):
+                if date not in overrides:
+                    yield date, date_data
+        for date, date_data in overrides.items():
+            if date_data is not None:
+                yield date, date_data
+
+    def read_delta(self, name: str) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """Changed dates and removed dates of one delta file"""
+        with open(self.directory / name, 'r', encoding='utf-8') as f:
+            delta = json.load(f)
+        return delta.get('dates', {}), delta.get('removed', [])
+
+    def current_hashes(self) -> Dict[str, str]:
+        """Per-date hashes of the current history, from the manifest when it has them"""
+        manifest = self.read_manifest()
+        if manifest and manifest.get('dates') is not None:
+            return manifest['dates']
+        if not self.base_path.exists():
+            return {}
+        return {date: date_hash(date_data) for date, date_data in self.iter_dates()}
+
+    # ==== WRITING ====
+
+    def commit(self, upserts: Dict[str, Dict[str, Any]], removed: Iterable[str] = (),
+               hashes: Optional[Dict[str, str]] = None, base_source=None,
+               base_sha256: Optional[str] = None, **meta) -> Dict[str, Any]:
+        """
+        Record a new state of the history, writing a delta when that is cheaper.
+
+        ``upserts`` holds the dates that were added or changed and ``removed``
+        the dates that are gone. ``base_source`` is a file with the complete
+        new history; it is streamed in as the new base when the chain needs
+        compacting, and checked against ``base_sha256`` so a source that
+        changed mid-sync is never committed. Extra keyword arguments are
+        stored in the manifest (the sync script keeps its source file
+        signature there).
+        Returns the mode used ('delta' or 'full'), the delta file name and the
+        number of bytes written.
+        """
+        changed = sorted(upserts)
+        removed = sorted(removed)
+
+        if not self.base_path.exists():
+            return self.compact_from_file(base_source, base_sha256, hashes=hashes, **meta)
+        # No (valid) manifest yet: the caller diffed against the base itself
+        manifest = self.read_manifest() or self._new_manifest()
+
+        payload = json.dumps({
+            'dates': {date: upserts[date] for date in changed},
+            'removed': removed
+        }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+        deltas = manifest.get('deltas', [])
+        chain_bytes = sum(d.get('bytes', 0) for d in deltas) + len(payload)
+        if len(deltas) >= self.max_deltas or chain_bytes > self.base_path.stat().st_size * self.compact_ratio:
+            return self.compact_from_file(base_source, base_sha256, hashes=hashes, **meta)
+
+        sequence = manifest.get('next_delta', 1)
+        name = f"{self.base_path.stem}.delta-{sequence:06d}.json"
+        self._write_atomically(self.directory / name, lambda f: f.write(payload))
+
+        manifest.update(meta)
+        manifest['deltas'] = deltas + [{'file': name, 'dates': changed, 'removed': removed, 'bytes': len(payload)}]
+        manifest['next_delta'] = sequence + 1
+        manifest['dates'] = hashes
+        manifest_bytes = self._write_manifest(manifest)
+
+        return {'mode': 'delta', 'delta': name, 'bytes_written': len(payload) + manifest_bytes}
+
+    def compact(self, attendance_data: Dict[str, Dict[str, Any]], hashes: Optional[Dict[str, str]] = None,
+                **meta) -> Dict[str, Any]:
+        """Rewrite the base with the full history and drop the delta chain"""
+        payload = json.dumps(attendance_data, indent=2, ensure_ascii=False).encode('utf-8')
+        return self._replace_base(lambda f: f.write(payload), hashes, meta)
+
+    def compact_from_file(self, source, expected_sha256: Optional[str] = None,
+                          hashes: Optional[Dict[str, str]] = None, **meta) -> Dict[str, Any]:
+        """Stream a complete history file in as the new base and drop the delta chain"""
+        def write(f):
+            with open(source, 'rb') as src:
+                reader = HashingReader(src, f)
+                reader.drain()
+            if expected_sha256 and reader.hexdigest() != expected_sha256:
+                raise ValueError(f"{source} changed while it was being synced")
+
+        return self._replace_base(write, hashes, meta)
+
+    def _replace_base(self, write, hashes: Optional[Dict[str, str]], meta: Dict[str, Any]) -> Dict[str, Any]:
+        previous = self.read_manifest() or {}
+
+        if self.base_path.exists():
+            self._backup_base()
+        self._write_atomically(self.base_path, write)
+        base_bytes = self.base_path.stat().st_size
+
+        manifest = {**meta, **self._new_manifest(previous.get('next_delta', 1)), 'dates': hashes}
+        manifest_bytes = self._write_manifest(manifest)
+
+        # Readers that still need an old delta fall back to a full load
+        for delta in previous.get('deltas', []):
+            try:
+                (self.directory / delta['file']).unlink()
+            except OSError:
+                pass
+
+        return {'mode': 'full', 'delta': None, 'bytes_written': base_bytes + manifest_bytes}
+
+    def update_meta(self, hashes: Optional[Dict[str, str]] = None, **meta):
+        """Update manifest metadata (and optionally the date hashes) without touching the data files"""
+        if not self.base_path.exists():
+            return
+        manifest = self.read_manifest() or self._new_manifest()
+        manifest.update(meta)
+        if hashes is not None:
+            manifest['dates'] = hashes
+        self._write_manifest(manifest)
+
+    @staticmethod
+    def _new_manifest(next_delta: int = 1) -> Dict[str, Any]:
+        return {'deltas': [], 'next_delta': next_delta, 'dates': None}
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> int:
+        manifest['base_signature'] = self._base_signature()
+        payload = json.dumps(manifest, separators=(',', ':')).encode('utf-8')
+        self._write_atomically(self.manifest_path, lambda f: f.write(payload))
+        return len(payload)
+
+    def _backup_base(self):
+        """Keep the previous base as .backup, hard-linked when the filesystem allows it"""
+        backup_path = self.base_path.with_suffix('.json.backup')
+        tmp_path = backup_path.with_name(f"{backup_path.name}.{os.getpid()}.tmp")
+        try:
+            os.link(self.base_path, tmp_path)
+        except OSError:
+            shutil.copy2(self.base_path, tmp_path)
+        os.replace(tmp_path, backup_path)
+
+    def _base_signature(self) -> Optional[List[int]]:
+        try:
+            stat = self.base_path.stat()
+            return [stat.st_mtime_ns, stat.st_size]
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _write_atomically(path: Path, write):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                write(f)
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        os.replace(tmp_path, path)
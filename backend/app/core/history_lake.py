@@ -0,0 +1,397 @@
+import csv
+import hashlib
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import duckdb
+except ImportError:  # ANALYTICS_ENGINE=duckdb then falls back to the in-memory path
+    duckdb = None
+
+from .attendance_cube import DIMENSIONS, GROUP_BY, MAX_GROUP_ROWS
+from .status_index import MISSING, status_code_of
+
+# Attendance history as Parquet partitioned by month, queried with DuckDB.
+#
+#     history_parquet/
+#         month=2025-01/data.parquet     one file per month, rows sorted by date
+#         directory.parquet              the employee directory
+#         manifest.json                  month -> {date: version} of each written partition,
+#                                        plus the source and directory signatures
+#
+# sync() compares the processor's per-date versions with the manifest and
+# rewrites only the months that changed, so an upload or sync delta costs
+# one month of rows. Queries read the files through read_parquet with hive
+# partitioning: a date range becomes a filter on the month column, which
+# skips whole files, and the date and dimension filters are pushed into the
+# Parquet scan, which skips row groups by their min/max statistics.
+#
+# Each process opens its own in-memory DuckDB connection (it does not
+# survive a fork) and gives every query its own cursor, so request threads
+# can query concurrently.
+
+MANIFEST_FILE = 'manifest.json'
+DIRECTORY_FILE = 'directory.parquet'
+
+_COLUMNS = (
+    ('date', 'VARCHAR'),
+    ('position', 'INTEGER'),
+    ('email', 'VARCHAR'),
+    ('name', 'VARCHAR'),
+    ('status', 'VARCHAR'),
+    ('duration_minutes', 'DOUBLE'),
+    ('engagement_score', 'DOUBLE'),
+    ('location', 'VARCHAR')
+)
+_DIRECTORY_COLUMNS = (
+    ('email', 'VARCHAR'),
+    ('name', 'VARCHAR'),
+    ('title', 'VARCHAR'),
+    ('department', 'VARCHAR'),
+    ('office', 'VARCHAR'),
+    ('manager', 'VARCHAR')
+)
+
+# Dimension expressions over history `a` joined to the directory `d`, with the cube's fallbacks
+_DIMENSION_SQL = {
+    'office': "COALESCE(NULLIF(d.office, ''), NULLIF(a.location, ''), 'Unknown')",
+    'department': "COALESCE(NULLIF(d.department, ''), 'Unknown')",
+    'title': "COALESCE(NULLIF(d.title, ''), 'Unknown')",
+    'manager': "COALESCE(NULLIF(d.manager, ''), 'Unknown')",
+    'status': "COALESCE(NULLIF(a.status, ''), 'Unknown')",
+    'date': "a.date",
+    'month': "a.month"
+}
+# A record without a status counts as Absent, as in the status index
+_STATUS = "COALESCE(a.status, 'Absent')"
+
+
+def _number(value):
+    if type(value) in (int, float):
+        return value
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _columns_sql(columns) -> str:
+    return '{' + ', '.join(f"'{name}': '{column_type}'" for name, column_type in columns) + '}'
+
+
+class HistoryLake:
+    """Monthly Parquet partitions of the attendance history and the DuckDB queries over them"""
+
+    def __init__(self, root):
+        if duckdb is None:
+            raise RuntimeError("duckdb is not installed")
+        self.root = Path(root)
+        # Bumped whenever this process rewrites a partition or the directory
+        self.version = 0
+        self._conn = None
+        self._conn_pid = None
+        self._lock = threading.Lock()
+        self._statuses = None
+
+    # ==== WRITING ====
+
+    def read_manifest(self) -> Dict[str, Dict[str, str]]:
+        """month -> {date: version} of the written partitions"""
+        return self._read_manifest().get('months', {})
+
+    def source_signature(self) -> Optional[str]:
+        """The signature passed to the last full sync(), e.g. the stat of the files it was loaded from"""
+        return self._read_manifest().get('source')
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self.root / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def sync(self, versions: Dict[str, str],
+             load: Callable[[List[str]], Iterator[Tuple[str, Dict[str, Any]]]],
+             months: Optional[Iterable[str]] = None, source: Optional[str] = None) -> List[str]:
+        """
+        Rewrite the months whose dates or date versions differ from the manifest.
+
+        ``versions`` maps each date to a token that changes with its content
+        (a content hash, or the store's update time) and ``load`` yields
+        (date, records) for the requested dates. With ``months``, only those
+        months are compared, so ``versions`` need only cover them. Months
+        with no dates left are deleted. A full sync records ``source`` (see
+        source_signature()). Returns the rewritten months.
+        """
+        state = self._read_manifest()
+        manifest = state.get('months', {})
+        target: Dict[str, Dict[str, str]] = {}
+        for date, version in versions.items():
+            target.setdefault(date[:7], {})[date] = version
+
+        candidates = set(months) if months is not None else set(target) | set(manifest)
+        changed = sorted(month for month in candidates if target.get(month) != manifest.get(month))
+        # Another worker may already have written these months; cached results are stale either way
+        self._changed()
+        if months is None and state.get('source') != source:
+            state['source'] = source
+        elif not changed:
+            return []
+
+        for month in changed:
+            dates = target.get(month)
+            if dates:
+                self._write_month(month, load(sorted(dates)))
+                manifest[month] = dates
+            else:
+                shutil.rmtree(self.root / f"month={month}", ignore_errors=True)
+                manifest.pop(month, None)
+        state['months'] = manifest
+        self._write_json(self.root / MANIFEST_FILE, state)
+        return changed
+
+    def write_directory(self, employee_data: Dict[str, Dict[str, Any]]) -> bool:
+        """Write the directory unless the written one has the same content; returns whether it wrote"""
+        digest = hashlib.sha256(json.dumps(employee_data, sort_keys=True).encode('utf-8')).hexdigest()
+        state = self._read_manifest()
+        if state.get('directory') == digest and (self.root / DIRECTORY_FILE).exists():
+            return False
+
+        names = [name for name, _ in _DIRECTORY_COLUMNS]
+        rows = ([email] + [info.get(name) for name in names[1:]] for email, info in employee_data.items())
+        self._write_parquet(self.root / DIRECTORY_FILE, _DIRECTORY_COLUMNS, rows, order_by='email')
+        state['directory'] = digest
+        self._write_json(self.root / MANIFEST_FILE, state)
+        self._changed()
+        return True
+
+    def _write_month(self, month: str, dated_records: Iterator[Tuple[str, Dict[str, Any]]]):
+        def rows():
+            for date, records in dated_records:
+                for position, (email, record) in enumerate(records.items()):
+                    if isinstance(record, dict):
+                        yield (date, position, email, record.get('name'), record.get('status'),
+                               _number(record.get('duration_minutes')), _number(record.get('engagement_score')),
+                               record.get('location'))
+
+        self._write_parquet(self.root / f"month={month}" / 'data.parquet', _COLUMNS, rows(), order_by='date, position')
+
+    def _write_parquet(self, path: Path, columns, rows: Iterable, order_by: str):
+        """Stage rows as CSV and have DuckDB convert them, then swap the file in atomically"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Not *.parquet, so queries never glob a half-written file
+        staging = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        csv_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.csv")
+        try:
+            with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow([name for name, _ in columns])
+                writer.writerows(rows)
+            with self._cursor() as cursor:
+                cursor.execute(
+                    f"COPY (SELECT * FROM read_csv(?, header = true, columns = {_columns_sql(columns)})"
+                    f" ORDER BY {order_by}) TO '{self._literal(staging)}' (FORMAT PARQUET, COMPRESSION ZSTD)",
+                    [str(csv_path)]
+                )
+            os.replace(staging, path)
+        finally:
+            for leftover in (csv_path, staging):
+                try:
+                    leftover.unlink()
+                except FileNotFoundError:
+                    pass
+
+    @staticmethod
+    def _write_json(path: Path, payload):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    def _changed(self):
+        self.version += 1
+        self._statuses = None
+
+    # ==== READING ====
+
+    def dates(self, start: Optional[str] = None, end: Optional[str] = None) -> List[str]:
+        """Dates in [start, end], from the manifest (no file is read)"""
+        return sorted(date for dates in self.read_manifest().values() for date in dates
+                      if (not start or date >= start) and (not end or date <= end))
+
+    def date_summaries(self, start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Per-date summaries in the processor's historical_data layout"""
+        where, params = self._range(start, end)
+        summaries = {}
+        for date, total, present, partial, absent in self._query(
+                f"SELECT a.date, COUNT(*), COUNT_IF(a.status = 'Present'), COUNT_IF(a.status = 'Partial'),"
+                f" COUNT_IF(a.status = 'Absent') FROM {self._history()} a {where} GROUP BY a.date ORDER BY a.date",
+                params):
+            summaries[date] = {
+                'attendance_rate': (present / total * 100) if total > 0 else 0,
+                'present_count': present,
+                'partial_count': partial,
+                'absent_count': absent,
+                'total_count': total
+            }
+        return summaries
+
+    def statuses(self) -> 'LakeStatuses':
+        """Per-employee totals with the StatusIndex read API, computed once per lake version"""
+        statuses = self._statuses
+        if statuses is None:
+            statuses = self._statuses = LakeStatuses(self)
+        return statuses
+
+    def query(self, group_by: Iterable[str] = (), filters: Optional[Dict[str, Iterable[str]]] = None,
+              start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, Any]:
+        """
+        AttendanceCube.query() answered by one grouped DuckDB query.
+
+        The date range prunes month partitions and the filters become WHERE
+        clauses on the scan; the response has the cube's layout, with
+        cells_scanned counting the records aggregated.
+        """
+        group_by = tuple(group_by)
+        unknown = [name for name in group_by if name not in GROUP_BY]
+        unknown += [name for name in (filters or {}) if name not in DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown dimension {', '.join(unknown)}; expected one of {', '.join(GROUP_BY)}")
+        for bound in (start, end):
+            if bound:
+                datetime.strptime(bound, '%Y-%m-%d')  # ValueError names the bad date
+
+        filter_spec = tuple(sorted((name, tuple(sorted(set(values)))) for name, values in (filters or {}).items()))
+        dates = self.dates(start, end)
+        rows = []
+        scanned = 0
+        if dates:
+            where, params = self._range(start, end)
+            for name, values in filter_spec:
+                where += f" {'AND' if where else 'WHERE'} {_DIMENSION_SQL[name]} IN ({', '.join('?' * len(values))})"
+                params += list(values)
+            groups = [_DIMENSION_SQL[name] for name in group_by]
+            select = ''.join(f"{expression}, " for expression in groups)
+            grouping = f" GROUP BY {', '.join(groups)}" if groups else ''
+            results = self._query(
+                f"SELECT {select}COUNT(*), SUM(a.duration_minutes), SUM(a.engagement_score),"
+                f" COUNT_IF(a.status = 'Present'), COUNT_IF(a.status = 'Partial'), COUNT_IF(a.status = 'Absent')"
+                f" FROM {self._history()} a LEFT JOIN {self._directory()} d ON d.email = a.email {where}{grouping}",
+                params
+            )
+            for result in sorted(results, key=lambda row: row[:len(group_by)]):
+                group = result[:len(group_by)]
+                records, minutes, engagement, present, partial, absent = result[len(group_by):]
+                if not records:
+                    continue
+                scanned += records
+                row = dict(zip(group_by, group))
+                row.update({
+                    'records': records,
+                    'present': present,
+                    'partial': partial,
+                    'absent': absent,
+                    'attendance_rate': round(present / records * 100, 1) if records else 0,
+                    'avg_duration_minutes': round((minutes or 0) / records, 1) if records else 0,
+                    'avg_engagement': round((engagement or 0) / records, 1) if records else 0
+                })
+                rows.append(row)
+
+        return {
+            'group_by': list(group_by),
+            'filters': {name: list(values) for name, values in filter_spec},
+            'start': dates[0] if dates else start,
+            'end': dates[-1] if dates else end,
+            'dates': len(dates),
+            'cells_scanned': scanned,
+            'truncated': len(rows) > MAX_GROUP_ROWS,
+            'rows': rows[:MAX_GROUP_ROWS]
+        }
+
+    def _range(self, start: Optional[str], end: Optional[str]) -> Tuple[str, List[Any]]:
+        """WHERE clause for a date range; the month bounds let DuckDB skip whole partitions"""
+        clauses, params = [], []
+        if start:
+            clauses += ["a.month >= ?", "a.date >= ?"]
+            params += [start[:7], start]
+        if end:
+            clauses += ["a.month <= ?", "a.date <= ?"]
+            params += [end[:7], end]
+        return (f"WHERE {' AND '.join(clauses)}" if clauses else ''), params
+
+    def _history(self) -> str:
+        pattern = self._literal(self.root / 'month=*' / '*.parquet')
+        return f"read_parquet('{pattern}', hive_partitioning = true, hive_types = {{'month': VARCHAR}})"
+
+    def _directory(self) -> str:
+        path = self.root / DIRECTORY_FILE
+        if path.exists():
+            return f"read_parquet('{self._literal(path)}')"
+        # No directory written yet: every dimension falls back as for an unknown employee
+        return f"(SELECT {', '.join(f'NULL::{column_type} AS {name}' for name, column_type in _DIRECTORY_COLUMNS)} WHERE false)"
+
+    @staticmethod
+    def _literal(path: Path) -> str:
+        return str(path).replace("'", "''")
+
+    def _query(self, sql: str, params: Optional[List[Any]] = None) -> List[Tuple]:
+        if not self.read_manifest():
+            return []
+        with self._cursor() as cursor:
+            return cursor.execute(sql, params or []).fetchall()
+
+    def _cursor(self):
+        with self._lock:
+            if self._conn is None or self._conn_pid != os.getpid():
+                self._conn = duckdb.connect()
+                self._conn_pid = os.getpid()
+            return self._conn.cursor()
+
+
+class LakeStatuses:
+    """
+    The StatusIndex read API (counts, all_counts, last_present, status)
+    answered from the lake: every employee's totals come from one grouped
+    query, in order of first appearance like the index's slots, and an
+    employee's per-date statuses are fetched only when asked for.
+    """
+
+    def __init__(self, lake: HistoryLake):
+        self._lake = lake
+        self._totals: Dict[str, Tuple[int, int, int, Optional[str]]] = {}
+        for email, recorded, present, absent, last_present in lake._query(
+                f"SELECT a.email, COUNT(*), COUNT_IF({_STATUS} = 'Present'), COUNT_IF({_STATUS} = 'Absent'),"
+                f" MAX(a.date) FILTER (WHERE a.status = 'Present')"
+                f" FROM {lake._history()} a GROUP BY a.email"
+                f" ORDER BY MIN(a.date), ARG_MIN(a.position, a.date)"):
+            self._totals[email] = (recorded, present, absent, last_present)
+        self._dates: Dict[str, Dict[str, int]] = {}
+        self._dates_lock = threading.Lock()
+
+    def counts(self, email: str) -> Tuple[int, int, int]:
+        totals = self._totals.get(email)
+        return totals[:3] if totals else (0, 0, 0)
+
+    def all_counts(self) -> Iterator[Tuple[str, int, int, int]]:
+        for email, (recorded, present, absent, _) in self._totals.items():
+            yield email, recorded, present, absent
+
+    def last_present(self, email: str) -> Optional[str]:
+        totals = self._totals.get(email)
+        return totals[3] if totals else None
+
+    def status(self, date_str: str, email: str) -> int:
+        with self._dates_lock:
+            dates = self._dates.get(email)
+        if dates is None:
+            dates = {date: status_code_of(status) for date, status in self._lake._query(
+                f"SELECT a.date, a.status FROM {self._lake._history()} a WHERE a.email = ?", [email])}
+            with self._dates_lock:
+                self._dates[email] = dates
+        return dates.get(date_str, MISSING)
@@ -0,0 +1,169 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from .status_index import MISSING, StatusIndex, status_code_of
+
+# Monthly partitions of the attendance history under SQLite storage.
+#
+# A worker keeps the records and status index of only the latest months
+# (the resident window). Older, "cold" months are represented by
+#
+#     historical_data     one precomputed summary row per date (the store's meetings table)
+#     archive totals      each employee's status totals over all cold months, summed
+#                         from the store's precomputed per-month rows
+#     MonthCache          cold months read on demand by the drilldown, least
+#                         recently used first, within a byte budget
+#
+# None of these holds a record of a cold month until one is asked for, so
+# boot time and memory follow the resident window, not the years stored.
+
+# Records sampled per month when estimating its size
+SIZE_SAMPLE = 32
+
+
+def resident_start(dates: Iterable[str], months: int) -> str:
+    """First month (YYYY-MM) of the latest `months` months holding dates, or '' when there are none"""
+    latest = sorted({date[:7] for date in dates})[-max(months, 1):]
+    return latest[0] if latest else ''
+
+
+def estimate_size(dates: Dict[str, Dict[str, Any]]) -> int:
+    """Approximate bytes held by dates of records, extrapolated from a sample of records"""
+    size = sys.getsizeof(dates)
+    for records in dates.values():
+        size += sys.getsizeof(records)
+        sample = 0
+        sampled = 0
+        for email, record in records.items():
+            sample += sys.getsizeof(email) + sys.getsizeof(record)
+            if isinstance(record, dict):
+                # Keys are interned, so only the values count
+                sample += sum(sys.getsizeof(value) for value in record.values())
+            sampled += 1
+            if sampled == SIZE_SAMPLE:
+                break
+        if sampled:
+            size += sample * len(records) // sampled
+    return size
+
+
+class MonthCache:
+    """
+    Cold months of records loaded on demand, least recently used first.
+
+    ``load`` returns {date: records} for a month. Months are evicted once
+    their estimated size passes ``max_bytes``; a month larger than the
+    whole budget is returned without being kept. Returned dicts are shared
+    with later callers and must not be modified.
+    """
+
+    def __init__(self, load: Callable[[str], Dict[str, Dict[str, Any]]], max_bytes: int):
+        self._load = load
+        self.max_bytes = max_bytes
+        # month -> (dates, estimated bytes), most recently used last
+        self._months: 'OrderedDict[str, Tuple[Dict[str, Dict[str, Any]], int]]' = OrderedDict()
+        self._bytes = 0
+        # Bumped by invalidate(), so a load that raced with it is not cached
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, month: str) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            entry = self._months.get(month)
+            if entry is not None:
+                self._months.move_to_end(month)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            generation = self._generation
+
+        # Read outside the lock, so cached months are served while a cold one loads
+        dates = self._load(month)
+        size = estimate_size(dates)
+        with self._lock:
+            if generation == self._generation and size <= self.max_bytes and month not in self._months:
+                self._months[month] = (dates, size)
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, (_, evicted) = self._months.popitem(last=False)
+                    self._bytes -= evicted
+                    self.evictions += 1
+        return dates
+
+    def date(self, date_str: str) -> Optional[Dict[str, Any]]:
+        """Records of one cold date, or None when the store has no such date"""
+        return self.get(date_str[:7]).get(date_str)
+
+    def invalidate(self, dates: Optional[Iterable[str]] = None):
+        """Forget the months of the given dates (every month when None)"""
+        with self._lock:
+            self._generation += 1
+            months = list(self._months) if dates is None else {date[:7] for date in dates}
+            for month in months:
+                entry = self._months.pop(month, None)
+                if entry is not None:
+                    self._bytes -= entry[1]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'months': list(self._months),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+class PartitionedStatuses:
+    """
+    The StatusIndex read API over the whole history: the resident months'
+    index plus the archived totals of the cold months.
+
+    A cold date's status is read with ``cold_statuses(email)``, which
+    yields (date, status) of that employee's cold records; each employee's
+    are read once per instance, so take one instance per request.
+    """
+
+    def __init__(self, resident: StatusIndex, archive: Dict[str, Tuple[int, int, int, Optional[str]]],
+                 start: str, cold_statuses: Callable[[str], Iterable[Tuple[str, Optional[str]]]]):
+        self._resident = resident
+        self._archive = archive
+        self._start = start
+        self._cold_statuses = cold_statuses
+        self._cold: Dict[str, Dict[str, int]] = {}
+
+    def counts(self, email: str) -> Tuple[int, int, int]:
+        recorded, present, absent = self._resident.counts(email)
+        archived = self._archive.get(email)
+        if archived is None:
+            return recorded, present, absent
+        return recorded + archived[0], present + archived[1], absent + archived[2]
+
+    def all_counts(self) -> Iterator[Tuple[str, int, int, int]]:
+        # Archived employees first: their first record precedes any resident one
+        for email in self._archive:
+            yield (email,) + self.counts(email)
+        for email, recorded, present, absent in self._resident.all_counts():
+            if email not in self._archive:
+                yield email, recorded, present, absent
+
+    def last_present(self, email: str) -> Optional[str]:
+        last = self._resident.last_present(email)
+        if last is None and email in self._archive:
+            last = self._archive[email][3]
+        return last
+
+    def status(self, date_str: str, email: str) -> int:
+        if date_str >= self._start:
+            return self._resident.status(date_str, email)
+        statuses = self._cold.get(email)
+        if statuses is None:
+            statuses = self._cold[email] = {date: status_code_of(status) for date, status in self._cold_statuses(email)}
+        return statuses.get(date_str, MISSING)
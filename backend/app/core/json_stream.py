@@ -0,0 +1,122 @@
+import codecs
+import json
+from typing import Any, BinaryIO, Callable, Iterator, Optional, Tuple
+
+_WHITESPACE = ' \t\n\r'
+# Characters that can continue a number, which (unlike other values) has no closing delimiter
+_NUMBER_CHARS = frozenset('0123456789.eE+-')
+
+
+def iter_object_items(fp: BinaryIO, chunk_size: int = 1 << 16,
+                      on_chunk: Optional[Callable[[bytes], None]] = None) -> Iterator[Tuple[str, Any]]:
+    """
+    Yield the (key, value) pairs of a top-level JSON object one at a time.
+
+    Reads ``fp`` (opened in binary mode) in chunks and decodes each member
+    value separately, so memory stays bounded by the largest single value
+    (one meeting date for the attendance history) instead of the whole
+    document. ``on_chunk`` sees every raw chunk, e.g. to compute a checksum
+    while parsing. Raises ``ValueError`` on malformed JSON, like ``json.load``.
+    """
+    reader = _ChunkReader(fp, chunk_size, on_chunk)
+    decoder = json.JSONDecoder()
+
+    reader.skip_whitespace()
+    reader.expect('{')
+    reader.skip_whitespace()
+    if reader.peek() == '}':
+        reader.pos += 1
+    else:
+        while True:
+            key = reader.decode(decoder)
+            if not isinstance(key, str):
+                raise ValueError(f"Expected a string key at offset {reader.offset()}")
+            reader.skip_whitespace()
+            reader.expect(':')
+            reader.skip_whitespace()
+            value = reader.decode(decoder)
+            yield key, value
+
+            reader.skip_whitespace()
+            separator = reader.peek()
+            reader.pos += 1
+            if separator == '}':
+                break
+            if separator != ',':
+                raise ValueError(f"Expected ',' or '}}' at offset {reader.offset()}")
+            reader.skip_whitespace()
+
+    reader.skip_whitespace()
+    if reader.peek() is not None:
+        raise ValueError(f"Extra data at offset {reader.offset()}")
+
+
+class _ChunkReader:
+    """Text buffer over a binary stream that only keeps the unparsed tail in memory"""
+
+    def __init__(self, fp: BinaryIO, chunk_size: int, on_chunk):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.on_chunk = on_chunk
+        self.decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self.buffer = ''
+        self.pos = 0
+        self.consumed = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Append the next chunk, dropping what has been parsed; False at end of input"""
+        if self.eof:
+            return False
+        chunk = self.fp.read(self.chunk_size)
+        if self.on_chunk and chunk:
+            self.on_chunk(chunk)
+        self.consumed += self.pos
+        self.buffer = self.buffer[self.pos:] + self.decoder.decode(chunk, final=not chunk)
+        self.pos = 0
+        if not chunk:
+            self.eof = True
+        return True
+
+    def peek(self) -> Optional[str]:
+        while self.pos >= len(self.buffer):
+            if not self.fill():
+                return None
+        return self.buffer[self.pos]
+
+    def skip_whitespace(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.fill():
+                return
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' at offset {self.offset()}")
+        self.pos += 1
+
+    def decode(self, decoder: json.JSONDecoder) -> Any:
+        """Decode one JSON value, reading more input until it is complete"""
+        reads = 1
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+                # A number is complete only once a character that cannot continue it
+                # follows: '12' or '12.' at the end of a chunk may be '12.5' in the next
+                complete = end < len(self.buffer) and not (
+                    isinstance(value, (int, float)) and not isinstance(value, bool)
+                    and self.buffer[end] in _NUMBER_CHARS)
+                if complete or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Grow geometrically so a large value is re-scanned only a few times
+            for _ in range(reads):
+                self.fill()
+            reads *= 2
+
+    def offset(self) -> int:
+        return self.consumed + self.pos
@@ -0,0 +1,169 @@
+import asyncio
+import functools
+import os
+import time
+from typing import Tuple
+
+from .tracing import get_logger, span
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, ProcessCollector, generate_latest, multiprocess
+    )
+except ImportError:  # Metrics become no-ops and /metrics reports them unavailable
+    Counter = Gauge = Histogram = None
+
+# Prometheus metrics for both servers.
+#
+# Under gunicorn every worker is its own process, so values are written to
+# per-process files in PROMETHEUS_MULTIPROC_DIR (gunicorn_config.py sets it up)
+# and merged on scrape; gauges declare how the workers' values combine.
+# Without that variable this is a plain single-process registry.
+#
+# The module has its own registry rather than prometheus_client's global one,
+# because it is imported as both core.metrics (Flask) and app.core.metrics
+# (FastAPI) when the two apps share a process, e.g. in the benchmarks.
+
+METRICS_AVAILABLE = Counter is not None
+logger = get_logger(__name__)
+_registry = CollectorRegistry() if METRICS_AVAILABLE else None
+if METRICS_AVAILABLE and not os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+    ProcessCollector(registry=_registry)
+
+FAST_BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30)
+SLOW_BUCKETS = (.05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+BROADCAST_BUCKETS = (.0001, .0005, .001, .0025, .005, .01, .05, .1, .5, 1, 5, 10)
+
+
+class _NullMetric:
+    """Stands in for every metric when prometheus_client is not installed"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, value):
+        pass
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+    def set(self, value):
+        pass
+
+
+def _metric(kind, name, documentation, labels=(), **kwargs):
+    if not METRICS_AVAILABLE:
+        return _NullMetric()
+    return kind(name, documentation, labels, registry=_registry, **kwargs)
+
+
+# ==== METRICS ====
+
+HTTP_REQUEST_SECONDS = _metric(Histogram, 'dashboard_http_request_duration_seconds',
+                               'HTTP request latency by route template', ('method', 'route', 'status'),
+                               buckets=FAST_BUCKETS)
+PROCESSOR_SECONDS = _metric(Histogram, 'dashboard_processor_method_duration_seconds',
+                            'AttendanceDataProcessor method latency', ('method',), buckets=FAST_BUCKETS)
+CACHE_REQUESTS = _metric(Counter, 'dashboard_cache_requests_total',
+                         'Cache lookups by cache and result (hit or miss)', ('cache', 'result'))
+
+DATA_VERSION = _metric(Gauge, 'dashboard_data_version',
+                       'Data version each worker has applied', multiprocess_mode='liveall')
+SNAPSHOT_VERSION = _metric(Gauge, 'dashboard_snapshot_version',
+                           'Current committed data snapshot version', multiprocess_mode='max')
+SNAPSHOT_CREATED = _metric(Gauge, 'dashboard_snapshot_created_timestamp_seconds',
+                           'Unix time the current snapshot was committed', multiprocess_mode='max')
+SNAPSHOT_AGE = _metric(Gauge, 'dashboard_snapshot_age_seconds',
+                       'Age of the current snapshot at the last scrape', multiprocess_mode='mostrecent')
+
+INGESTION_SECONDS = _metric(Histogram, 'dashboard_ingestion_duration_seconds',
+                            'Time to load or ingest a data file', ('kind',), buckets=SLOW_BUCKETS)
+INGESTION_ROWS = _metric(Counter, 'dashboard_ingestion_rows_total', 'Rows ingested', ('kind',))
+INGESTION_ROWS_PER_SECOND = _metric(Gauge, 'dashboard_ingestion_rows_per_second',
+                                    'Throughput of the most recent ingestion', ('kind',),
+                                    multiprocess_mode='mostrecent')
+
+STREAM_CLIENTS = _metric(Gauge, 'dashboard_stream_clients',
+                         'Connected live-update clients (SSE or WebSocket)', ('transport',),
+                         multiprocess_mode='livesum')
+BROADCAST_SECONDS = _metric(Histogram, 'dashboard_broadcast_duration_seconds',
+                            'Update fan-out time and enqueue-to-sent delivery latency', ('transport', 'stage'),
+                            buckets=BROADCAST_BUCKETS)
+
+
+# ==== HELPERS ====
+
+def timed(method: str):
+    """Record a processor method's duration (sync or async) under its name, and trace it as a span"""
+    def decorate(func):
+        histogram = PROCESSOR_SECONDS.labels(method)
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    with span(method):
+                        return await func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - started)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                with span(method):
+                    return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+
+def record_ingestion(kind: str, started: float, rows: int):
+    """Record one ingestion that began at perf_counter() value started"""
+    seconds = time.perf_counter() - started
+    INGESTION_SECONDS.labels(kind).observe(seconds)
+    INGESTION_ROWS.labels(kind).inc(rows)
+    if seconds > 0:
+        INGESTION_ROWS_PER_SECOND.labels(kind).set(rows / seconds)
+
+
+def record_cache(cache: str, hits: int, misses: int):
+    if hits:
+        CACHE_REQUESTS.labels(cache, 'hit').inc(hits)
+    if misses:
+        CACHE_REQUESTS.labels(cache, 'miss').inc(misses)
+
+
+def render_metrics(processor=None) -> Tuple[bytes, str]:
+    """Exposition text for /metrics, merged across workers in multiprocess mode"""
+    if not METRICS_AVAILABLE:
+        return b"# prometheus_client is not installed\n", 'text/plain; charset=utf-8'
+
+    if processor is not None:
+        _update_snapshot_gauges(processor)
+
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = _registry
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def _update_snapshot_gauges(processor):
+    try:
+        snapshot = processor.snapshots.current()
+    except Exception as e:
+        logger.error("❌ Error reading snapshot for metrics", error=str(e))
+        return
+    if snapshot:
+        SNAPSHOT_VERSION.set(snapshot['version'])
+        SNAPSHOT_CREATED.set(snapshot['created_at'])
+        SNAPSHOT_AGE.set(max(0.0, time.time() - snapshot['created_at']))
+
@@ -0,0 +1,326 @@
+import cProfile
+import heapq
+import hmac
+import io
+import marshal
+import os
+import pstats
+import random
+import threading
+import time
+from datetime import datetime
+from itertools import count
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+# Request header that asks for a profile of this request (its value must be PROFILE_TOKEN)
+PROFILE_HEADER = 'X-Profile'
+
+FORMATS = {
+    'folded': 'text/plain; charset=utf-8',
+    'text': 'text/plain; charset=utf-8',
+    'prof': 'application/octet-stream'
+}
+
+# Collapsed stacks below this (microseconds) are noise in a flamegraph
+MIN_FOLDED_US = 10
+MAX_FOLDED_DEPTH = 128
+
+
+class ActiveProfile:
+    """A profiler running for one request"""
+
+    def __init__(self, engine: str, trigger: str):
+        self.engine = engine
+        self.trigger = trigger
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        if engine == 'pyinstrument':
+            self.profiler = pyinstrument.Profiler(async_mode='disabled')
+            self.profiler.start()
+        else:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def stop(self) -> float:
+        """Stop profiling; returns the elapsed milliseconds"""
+        if self.engine == 'pyinstrument':
+            self.profiler.stop()
+        else:
+            self.profiler.disable()
+        return (time.perf_counter() - self.started) * 1000
+
+
+class RequestProfiler:
+    """
+    Opt-in per-request profiling that keeps the slowest profiles.
+
+    A request is profiled when it is picked by the sample percentage or
+    carries ``X-Profile: <PROFILE_TOKEN>``. Only one request per process is
+    profiled at a time (cProfile cannot run twice, and under gevent every
+    greenlet shares the thread); requests that arrive meanwhile are served
+    unprofiled. Profiles therefore include whatever else the worker ran
+    concurrently, which is usually what made the request slow.
+
+    The ``keep`` slowest profiles stay in memory per worker and render as
+    collapsed stacks (flamegraph.pl, speedscope), a pstats report, or a raw
+    ``.prof`` file for snakeviz.
+    """
+
+    def __init__(self, sample_percent: float = 0.0, token: str = '', keep: int = 20,
+                 engine: str = 'cprofile', path_prefix: str = '/api/'):
+        if engine == 'pyinstrument' and pyinstrument is None:
+            print("⚠️  PROFILE_ENGINE=pyinstrument but pyinstrument is not installed, using cProfile")
+            engine = 'cprofile'
+        self.sample_percent = max(0.0, min(100.0, sample_percent))
+        self.token = token
+        self.keep = max(1, keep)
+        self.engine = engine
+        self.path_prefix = path_prefix
+        self._slowest: List[Tuple[float, int, Dict[str, Any]]] = []  # min-heap on duration
+        self._ids = count(1)
+        self._running = threading.Lock()
+        self._lock = threading.Lock()
+        self.counters = {'profiled': 0, 'kept': 0, 'skipped_busy': 0}
+
+    @classmethod
+    def from_env(cls) -> 'RequestProfiler':
+        return cls(
+            sample_percent=float(os.getenv('PROFILE_SAMPLE_PERCENT', '0')),
+            token=os.getenv('PROFILE_TOKEN', ''),
+            keep=int(os.getenv('PROFILE_KEEP', '20')),
+            engine=os.getenv('PROFILE_ENGINE', 'cprofile').lower(),
+            path_prefix=os.getenv('PROFILE_PATH_PREFIX', '/api/')
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_percent > 0 or bool(self.token)
+
+    def token_matches(self, value: Optional[str]) -> bool:
+        return bool(self.token) and bool(value) and hmac.compare_digest(value.encode('utf-8'),
+                                                                         self.token.encode('utf-8'))
+
+    # ==== CAPTURE ====
+
+    def begin(self, path: str, header_value: Optional[str] = None) -> Optional[ActiveProfile]:
+        """Start profiling this request if it is sampled or asked for; returns None otherwise"""
+        if not self.enabled or not path.startswith(self.path_prefix):
+            return None
+        if self.token_matches(header_value):
+            trigger = 'header'
+        elif self.sample_percent and random.random() * 100 < self.sample_percent:
+            trigger = 'sample'
+        else:
+            return None
+
+        if not self._running.acquire(blocking=False):
+            self.counters['skipped_busy'] += 1
+            return None
+        try:
+            return ActiveProfile(self.engine, trigger)
+        except ValueError:
+            # Another profiler (a debugger, an outer cProfile run) owns the hook
+            self._running.release()
+            self.counters['skipped_busy'] += 1
+            return None
+
+    def finish(self, active: ActiveProfile, method: str, path: str,
+               status: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Stop a profile and keep it if it is among the slowest; returns its summary when kept"""
+        try:
+            duration_ms = active.stop()
+        finally:
+            self._running.release()
+
+        with self._lock:
+            self.counters['profiled'] += 1
+            if not self._is_slow_enough(duration_ms):
+                return None
+
+        entry = {
+            'id': None,
+            'method': method,
+            'path': path,
+            'status': status,
+            'duration_ms': round(duration_ms, 2),
+            'trigger': active.trigger,
+            'engine': active.engine,
+            'pid': os.getpid(),
+            'captured_at': datetime.fromtimestamp(active.started_at).isoformat(),
+            'data': _capture(active)
+        }
+
+        with self._lock:
+            if not self._is_slow_enough(duration_ms):
+                return None
+            sequence = next(self._ids)
+            entry['id'] = f"{os.getpid()}-{sequence}"
+            item = (duration_ms, sequence, entry)
+            if len(self._slowest) >= self.keep:
+                heapq.heapreplace(self._slowest, item)
+            else:
+                heapq.heappush(self._slowest, item)
+            self.counters['kept'] += 1
+        return _summary(entry)
+
+    def _is_slow_enough(self, duration_ms: float) -> bool:
+        return len(self._slowest) < self.keep or duration_ms > self._slowest[0][0]
+
+    def cancel(self, active: ActiveProfile):
+        """Stop a profile without keeping it (the request failed before a response)"""
+        try:
+            active.stop()
+        finally:
+            self._running.release()
+
+    # ==== REPORTING ====
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Configuration, counters and the kept profiles, slowest first"""
+        with self._lock:
+            kept = sorted(self._slowest, key=lambda item: item[0], reverse=True)
+        return {
+            'enabled': self.enabled,
+            'engine': self.engine,
+            'sample_percent': self.sample_percent,
+            'header_trigger': bool(self.token),
+            'path_prefix': self.path_prefix,
+            'keep': self.keep,
+            'pid': os.getpid(),
+            **self.counters,
+            'profiles': [_summary(entry) for _, _, entry in kept]
+        }
+
+    def render(self, profile_id: str, fmt: str = 'folded') -> Optional[Tuple[bytes, str]]:
+        """A kept profile as (content, mimetype); None if unknown, ValueError for a bad format"""
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format '{fmt}', expected one of {', '.join(FORMATS)}")
+        with self._lock:
+            entry = next((entry for _, _, entry in self._slowest if entry['id'] == profile_id), None)
+        if entry is None:
+            return None
+
+        root = f"{entry['method']} {entry['path']}"
+        if entry['engine'] == 'pyinstrument':
+            session = entry['data']
+            if fmt == 'folded':
+                content = '\n'.join(pyinstrument_folded_stacks(session.root_frame(), root))
+            elif fmt == 'text':
+                from pyinstrument.renderers import ConsoleRenderer
+                content = ConsoleRenderer(unicode=False, color=False).render(session)
+            else:
+                raise ValueError("pyinstrument profiles have no .prof output, use folded or text")
+        else:
+            stats = entry['data']
+            if fmt == 'prof':
+                return marshal.dumps(stats), FORMATS[fmt]
+            if fmt == 'folded':
+                content = '\n'.join(folded_stacks(stats, root))
+            else:
+                content = pstats_report(stats)
+        return content.encode('utf-8'), FORMATS[fmt]
+
+
+def _capture(active: ActiveProfile):
+    if active.engine == 'pyinstrument':
+        return active.profiler.last_session
+    # Plain dict in pstats' own layout, so it can be re-read or dumped as a .prof file
+    return pstats.Stats(active.profiler).stats
+
+
+def _summary(entry: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in entry.items() if key != 'data'}
+
+
+# ==== FORMATTING ====
+
+def _label(func: Tuple[str, int, str]) -> str:
+    filename, line, name = func
+    if filename == '~':
+        return name  # Built-in, e.g. "<method 'sort' of 'list' objects>"
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def folded_stacks(stats: Dict, root: str = 'request') -> List[str]:
+    """
+    Collapsed stacks ("a;b;c <microseconds>") reconstructed from cProfile stats.
+
+    cProfile only records caller -> callee edges, so each function's time is
+    split across the paths leading to it in proportion to the time spent
+    through each edge. Exact for tree-shaped call graphs, an estimate where a
+    helper is shared by several callers.
+    """
+    children: Dict[Any, List[Tuple[Any, float]]] = {}
+    # Time that reached a function from outside the profile (called by a frame that was
+    # already running when profiling started) makes it a root of its own
+    roots = []
+    for func, (_, _, _, cumulative, callers) in stats.items():
+        known = [caller for caller in callers if caller in stats and caller != func]
+        for caller in known:
+            children.setdefault(caller, []).append((func, callers[caller][3]))
+        outside = cumulative - sum(callers[caller][3] for caller in known)
+        if outside * 1e6 >= MIN_FOLDED_US:
+            roots.append((func, outside))
+
+    totals: Dict[str, float] = {}
+
+    def walk(func, path_seconds: float, stack: List[str], on_stack: set):
+        cumulative = stats[func][3]
+        if cumulative <= 0 or len(stack) >= MAX_FOLDED_DEPTH:
+            return
+        share = min(1.0, path_seconds / cumulative)
+        frames = stack + [_label(func)]
+        key = ';'.join(frames)
+        totals[key] = totals.get(key, 0.0) + stats[func][2] * share
+        on_stack.add(func)
+        for child, edge_seconds in children.get(func, ()):
+            if child not in on_stack and edge_seconds * share * 1e6 >= MIN_FOLDED_US:
+                walk(child, edge_seconds * share, frames, on_stack)
+        on_stack.discard(func)
+
+    for func, seconds in roots:
+        walk(func, seconds, [root], set())
+
+    return [f"{stack} {round(seconds * 1e6)}" for stack, seconds in sorted(totals.items())
+            if seconds * 1e6 >= MIN_FOLDED_US]
+
+
+def pyinstrument_folded_stacks(frame, root: str = 'request') -> List[str]:
+    """Collapsed stacks from a pyinstrument frame tree (already path-exact)"""
+    lines = []
+
+    def walk(node, stack: List[str]):
+        label = f"{node.function} ({os.path.basename(node.file_path_short or '')}:{node.line_no})"
+        frames = stack + [label]
+        self_seconds = node.time - sum(child.time for child in node.children)
+        if self_seconds * 1e6 >= MIN_FOLDED_US:
+            lines.append(f"{';'.join(frames)} {round(self_seconds * 1e6)}")
+        for child in node.children:
+            walk(child, frames)
+
+    if frame is not None:
+        walk(frame, [root])
+    return lines
+
+
+def pstats_report(stats: Dict, limit: int = 60) -> str:
+    """The usual pstats table, sorted by cumulative time"""
+    output = io.StringIO()
+    report = pstats.Stats(_StatsSource(stats), stream=output)
+    report.sort_stats('cumulative').print_stats(limit)
+    return output.getvalue()
+
+
+class _StatsSource:
+    """Minimal profiler stand-in so pstats.Stats can load an already captured stats dict"""
+
+    def __init__(self, stats: Dict):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
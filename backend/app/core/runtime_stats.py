@@ -0,0 +1,106 @@
+import gc
+import os
+import sys
+from typing import Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _mb(value: Optional[int]) -> Optional[float]:
+    return round(value / (1024 * 1024), 1) if value is not None else None
+
+
+def process_memory() -> Dict[str, Optional[float]]:
+    """
+    Memory of this process in MB (None where the platform does not report it).
+
+    rss counts pages shared with the gunicorn master and the other workers;
+    uss is what this worker alone holds (what exiting it would free) and
+    pss splits shared pages between their sharers. With the preloaded data
+    staying shared, uss stays small and flat however many workers run.
+    """
+    rss = None
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            rss = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    peak = None
+    if resource:
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+    rollup = _smaps_rollup()
+    uss = shared = None
+    if rollup:
+        uss = rollup.get('Private_Clean', 0) + rollup.get('Private_Dirty', 0)
+        shared = rollup.get('Shared_Clean', 0) + rollup.get('Shared_Dirty', 0)
+
+    return {
+        'rss_mb': _mb(rss),
+        'peak_rss_mb': _mb(peak),
+        'uss_mb': _mb(uss),
+        'pss_mb': _mb(rollup.get('Pss')) if rollup else None,
+        'shared_mb': _mb(shared)
+    }
+
+
+def _smaps_rollup() -> Optional[Dict[str, int]]:
+    """Totals of /proc/self/smaps_rollup in bytes (Linux 4.14+)"""
+    try:
+        with open('/proc/self/smaps_rollup', 'r') as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    totals = {}
+    for line in lines[1:]:  # The first line is the address range header
+        parts = line.split()
+        if len(parts) == 3 and parts[2] == 'kB':
+            totals[parts[0].rstrip(':')] = int(parts[1]) * 1024
+    return totals
+
+
+def gc_stats() -> Dict[str, object]:
+    """Collector state: objects frozen before fork (see gunicorn_config.py) and pending counts"""
+    return {
+        'enabled': gc.isenabled(),
+        'frozen_objects': gc.get_freeze_count(),
+        'generation_counts': gc.get_count()
+    }
+
+
+def worker_count() -> Optional[int]:
+    """
+    Number of server worker processes, including this one.
+
+    Gunicorn forks its workers from one master without exec, so they are
+    the siblings that share our command line. Outside gunicorn that is just
+    this process. Returns None where /proc is unavailable.
+    """
+    try:
+        with open('/proc/self/cmdline', 'rb') as f:
+            cmdline = f.read()
+        pids = [entry for entry in os.listdir('/proc') if entry.isdigit()]
+    except OSError:
+        return None
+
+    parent = os.getppid()
+    count = 0
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/stat', 'rb') as f:
+                # The command name may contain spaces, so parse after its closing parenthesis
+                ppid = int(f.read().rsplit(b')', 1)[1].split()[1])
+            if ppid != parent:
+                continue
+            with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                if f.read() == cmdline:
+                    count += 1
+        except (OSError, ValueError, IndexError):
+            continue  # Exited while we were looking
+    return count or 1
@@ -0,0 +1,311 @@
+import fnmatch
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Optional
+
+from .change_bus import locked_file
+
+# Data files carried from one snapshot version to the next
+DATA_FILE_PATTERNS = (
+    'attendance_history.json',
+    'attendance_history.manifest.json',
+    'attendance_history.delta-*.json',
+    'rm_attendance_history.json',
+    'peoplehub*.csv'
+)
+
+
+class SnapshotStore:
+    """
+    Versioned, atomically switched copies of the dashboard data files.
+
+    Writers (the sync script, admin uploads) never touch files the server is
+    reading. They stage a complete new version in ``snapshots/``, starting
+    from hard links to the unchanged files of the current version, write
+    and fsync their changes there, and then flip ``current.json`` to the new
+    directory with a single atomic rename. Readers resolve file paths through
+    ``current.json`` and therefore only ever see complete versions.
+
+    Because staged files start out as hard links, they must only be replaced
+    (write to a temp file and rename), never rewritten in place.
+
+    ``current.json`` lists every file of the version with its size, mtime
+    and, when known, its sha256 (computed while the file was streamed in, and
+    carried forward for files that are linked unchanged).
+
+    Until the first version is committed, the data directory itself is the
+    current version, so existing deployments keep working unchanged.
+    """
+
+    CURRENT_FILE = 'current.json'
+    SNAPSHOT_DIR = 'snapshots'
+    LOCK_FILE = '.snapshot.lock'
+
+    def __init__(self, data_dir, keep: int = 5, patterns: Iterable[str] = DATA_FILE_PATTERNS):
+        self.data_dir = Path(data_dir)
+        self.snapshot_dir = self.data_dir / self.SNAPSHOT_DIR
+        self.current_path = self.data_dir / self.CURRENT_FILE
+        self.lock_path = self.data_dir / self.LOCK_FILE
+        self.keep = keep
+        self.patterns = tuple(patterns)
+
+    # ==== READING ====
+
+    def current(self) -> Optional[Dict[str, Any]]:
+        """The committed version record, or None before the first snapshot"""
+        try:
+            with open(self.current_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def current_dir(self) -> Path:
+        """Directory holding the current complete version of the data files"""
+        current = self.current()
+        return self.data_dir / current['path'] if current else self.data_dir
+
+    def path(self, name: str) -> Path:
+        """Path of a data file in the current version"""
+        return self.current_dir() / name
+
+    def version(self) -> int:
+        current = self.current()
+        return current['version'] if current else 0
+
+    # ==== WRITING ====
+
+    @contextmanager
+    def stage(self):
+        """
+        Stage a new version; it is committed when the block exits cleanly.
+
+        Yields a ``StagedVersion`` whose ``path`` already contains the current
+        files. Call ``discard()`` (or raise) to drop it instead. Staging holds
+        an exclusive lock so concurrent writers never build on the same parent.
+        """
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        with locked_file(self.lock_path):
+            staged = StagedVersion(self, self.snapshot_dir / f".staging-{os.getpid()}-{uuid.uuid4().hex[:8]}")
+            try:
+                self._populate(staged)
+                yield staged
+                if staged.discarded:
+                    shutil.rmtree(staged.path, ignore_errors=True)
+                else:
+                    staged.version = self._commit(staged)
+            except BaseException:
+                shutil.rmtree(staged.path, ignore_errors=True)
+                raise
+
+    def _populate(self, staged: 'StagedVersion'):
+        """Seed a staging directory with hard links to the current version's files"""
+        staged.path.mkdir(parents=True)
+        current = self.current()
+        source_dir = self.data_dir / current['path'] if current else self.data_dir
+        staged.parent_files = (current or {}).get('files', {})
+        if not source_dir.exists():
+            return
+        for entry in os.scandir(source_dir):
+            if entry.is_file() and self._is_data_file(entry.name):
+                link_or_copy(Path(entry.path), staged.path / entry.name)
+
+    def _commit(self, staged: 'StagedVersion') -> int:
+        """fsync the staged files, move them into place and flip current.json"""
+        staging_path = staged.path
+        files = {}
+        for entry in os.scandir(staging_path):
+            _fsync_file(entry.path)
+            if entry.is_file():
+                files[entry.name] = staged.describe(entry.name, entry.stat())
+        _fsync_dir(staging_path)
+
+        version = self.version() + 1
+        final_path = self.snapshot_dir / f"v{version:06d}"
+        if final_path.exists():
+            # Leftover of a commit that crashed before flipping current.json
+            shutil.rmtree(final_path)
+        os.replace(staging_path, final_path)
+        _fsync_dir(self.snapshot_dir)
+
+        record = {
+            'version': version,
+            'path': f"{self.SNAPSHOT_DIR}/{final_path.name}",
+            'files': files,
+            'created_at': time.time()
+        }
+        write_atomically(self.current_path, json.dumps(record, indent=2).encode('utf-8'))
+        _fsync_dir(self.data_dir)
+
+        self._prune(version)
+        return version
+
+    def _prune(self, current_version: int):
+        """Remove versions older than the newest ``keep`` (readers re-resolve on the next load)"""
+        try:
+            entries = list(os.scandir(self.snapshot_dir))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            if entry.name.startswith('v') and entry.name[1:].isdigit():
+                if int(entry.name[1:]) <= current_version - self.keep:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+            elif entry.name.startswith('.staging-') and time.time() - entry.stat().st_mtime > 3600:
+                # Abandoned by a writer that was killed mid-stage
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def _is_data_file(self, name: str) -> bool:
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.patterns)
+
+
+class StagedVersion:
+    """A snapshot version being prepared by ``SnapshotStore.stage``"""
+
+    def __init__(self, store: SnapshotStore, path: Path):
+        self.store = store
+        self.path = path
+        self.discarded = False
+        self.version: Optional[int] = None
+        self.parent_files: Dict[str, Any] = {}
+        self.checksums: Dict[str, str] = {}
+
+    def checksum(self, name: str) -> Optional[str]:
+        """sha256 of a staged file, if it was recorded when the file was written"""
+        if name in self.checksums:
+            return self.checksums[name]
+        try:
+            return self.describe(name, (self.path / name).stat()).get('sha256')
+        except FileNotFoundError:
+            return None
+
+    def describe(self, name: str, stat: os.stat_result) -> Dict[str, Any]:
+        """File record for current.json; checksums carry over only for files linked unchanged"""
+        info = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        parent = self.parent_files.get(name)
+        if name in self.checksums:
+            info['sha256'] = self.checksums[name]
+        elif isinstance(parent, dict) and parent.get('sha256') and \
+                (parent.get('size'), parent.get('mtime_ns')) == (stat.st_size, stat.st_mtime_ns):
+            info['sha256'] = parent['sha256']
+        return info
+
+    def write_bytes(self, name: str, payload: bytes):
+        write_atomically(self.path / name, payload)
+
+    def copy_in(self, source: Path, name: str, inspect: Optional[Callable[[BinaryIO], Any]] = None) -> Dict[str, Any]:
+        """
+        Stream an external file into the staged version, replacing the linked one.
+
+        The sha256 is computed while copying; ``inspect`` may consume the
+        stream on the way through (e.g. an incremental parser) so validation
+        needs no extra pass. If the content matches the linked file's
+        checksum the copy is dropped and ``changed`` is False.
+        """
+        target = self.path / name
+        tmp_path = target.with_name(f"{name}.{os.getpid()}.tmp")
+        previous = self.checksum(name)
+        try:
+            with open(source, 'rb') as src, open(tmp_path, 'wb') as dst:
+                reader = HashingReader(src, dst)
+                result = inspect(reader) if inspect else None
+                reader.drain()
+                dst.flush()
+                os.fsync(dst.fileno())
+            shutil.copystat(source, tmp_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        digest = reader.hexdigest()
+        if previous == digest and target.exists():
+            tmp_path.unlink()
+            return {'changed': False, 'sha256': digest, 'bytes_written': 0, 'result': result}
+
+        os.replace(tmp_path, target)
+        self.checksums[name] = digest
+        return {'changed': True, 'sha256': digest, 'bytes_written': reader.bytes_read, 'result': result}
+
+    def discard(self):
+        """Drop this version instead of committing it"""
+        self.discarded = True
+
+
+class HashingReader:
+    """File-like wrapper that hashes (and optionally tees) everything read through it"""
+
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(self, fp: BinaryIO, sink: Optional[BinaryIO] = None):
+        self.fp = fp
+        self.sink = sink
+        self.sha256 = hashlib.sha256()
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.fp.read(size)
+        if chunk:
+            self.sha256.update(chunk)
+            self.bytes_read += len(chunk)
+            if self.sink:
+                self.sink.write(chunk)
+        return chunk
+
+    def drain(self):
+        """Read whatever the consumer left unread"""
+        while self.read(self.CHUNK_SIZE):
+            pass
+
+    def hexdigest(self) -> str:
+        return self.sha256.hexdigest()
+
+
+def link_or_copy(source: Path, target: Path):
+    """Hard link ``source`` to ``target``, falling back to a copy across filesystems"""
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def write_atomically(path: Path, payload: bytes):
+    """Write via a temp file and rename, so readers never see a partial file"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    for attempt in range(5):
+        try:
+            os.replace(tmp_path, path)
+            return
+        except PermissionError:
+            # Windows refuses to replace a file another process has open
+            if attempt == 4:
+                raise
+            time.sleep(0.1)
+
+
+def _fsync_file(path: str):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _fsync_dir(path: Path):
+    """Persist directory entries (renames); not supported on Windows"""
+    if os.name == 'nt':
+        return
+    _fsync_file(str(path))
@@ -0,0 +1,152 @@
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Packed attendance statuses for the whole-history scans.
+#
+# The at-risk list and the per-employee rates used to walk every record dict
+# of every date. Under gunicorn that walk writes each record's reference
+# count, so every worker ended up with a private copy of the whole preloaded
+# history. The index keeps the same information in a few large buffers:
+#
+#     slots          email -> column position (append-only)
+#     columns[date]  bytes, one status code per slot (0 = no record)
+#     totals         array('I') per slot: dates recorded, present, absent
+#
+# Reading it touches a handful of objects, not one per record, so the pages
+# stay shared. Instances are never mutated once published: with_dates()
+# returns a new index that the processor swaps in together with the data.
+
+MISSING, PRESENT, ABSENT, OTHER = 0, 1, 2, 3
+_CODES = {'Present': PRESENT, 'Absent': ABSENT}
+
+
+def status_code_of(status: Optional[str]) -> int:
+    """Code of a status value; None (no status recorded) counts as Absent"""
+    return _CODES.get(status or 'Absent', OTHER)
+
+
+def status_code(record: Any) -> int:
+    """Code of one attendance record; a record without a status counts as Absent"""
+    if not isinstance(record, dict):
+        return OTHER
+    return _CODES.get(record.get('status', 'Absent'), OTHER)
+
+
+class StatusIndex:
+    """Per-date status buffers and per-employee running totals"""
+
+    __slots__ = ('slots', 'emails', 'columns', 'recorded', 'present', 'absent')
+
+    def __init__(self):
+        self.slots: Dict[str, int] = {}
+        self.emails: List[str] = []
+        self.columns: Dict[str, bytes] = {}
+        self.recorded = array('I')
+        self.present = array('I')
+        self.absent = array('I')
+
+    @classmethod
+    def build(cls, attendance_data: Dict[str, Dict[str, Any]]) -> 'StatusIndex':
+        index = cls()
+        for date_str, date_data in attendance_data.items():
+            index._set_date(date_str, date_data)
+        return index
+
+    @classmethod
+    def from_statuses(cls, rows: Iterable[Tuple[str, str, Optional[str]]]) -> 'StatusIndex':
+        """Build from (date, email, status) rows grouped by date, e.g. streamed from AttendanceStore"""
+        index = cls()
+        date_str, codes = None, []
+        for row_date, email, status in rows:
+            if row_date != date_str:
+                if date_str is not None:
+                    index._set_codes(date_str, codes)
+                date_str, codes = row_date, []
+            codes.append((email, status_code_of(status)))
+        if date_str is not None:
+            index._set_codes(date_str, codes)
+        return index
+
+    def with_dates(self, updates: Dict[str, Optional[Dict[str, Any]]]) -> 'StatusIndex':
+        """A copy with whole dates replaced, or removed when None"""
+        index = StatusIndex()
+        index.slots = dict(self.slots)
+        index.emails = list(self.emails)
+        index.columns = dict(self.columns)
+        index.recorded = array('I', self.recorded)
+        index.present = array('I', self.present)
+        index.absent = array('I', self.absent)
+        for date_str, date_data in updates.items():
+            index._drop_date(date_str)
+            if date_data is not None:
+                index._set_date(date_str, date_data)
+        return index
+
+    def _set_date(self, date_str: str, date_data: Dict[str, Any]):
+        self._set_codes(date_str, [(email, status_code(record)) for email, record in date_data.items()])
+
+    def _set_codes(self, date_str: str, codes: List[Tuple[str, int]]):
+        self._drop_date(date_str)
+        slots = self.slots
+        for email, _ in codes:
+            if email not in slots:
+                slots[email] = len(self.emails)
+                self.emails.append(email)
+                self.recorded.append(0)
+                self.present.append(0)
+                self.absent.append(0)
+
+        column = bytearray(len(self.emails))
+        for email, code in codes:
+            slot = slots[email]
+            column[slot] = code
+            self.recorded[slot] += 1
+            if code == PRESENT:
+                self.present[slot] += 1
+            elif code == ABSENT:
+                self.absent[slot] += 1
+        self.columns[date_str] = bytes(column)
+
+    def _drop_date(self, date_str: str):
+        column = self.columns.pop(date_str, None)
+        if column is None:
+            return
+        for slot, code in enumerate(column):
+            if code:
+                self.recorded[slot] -= 1
+                if code == PRESENT:
+                    self.present[slot] -= 1
+                elif code == ABSENT:
+                    self.absent[slot] -= 1
+
+    def status(self, date_str: str, email: str) -> int:
+        """Status code of email on date_str (MISSING when it has no record)"""
+        column = self.columns.get(date_str)
+        slot = self.slots.get(email)
+        if column is None or slot is None or slot >= len(column):
+            return MISSING
+        return column[slot]
+
+    def counts(self, email: str) -> Tuple[int, int, int]:
+        """(dates recorded, present, absent) of one employee across all dates"""
+        slot = self.slots.get(email)
+        if slot is None:
+            return 0, 0, 0
+        return self.recorded[slot], self.present[slot], self.absent[slot]
+
+    def all_counts(self) -> Iterable[Tuple[str, int, int, int]]:
+        """(email, recorded, present, absent) for every employee with a record"""
+        for slot, email in enumerate(self.emails):
+            if self.recorded[slot]:
+                yield email, self.recorded[slot], self.present[slot], self.absent[slot]
+
+    def last_present(self, email: str) -> Optional[str]:
+        """Most recent date email was Present, or None"""
+        slot = self.slots.get(email)
+        if slot is None:
+            return None
+        for date_str in sorted(self.columns, reverse=True):
+            column = self.columns[date_str]
+            if slot < len(column) and column[slot] == PRESENT:
+                return date_str
+        return None
@@ -0,0 +1,286 @@
+import json
+import math
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+# Columns that percentile, histogram and trend queries may aggregate
+RUN_METRICS = ('duration_ms', 'bytes_written', 'validation_ms', 'visible_ms')
+FILE_METRICS = ('duration_ms', 'bytes_written', 'rows', 'validation_ms')
+
+# Default histogram bucket upper bounds for millisecond timings
+DEFAULT_MS_BUCKETS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sync_runs (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    success INTEGER NOT NULL,
+    duration_ms REAL,
+    bytes_written INTEGER NOT NULL DEFAULT 0,
+    validation_ms REAL,
+    visible_ms REAL,
+    files_changed INTEGER NOT NULL DEFAULT 0,
+    snapshot_version INTEGER,
+    errors TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sync_runs_started ON sync_runs (started_at);
+CREATE INDEX IF NOT EXISTS idx_sync_runs_success ON sync_runs (success, started_at);
+
+CREATE TABLE IF NOT EXISTS sync_files (
+    run_id INTEGER NOT NULL REFERENCES sync_runs (id),
+    started_at REAL NOT NULL,
+    file TEXT NOT NULL,
+    status TEXT NOT NULL,
+    mode TEXT,
+    duration_ms REAL,
+    bytes_written INTEGER NOT NULL DEFAULT 0,
+    rows INTEGER,
+    validation_ms REAL
+);
+CREATE INDEX IF NOT EXISTS idx_sync_files_run ON sync_files (run_id);
+CREATE INDEX IF NOT EXISTS idx_sync_files_file ON sync_files (file, started_at);
+"""
+
+# Columns added after the first release: (table, column, type)
+_MIGRATIONS = (
+    ('sync_runs', 'visible_ms', 'REAL'),
+)
+
+
+class SyncMetricsStore:
+    """
+    Append-only SQLite history of sync runs and per-file sync timings.
+
+    The sync script inserts one ``sync_runs`` row per run and one
+    ``sync_files`` row per data file; nothing is rewritten, so recording a
+    run costs one small transaction regardless of how much history exists.
+    Readers (``monitor_sync.py``, the admin API) query through indexes and
+    let SQLite do the aggregation: percentiles are answered with
+    ``ORDER BY ... LIMIT 1 OFFSET n`` and histograms and trends with a
+    single grouped scan, so no caller loads the whole history.
+
+    The database lives in the dashboard data directory by default so the
+    server can read it; it uses rollback-journal mode because WAL's shared
+    memory does not work across the Docker bind mount.
+    """
+
+    def __init__(self, path, retention_days: int = 180):
+        self.path = Path(path)
+        self.retention_days = retention_days
+        self._initialized = False
+
+    def _connect(self, readonly: bool = False) -> sqlite3.Connection:
+        if readonly:
+            conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True, timeout=10)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=10)
+            if not self._initialized:
+                conn.executescript(_SCHEMA)
+                self._migrate(conn)
+                self._initialized = True
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection):
+        """Add columns that databases created by older versions lack"""
+        for table, column, column_type in _MIGRATIONS:
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+        conn.commit()
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    # ==== WRITING ====
+
+    def record_run(self, success: bool, files: Iterable[Dict[str, Any]], duration_ms: Optional[float] = None,
+                   bytes_written: int = 0, validation_ms: Optional[float] = None,
+                   visible_ms: Optional[float] = None, snapshot_version: Optional[int] = None, errors: Optional[Sequence[str]] = None,
+                   started_at: Optional[float] = None) -> int:
+        """
+        Append one sync run with its per-file rows and return the run id.
+
+        ``visible_ms`` is the time from the start of the sync until the
+        dashboard confirmed it serves the new data (None if it was not told).
+
+        Each file dict has ``file`` and ``status`` ('synced', 'unchanged',
+        'failed', 'skipped') plus optional ``mode``, ``duration_ms``,
+        ``bytes_written``, ``rows`` and ``validation_ms``.
+        """
+        started_at = started_at or time.time()
+        files = list(files)
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "INSERT INTO sync_runs (started_at, success, duration_ms, bytes_written, validation_ms, visible_ms, "
+                "files_changed, snapshot_version, errors) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (started_at, int(success), duration_ms, bytes_written, validation_ms, visible_ms,
+                 sum(1 for f in files if f.get('status') == 'synced'), snapshot_version,
+                 json.dumps(list(errors)) if errors else None)
+            )
+            run_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO sync_files (run_id, started_at, file, status, mode, duration_ms, bytes_written, "
+                "rows, validation_ms) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, started_at, f['file'], f.get('status', 'synced'), f.get('mode'), f.get('duration_ms'),
+                  f.get('bytes_written', 0), f.get('rows'), f.get('validation_ms')) for f in files]
+            )
+            # Cheap retention: one indexed range delete per run
+            if self.retention_days:
+                cutoff = started_at - self.retention_days * 86400
+                conn.execute("DELETE FROM sync_files WHERE run_id IN (SELECT id FROM sync_runs WHERE started_at < ?)",
+                             (cutoff,))
+                conn.execute("DELETE FROM sync_runs WHERE started_at < ?", (cutoff,))
+        return run_id
+
+    def import_json_metrics(self, metrics_file) -> int:
+        """One-off import of the runs kept by the old JSON metrics file (only into an empty store)"""
+        try:
+            with open(metrics_file, 'r') as f:
+                runs = json.load(f).get('sync_runs', [])
+        except (OSError, ValueError):
+            return 0
+
+        with closing(self._connect()) as conn:
+            if conn.execute("SELECT 1 FROM sync_runs LIMIT 1").fetchone():
+                return 0
+
+        for run in runs:
+            self.record_run(
+                run.get('success', False),
+                [{'file': name, 'status': 'synced'} for name in run.get('files_synced', [])],
+                duration_ms=run['duration_seconds'] * 1000 if run.get('duration_seconds') is not None else None,
+                bytes_written=run.get('bytes_written', 0),
+                errors=run.get('errors'),
+                started_at=datetime.fromisoformat(run['timestamp']).timestamp()
+            )
+        return len(runs)
+
+    # ==== QUERIES ====
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals, last run times and the current failure streak"""
+        with closing(self._connect(readonly=True)) as conn:
+            totals = conn.execute(
+                "SELECT COUNT(*) AS total, COALESCE(SUM(success), 0) AS successful, MAX(started_at) AS last_sync "
+                "FROM sync_runs"
+            ).fetchone()
+            last_success = conn.execute(
+                "SELECT MAX(started_at) FROM sync_runs WHERE success = 1"
+            ).fetchone()[0]
+            streak = conn.execute(
+                "SELECT COUNT(*) FROM sync_runs WHERE started_at > ?", (last_success or 0,)
+            ).fetchone()[0]
+
+        total = totals['total']
+        return {
+            'total_syncs': total,
+            'successful_syncs': totals['successful'],
+            'failed_syncs': total - totals['successful'],
+            'success_rate': round(totals['successful'] / total * 100, 1) if total else None,
+            'last_sync': totals['last_sync'],
+            'last_success': last_success,
+            'consecutive_failures': streak
+        }
+
+    def recent_runs(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Newest runs first, each with its per-file rows"""
+        with closing(self._connect(readonly=True)) as conn:
+            runs = [dict(row) for row in conn.execute(
+                "SELECT * FROM sync_runs ORDER BY started_at DESC LIMIT ?", (limit,)
+            )]
+            if not runs:
+                return []
+            placeholders = ','.join('?' * len(runs))
+            files: Dict[int, List[Dict[str, Any]]] = {}
+            for row in conn.execute(
+                f"SELECT * FROM sync_files WHERE run_id IN ({placeholders}) ORDER BY file",
+                [run['id'] for run in runs]
+            ):
+                files.setdefault(row['run_id'], []).append({k: row[k] for k in row.keys() if k not in ('run_id', 'started_at')})
+
+        for run in runs:
+            run['errors'] = json.loads(run['errors']) if run['errors'] else []
+            run['files'] = files.get(run['id'], [])
+        return runs
+
+    def percentiles(self, metric: str = 'duration_ms', file: Optional[str] = None,
+                    since: Optional[float] = None, pcts: Sequence[float] = (50, 90, 95, 99)) -> Dict[str, Any]:
+        """
+        Percentiles of a run metric, or of a per-file metric when ``file`` is given.
+
+        Uses nearest-rank percentiles computed by SQLite, one
+        ``ORDER BY ... OFFSET`` query per percentile. The metric columns are
+        not indexed, so each query sorts the rows in scope (found through the
+        started_at and file indexes); retention keeps that to a few thousand.
+        """
+        table, where, params = self._scope(metric, file, since)
+        with closing(self._connect(readonly=True)) as conn:
+            count = conn.execute(f"SELECT COUNT(*) FROM {table} {where}", params).fetchone()[0]
+            result = {'metric': metric, 'file': file, 'count': count}
+            for pct in pcts:
+                if not count:
+                    result[f"p{pct:g}"] = None
+                    continue
+                offset = min(count - 1, max(0, math.ceil(pct / 100 * count) - 1))
+                result[f"p{pct:g}"] = conn.execute(
+                    f"SELECT {metric} FROM {table} {where} ORDER BY {metric} LIMIT 1 OFFSET ?", params + [offset]
+                ).fetchone()[0]
+        return result
+
+    def histogram(self, metric: str = 'duration_ms', file: Optional[str] = None, since: Optional[float] = None,
+                  buckets: Sequence[float] = DEFAULT_MS_BUCKETS) -> List[Dict[str, Any]]:
+        """Counts per bucket (``le`` is the inclusive upper bound, None for the overflow bucket)"""
+        table, where, params = self._scope(metric, file, since)
+        bounds = sorted(buckets)
+        columns = ', '.join(f"SUM(CASE WHEN {metric} <= ? THEN 1 ELSE 0 END)" for _ in bounds)
+        with closing(self._connect(readonly=True)) as conn:
+            row = conn.execute(f"SELECT {columns}, COUNT(*) FROM {table} {where}", list(bounds) + params).fetchone()
+
+        cumulative = [value or 0 for value in row]
+        histogram = []
+        previous = 0
+        for bound, total in zip(bounds + [None], cumulative):
+            histogram.append({'le': bound, 'count': total - previous})
+            previous = total
+        return histogram
+
+    def trend(self, metric: str = 'duration_ms', file: Optional[str] = None, days: int = 30,
+              bucket: str = 'day') -> List[Dict[str, Any]]:
+        """Per-day (or per-hour) count, average and maximum of a metric over the last ``days``"""
+        since = time.time() - days * 86400
+        table, where, params = self._scope(metric, file, since)
+        fmt = '%Y-%m-%d %H:00' if bucket == 'hour' else '%Y-%m-%d'
+        with closing(self._connect(readonly=True)) as conn:
+            rows = conn.execute(
+                f"SELECT strftime('{fmt}', started_at, 'unixepoch', 'localtime') AS period, COUNT(*) AS runs, "
+                f"AVG({metric}) AS avg, MAX({metric}) AS max FROM {table} {where} GROUP BY period ORDER BY period",
+                params
+            ).fetchall()
+        return [{'period': r['period'], 'runs': r['runs'], 'avg': round(r['avg'], 2) if r['avg'] is not None else None,
+                 'max': r['max']} for r in rows]
+
+    def _scope(self, metric: str, file: Optional[str], since: Optional[float]):
+        """Table and WHERE clause for a metric query (metric names are whitelisted, never interpolated from input)"""
+        allowed = FILE_METRICS if file else RUN_METRICS
+        if metric not in allowed:
+            raise ValueError(f"Unknown metric '{metric}', expected one of {', '.join(allowed)}")
+
+        clauses = [f"{metric} IS NOT NULL"]
+        params: List[Any] = []
+        if file:
+            table = 'sync_files'
+            clauses.append("file = ?")
+            params.append(file)
+        else:
+            table = 'sync_runs'
+        if since:
+            clauses.append("started_at >= ?")
+            params.append(since)
+        return table, 'WHERE ' + ' AND '.join(clauses), params
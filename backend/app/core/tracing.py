@@ -0,0 +1,240 @@
+import atexit
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+# Lightweight tracing and structured logging.
+#
+#     with span('history.read', file=name) as s:
+#         data = load()
+#         s.set(dates=len(data))
+#
+# Spans time a stage with a monotonic clock, nest through a context variable
+# (so they follow asyncio tasks), are logged as structured records and are
+# kept in a bounded buffer exportable as Chrome trace JSON (chrome://tracing,
+# Perfetto, speedscope). When tracing is off, span() returns a shared no-op
+# object, so instrumented code costs one flag check per stage.
+#
+# TRACE_SPANS=1 turns tracing on, TRACE_BUFFER caps the buffered spans and
+# TRACE_FILE (may contain {pid}) writes the trace when the process exits.
+
+_current: contextvars.ContextVar = contextvars.ContextVar('attendance_span', default=None)
+span_logger = logging.getLogger('attendance.trace')
+
+# LogRecord attributes that are not user fields
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+
+class _NoopSpan:
+    """Returned by span() while tracing is off"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """One timed stage; use through span()"""
+    __slots__ = ('tracer', 'name', 'attrs', 'parent', 'start_ns', '_token')
+
+    def __init__(self, tracer: 'Tracer', name: str, attrs: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.parent = None
+        self.start_ns = 0
+        self._token = None
+
+    def __enter__(self):
+        parent = _current.get()
+        self.parent = parent.name if parent is not None else None
+        self._token = _current.set(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ns = time.perf_counter_ns() - self.start_ns
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        self.tracer.record(self, duration_ns)
+        return False
+
+    def set(self, **attrs):
+        """Attach results known only at the end of the stage (row counts, sizes)"""
+        self.attrs.update(attrs)
+
+
+class Tracer:
+    """Collects finished spans and logs them"""
+
+    def __init__(self, enabled: bool = False, buffer_size: int = 20000):
+        self.enabled = enabled
+        self.events = deque(maxlen=buffer_size)
+
+    def record(self, span: Span, duration_ns: int):
+        # Complete ("X") event of the Chrome trace format, times in microseconds
+        self.events.append({
+            'name': span.name,
+            'cat': 'attendance',
+            'ph': 'X',
+            'ts': span.start_ns / 1000,
+            'dur': duration_ns / 1000,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': dict(span.attrs, parent=span.parent) if span.parent else dict(span.attrs)
+        })
+        if span_logger.isEnabledFor(logging.INFO):
+            duration_ms = round(duration_ns / 1e6, 3)
+            span_logger.info("⏱️  span", extra={'fields': {
+                'span': span.name, 'duration_ms': duration_ms, 'parent': span.parent, **span.attrs
+            }})
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        events = list(self.events)
+        # Name each process so the viewer shows something readable
+        metadata = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': f'attendance-dashboard {pid}'}}
+                    for pid in sorted({event['pid'] for event in events})]
+        return {'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}
+
+
+_tracer = Tracer(
+    enabled=os.getenv('TRACE_SPANS', '').lower() in ('1', 'true', 'yes'),
+    buffer_size=int(os.getenv('TRACE_BUFFER', '20000'))
+)
+
+
+def span(name: str, **attrs):
+    """Context manager timing one stage (a no-op while tracing is disabled)"""
+    if not _tracer.enabled:
+        return _NOOP_SPAN
+    return Span(_tracer, name, attrs)
+
+
+def tracing_enabled() -> bool:
+    return _tracer.enabled
+
+
+def enable_tracing(enabled: bool = True):
+    _tracer.enabled = enabled
+
+
+def clear_trace():
+    _tracer.events.clear()
+
+
+def chrome_trace() -> Dict[str, Any]:
+    """Buffered spans as a Chrome trace document"""
+    return _tracer.chrome_trace()
+
+
+def write_chrome_trace(path) -> int:
+    """Write the buffered spans as Chrome trace JSON; returns the number of spans written"""
+    trace = chrome_trace()
+    path = str(path).format(pid=os.getpid())
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(trace, f, default=str)
+    return sum(1 for event in trace['traceEvents'] if event['ph'] == 'X')
+
+
+def _write_trace_at_exit():
+    trace_file = os.getenv('TRACE_FILE')
+    if trace_file and _tracer.events:
+        try:
+            write_chrome_trace(trace_file)
+        except OSError as e:
+            sys.stderr.write(f"Could not write trace to {trace_file}: {e}\n")
+
+
+atexit.register(_write_trace_at_exit)
+
+
+# ==== STRUCTURED LOGGING ====
+
+class StructuredLogger(logging.LoggerAdapter):
+    """
+    Logger taking structured fields as keyword arguments:
+
+        logger.info("✅ Loaded attendance data", dates=52, ms=840.2)
+    """
+
+    def process(self, msg, kwargs):
+        fields = {key: kwargs.pop(key) for key in list(kwargs)
+                  if key not in ('exc_info', 'stack_info', 'stacklevel', 'extra')}
+        extra = dict(kwargs.get('extra') or {})
+        extra['fields'] = {**extra.get('fields', {}), **fields}
+        kwargs['extra'] = extra
+        return msg, kwargs
+
+
+def get_logger(name: str) -> StructuredLogger:
+    return StructuredLogger(logging.getLogger(name), {})
+
+
+class TextFormatter(logging.Formatter):
+    """The message followed by its fields as key=value"""
+
+    def format(self, record):
+        message = record.getMessage()
+        fields = getattr(record, 'fields', None)
+        if fields:
+            message += ' ' + ' '.join(f"{key}={value}" for key, value in fields.items() if value is not None)
+        if record.exc_info:
+            message += '\n' + self.formatException(record.exc_info)
+        return message
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, fields at the top level"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'pid': record.process
+        }
+        entry.update(getattr(record, 'fields', None) or {})
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key != 'fields':
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None):
+    """
+    Send application logs to stdout (where the old prints went).
+
+    LOG_LEVEL (default INFO) and LOG_FORMAT (text or json) configure it;
+    span records are only logged when TRACE_SPANS is on. Safe to call
+    more than once.
+    """
+    root = logging.getLogger()
+    if any(getattr(handler, '_attendance_handler', False) for handler in root.handlers):
+        return
+
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter() if (fmt or os.getenv('LOG_FORMAT', 'text')).lower() == 'json'
+                         else TextFormatter())
+    handler._attendance_handler = True
+    root.addHandler(handler)
+    root.setLevel((level or os.getenv('LOG_LEVEL', 'INFO')).upper())
@@ -1,10 +1,12 @@
-from fastapi import FastAPI, WebSocket, HTTPException, Depends
+from fastapi import FastAPI, WebSocket, HTTPException, Depends, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, Response, StreamingResponse
 from contextlib import asynccontextmanager
 import asyncio
+import hmac
 import json
+import time
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import os
@@ -12,23 +14,48 @@ from pathlib import Path
 
 # Import our custom modules
 from .core.data_processor import AttendanceDataProcessor
+from .core.attendance_export import EXPORT_FORMATS, accepts_gzip, export_filename, gzip_chunks
+from .core.excel_export import XLSX_CONTENT_TYPE
 from .core.analytics_engine import AnalyticsEngine
+from .core.broadcaster import WebSocketBroadcaster
+from .core.change_bus import ChangeBus
+from .core.request_profiler import RequestProfiler, PROFILE_HEADER
+from .core.metrics import HTTP_REQUEST_SECONDS, render_metrics
+from .core.fieldsets import FieldSet
+from .core.runtime_stats import gc_stats, process_memory
+from .core.tracing import chrome_trace, clear_trace, configure_logging, tracing_enabled
 from .models import AttendanceMetrics, RealTimeUpdate, AlertData
 from .routers import dashboard
 
+# Processor and trace logs go to stdout; LOG_LEVEL / LOG_FORMAT=json tune them
+configure_logging()
+
 # Global variables for real-time data
 processor = AttendanceDataProcessor()
 analytics = AnalyticsEngine()
-connected_clients = set()
+broadcaster = WebSocketBroadcaster(
+    max_queue=int(os.getenv('WS_MAX_QUEUE', '16')),
+    max_dropped=int(os.getenv('WS_MAX_DROPPED', '64')),
+    send_timeout=float(os.getenv('WS_SEND_TIMEOUT', '10'))
+)
+# Shared secret the sync daemon sends to /internal/reload; the hook is disabled when unset
+RELOAD_TOKEN = os.getenv('DASHBOARD_RELOAD_TOKEN', '')
+# Secret for the attendance exports (sent as the X-Export-Token header); they are disabled when unset
+EXPORT_TOKEN = os.getenv('EXPORT_TOKEN', '')
+# Opt-in request profiling: PROFILE_SAMPLE_PERCENT and/or PROFILE_TOKEN (sent as the X-Profile header)
+request_profiler = RequestProfiler.from_env()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
     print("🚀 Starting Redstone Attendance Intelligence Platform...")
     # Initialize data processor with existing attendance data
+    processor.attach_change_bus(ChangeBus(processor.data_dir))
     await processor.initialize()
+    processor.follow_changes()
     yield
     print("⚠️  Shutting down...")
+    await broadcaster.close_all()
 
 app = FastAPI(
     title="Redstone Attendance Intelligence Platform",
@@ -57,15 +84,15 @@ app.mount("/static", StaticFiles(directory="app/static"), name="static")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time dashboard updates"""
     await websocket.accept()
-    connected_clients.add(websocket)
+    await broadcaster.register(websocket)
     
     try:
-        # Send initial data
+        # Send initial data through the client's queue so it is ordered with broadcasts
         initial_data = await get_dashboard_data()
-        await websocket.send_json({
+        broadcaster.send(websocket, {
             "type": "initial_data",
             "data": initial_data
-        })
+        }, coalesce_key="dashboard_data")
         
         # Keep connection alive and handle messages
         while True:
@@ -73,17 +100,18 @@ async def websocket_endpoint(websocket: WebSocket):
                 # Wait for messages (could be pings from client)
                 message = await websocket.receive_text()
                 # Echo back or handle specific commands
-                await websocket.send_json({
+                if not broadcaster.send(websocket, {
                     "type": "pong",
                     "timestamp": datetime.now().isoformat()
-                })
+                }, coalesce_key="pong"):
+                    break
             except:
                 break
                 
     except Exception as e:
         print(f"WebSocket error: {e}")
     finally:
-        connected_clients.remove(websocket)
+        await broadcaster.unregister(websocket)
 
 # ==== CORE API ENDPOINTS ====
 
@@ -110,37 +138,30 @@ async def get_dashboard_metrics():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Sections of /api/dashboard/data and the call computing each
+DASHBOARD_DATA_SECTIONS = {
+    "metrics": lambda: processor.get_current_metrics(),
+    "alerts": lambda: processor.get_active_alerts(),
+    "predictions": lambda: analytics.get_predictions(),
+    "regional_data": lambda: processor.get_regional_breakdown(),
+    "attendance_history": lambda: processor.get_attendance_history(),
+    "at_risk_employees": lambda: processor.get_at_risk_employees()
+}
+
 @app.get("/api/dashboard/data")
-async def get_dashboard_data():
-    """Get complete dashboard data"""
+async def get_dashboard_data(sections: Optional[str] = None, fields: Optional[str] = None):
+    """Get dashboard data: every section, or only those named by sections= / fields="""
     try:
-        # Get current metrics
-        metrics = await processor.get_current_metrics()
-        
-        # Get alerts
-        alerts = await processor.get_active_alerts()
-        
-        # Get predictive insights
-        predictions = await analytics.get_predictions()
-        
-        # Get regional data
-        regional_data = await processor.get_regional_breakdown()
-        
-        # Get attendance history for the chart
-        attendance_history = await processor.get_attendance_history()
-        
-        # Get at-risk employees
-        at_risk_employees = await processor.get_at_risk_employees()
-        
-        return {
-            "metrics": metrics,
-            "alerts": alerts,
-            "predictions": predictions,
-            "regional_data": regional_data,
-            "attendance_history": attendance_history,
-            "at_risk_employees": at_risk_employees,
-            "last_updated": datetime.now().isoformat()
-        }
+        fieldset = FieldSet.parse(sections, fields, DASHBOARD_DATA_SECTIONS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        # Unrequested sections are not computed at all
+        computed = {name: await DASHBOARD_DATA_SECTIONS[name]() for name in fieldset.sections}
+        response = fieldset.apply(computed)
+        response["last_updated"] = datetime.now().isoformat()
+        return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -170,6 +191,108 @@ async def get_predictions():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/analytics/query")
+async def query_attendance_cube(
+    group_by: str = "",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    office: Optional[List[str]] = Query(None),
+    department: Optional[List[str]] = Query(None),
+    title: Optional[List[str]] = Query(None),
+    manager: Optional[List[str]] = Query(None),
+    status: Optional[List[str]] = Query(None)
+):
+    """Group-by query over the attendance cube, e.g. ?group_by=office,status&department=Sales&start=2025-06-01"""
+    filters = {name: values for name, values in (
+        ("office", office), ("department", department), ("title", title), ("manager", manager), ("status", status)
+    ) if values}
+    try:
+        result = await processor.query_attendance_cube(
+            [name.strip() for name in group_by.split(",") if name.strip()], filters, start, end
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "success": True,
+        "data": result,
+        "data_version": processor.data_version
+    }
+
+def require_export_token(x_export_token: str = Header(default='')):
+    # No admin session in this app, so the exports of every employee's history are guarded by EXPORT_TOKEN
+    if not EXPORT_TOKEN:
+        raise HTTPException(status_code=404, detail="Export endpoints disabled, set EXPORT_TOKEN")
+    if not hmac.compare_digest(x_export_token.encode('utf-8'), EXPORT_TOKEN.encode('utf-8')):
+        raise HTTPException(status_code=401, detail="Invalid export token")
+
+@app.get("/api/export/attendance.{fmt}", dependencies=[Depends(require_export_token)])
+async def export_attendance(
+    fmt: str,
+    request: Request,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    office: Optional[List[str]] = Query(None),
+    manager: Optional[List[str]] = Query(None)
+):
+    """Raw attendance records streamed as CSV or NDJSON (fmt), gzip-encoded when the client accepts it"""
+    try:
+        chunks = processor.export_attendance(fmt, start, end, office, manager)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    headers = {
+        "Content-Disposition": f'attachment; filename="{export_filename(fmt, start, end)}"',
+        "Vary": "Accept-Encoding",
+        "X-Accel-Buffering": "no",
+        "X-Data-Version": str(processor.data_version)
+    }
+    if accepts_gzip(request.headers.get("accept-encoding")):
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    # A sync iterator: Starlette pulls each chunk in its threadpool, so store reads never block the loop
+    return StreamingResponse(chunks, media_type=EXPORT_FORMATS[fmt], headers=headers)
+
+def excel_job_response(job: Dict) -> Dict:
+    return dict(job, status_url=f"/api/export/jobs/{job['id']}", download_url=f"/api/export/jobs/{job['id']}/download")
+
+@app.post("/api/export/attendance.xlsx", dependencies=[Depends(require_export_token)])
+async def start_excel_export(start: Optional[str] = None, end: Optional[str] = None):
+    """
+    Start building the Excel report of [start, end] in the background; 202 while it builds,
+    200 once built, 429 while EXPORT_MAX_JOBS reports are building
+    """
+    try:
+        job = processor.start_excel_export(start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=429, detail="Too many Excel reports are being built, try again shortly",
+                            headers={"Retry-After": "30"})
+    return JSONResponse({"success": True, "job": excel_job_response(job)},
+                        status_code=200 if job["state"] == "done" else 202)
+
+@app.get("/api/export/jobs/{job_id}", dependencies=[Depends(require_export_token)])
+async def excel_export_status(job_id: str):
+    """Progress of an Excel report job"""
+    job = processor.excel_export_status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Export job {job_id} not found")
+    return {"success": True, "job": excel_job_response(job)}
+
+@app.get("/api/export/jobs/{job_id}/download", dependencies=[Depends(require_export_token)])
+async def download_excel_export(job_id: str):
+    """The workbook of a finished Excel report job"""
+    job = processor.excel_export_status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Export job {job_id} not found")
+    path = processor.excel_export_path(job_id)
+    if path is None:
+        raise HTTPException(status_code=409, detail=f"Export job {job_id} is {job['state']}")
+    return FileResponse(path, media_type=XLSX_CONTENT_TYPE, filename=job["filename"],
+                        headers={"Cache-Control": "private, max-age=3600"})
+
 @app.get("/api/alerts")
 async def get_alerts():
     """Get current alerts and notifications"""
@@ -241,21 +364,109 @@ async def refresh_data():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/internal/reload")
+async def internal_reload(request: Request, x_reload_token: str = Header(default='')):
+    """Apply the files and dates the sync daemon just committed, without a restart"""
+    if not RELOAD_TOKEN:
+        raise HTTPException(status_code=404, detail="Reload hook disabled")
+    if not hmac.compare_digest(x_reload_token.encode('utf-8'), RELOAD_TOKEN.encode('utf-8')):
+        raise HTTPException(status_code=401, detail="Invalid reload token")
+    
+    try:
+        change = await request.json()
+    except ValueError:
+        change = None
+    if not isinstance(change, dict) or not isinstance(change.get('files'), list):
+        raise HTTPException(status_code=400, detail="Expected a JSON change with a files list")
+    
+    try:
+        # Reloading blocks, so keep it off the event loop
+        result = await asyncio.get_running_loop().run_in_executor(None, processor.apply_pushed_change, change)
+        return {"success": True, **result}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Request latency histogram labelled by route template"""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get('route')
+        HTTP_REQUEST_SECONDS.labels(request.method, getattr(route, 'path', 'unmatched'), status).observe(
+            time.perf_counter() - started)
+
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    """Profile sampled or X-Profile requests and keep the slowest (see core/request_profiler.py)"""
+    active = None
+    if request_profiler.enabled:
+        active = request_profiler.begin(request.url.path, request.headers.get(PROFILE_HEADER))
+    if not active:
+        return await call_next(request)
+
+    try:
+        response = await call_next(request)
+    except Exception:
+        request_profiler.cancel(active)
+        raise
+    kept = request_profiler.finish(active, request.method, request.url.path, response.status_code)
+    if kept:
+        response.headers['X-Profile-Id'] = kept['id']
+    return response
+
+def _check_profile_token(token: str):
+    # No admin session in this app, so the profiles are guarded by the profiling token itself
+    if not request_profiler.token:
+        raise HTTPException(status_code=404, detail="Profile endpoints disabled, set PROFILE_TOKEN")
+    if not request_profiler.token_matches(token):
+        raise HTTPException(status_code=401, detail="Invalid profile token")
+
+@app.get("/admin/api/profiles")
+async def request_profiles(x_profile: str = Header(default='')):
+    """Slowest profiled requests kept by this worker"""
+    _check_profile_token(x_profile)
+    return {"success": True, **request_profiler.snapshot()}
+
+@app.get("/admin/api/profiles/{profile_id}")
+async def request_profile(profile_id: str, format: str = 'folded', x_profile: str = Header(default='')):
+    """One kept profile: ?format=folded (flamegraph.pl/speedscope), text (pstats) or prof (snakeviz)"""
+    _check_profile_token(x_profile)
+    try:
+        rendered = request_profiler.render(profile_id, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if rendered is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found in worker {os.getpid()}")
+
+    content, media_type = rendered
+    extension = 'prof' if format == 'prof' else 'txt'
+    return Response(content, media_type=media_type, headers={
+        "Content-Disposition": f'inline; filename="profile-{profile_id}-{format}.{extension}"'
+    })
+
+@app.get("/admin/api/trace")
+async def trace_export(clear: bool = False, x_profile: str = Header(default='')):
+    """This worker's buffered spans as Chrome trace JSON (chrome://tracing, Perfetto); ?clear=1 empties the buffer"""
+    _check_profile_token(x_profile)
+    if not tracing_enabled():
+        raise HTTPException(status_code=404, detail="Tracing is disabled, set TRACE_SPANS=1")
+    trace = chrome_trace()
+    if clear:
+        clear_trace()
+    return JSONResponse(trace, headers={
+        "Content-Disposition": f'attachment; filename="trace-{os.getpid()}.json"'
+    })
+
 # ==== UTILITY FUNCTIONS ====
 
-async def broadcast_update(update_data: dict):
-    """Broadcast updates to all connected WebSocket clients"""
-    if connected_clients:
-        disconnected = set()
-        for client in connected_clients:
-            try:
-                await client.send_json(update_data)
-            except:
-                disconnected.add(client)
-        
-        # Remove disconnected clients
-        for client in disconnected:
-            connected_clients.discard(client)
+async def broadcast_update(update_data: dict, coalesce_key: Optional[str] = None):
+    """Broadcast updates to all connected WebSocket clients without waiting on slow sockets"""
+    return broadcaster.broadcast(update_data, coalesce_key=coalesce_key)
 
 # ==== BACKGROUND TASKS ====
 
@@ -265,6 +476,9 @@ async def periodic_updates():
         try:
             await asyncio.sleep(30)  # Update every 30 seconds
             
+            if not len(broadcaster):
+                continue
+            
             # Get fresh data
             dashboard_data = await get_dashboard_data()
             
@@ -273,7 +487,7 @@ async def periodic_updates():
                 "type": "periodic_update",
                 "data": dashboard_data,
                 "timestamp": datetime.now().isoformat()
-            })
+            }, coalesce_key="dashboard_data")
             
         except Exception as e:
             print(f"Error in periodic updates: {e}")
@@ -293,10 +507,33 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "connected_clients": len(connected_clients),
+        "connected_clients": len(broadcaster),
+        "websocket": broadcaster.get_stats(),
+        "data_version": processor.data_version,
+        "reload": processor.reload_stats,
+        "pid": os.getpid(),
+        "memory": process_memory(),
+        "gc": gc_stats(),
         "version": "1.0.0"
     }
 
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: data loaded and current, with load time, snapshot age, workers and memory"""
+    try:
+        report = processor.readiness()
+    except Exception as e:
+        report = {"ready": False, "status": "error", "error": str(e)}
+    report["timestamp"] = datetime.now().isoformat()
+    report["connected_clients"] = len(broadcaster)
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus exposition (merged across workers when PROMETHEUS_MULTIPROC_DIR is set)"""
+    content, media_type = render_metrics(processor)
+    return Response(content, media_type=media_type)
+
 @app.get("/dashboard")
 async def serve_dashboard():
     """Serve the HTML dashboard"""
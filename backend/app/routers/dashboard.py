@@ -1,5 +1,6 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import List, Optional
+from ..core.attendee_index import MAX_PAGE_SIZE
 from ..core.data_processor import AttendanceDataProcessor
 
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
@@ -10,19 +11,34 @@ async def get_processor():
     return processor
 
 @router.get("/detailed-attendance/{date}")
-async def get_detailed_attendance(date: str, processor: AttendanceDataProcessor = Depends(get_processor)):
-    """Get detailed attendance for a specific date"""
+async def get_detailed_attendance(
+    date: str,
+    status: Optional[str] = None,
+    office: Optional[str] = None,
+    department: Optional[str] = None,
+    q: Optional[str] = None,
+    sort: str = "status",
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    processor: AttendanceDataProcessor = Depends(get_processor)
+):
+    """Get detailed attendance for a specific date, optionally filtered, sorted and paged"""
     try:
-        attendance_data = await processor.get_detailed_attendance_by_date(date)
-        if not attendance_data:
-            raise HTTPException(status_code=404, detail="No attendance data for the specified date")
-        return {
-            "success": True,
-            "data": attendance_data,
-            "date": date
-        }
+        attendance_data = await processor.get_detailed_attendance_by_date(
+            date, status=status, office=office, department=department, q=q,
+            sort=sort, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    if not attendance_data:
+        raise HTTPException(status_code=404, detail="No attendance data for the specified date")
+    return {
+        "success": True,
+        "data": attendance_data,
+        "date": date
+    }
 
 @router.get("/available-dates")
 async def get_available_dates(processor: AttendanceDataProcessor = Depends(get_processor)):
@@ -0,0 +1,186 @@
+"""
+Backend benchmarks: each DASHBOARD_STORAGE and ANALYTICS_ENGINE pair
+against the default JSON files with in-memory indexes.
+
+Each case runs on a private copy of the dataset with the backend set per
+processor; the SQLite database and the Parquet lake are created inside
+that copy, so the first load includes importing the JSON history into
+them. Every read is also checked against the files/memory backend (the
+shared ``loaded_processor``), so a faster backend cannot pass by
+answering differently. The duckdb pairs are skipped when duckdb is not
+installed.
+"""
+
+import importlib.util
+import json
+import time
+
+import pytest
+
+from conftest import make_processor
+from core.excel_export import build_workbook
+from synthetic_data import copy_dataset
+
+_NO_DUCKDB = pytest.mark.skipif(importlib.util.find_spec('duckdb') is None, reason='duckdb is not installed')
+
+# (DASHBOARD_STORAGE, ANALYTICS_ENGINE); the first is the reference
+BACKENDS = [
+    pytest.param(('files', 'memory'), id='files-memory'),
+    pytest.param(('sqlite', 'memory'), id='sqlite-memory'),
+    pytest.param(('files', 'duckdb'), id='files-duckdb', marks=_NO_DUCKDB),
+    pytest.param(('sqlite', 'duckdb'), id='sqlite-duckdb', marks=_NO_DUCKDB),
+]
+# The report build reads the store, never the analytics engine
+STORAGE_BACKENDS = [backend for backend in BACKENDS if backend.values[0][1] == 'memory']
+
+CUBE_QUERIES = {
+    'month-department-status': (['month', 'department', 'status'], None, None, None),
+    'office-absent-quarter': (['office'], {'status': ['Absent']}, None, None),
+    'manager-date-regional': (['manager', 'date'], {'title': ['Regional Manager']}, None, None),
+}
+
+
+def normalized(result):
+    """A result as plain JSON values, for comparing backends (without the cube's scan counter)"""
+    result = json.loads(json.dumps(result, sort_keys=True, default=str))
+    if isinstance(result, dict):
+        result.pop('cells_scanned', None)
+    return result
+
+
+@pytest.fixture(params=BACKENDS)
+def backend_processor(request, data_dir, event_loop_runner):
+    """Processor over a private copy of the dataset, using each (storage, engine) pair"""
+    storage, engine = request.param
+    return make_processor(data_dir, event_loop_runner, storage, engine)
+
+
+@pytest.mark.benchmark(group='backend-load')
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_initialize_backend(benchmark, data_dir, event_loop_runner, loaded_processor, backend):
+    # Round one imports the JSON history into SQLite and writes the lake; later rounds find both up to date
+    processor = benchmark.pedantic(make_processor, args=(data_dir, event_loop_runner) + backend, rounds=3)
+    assert normalized(processor.historical_data) == normalized(loaded_processor.historical_data)
+
+
+@pytest.mark.benchmark(group='backend-upload')
+def test_process_attendance_file_backend(benchmark, backend_processor, event_loop_runner, dataset, tmp_path):
+    # Under duckdb this includes rewriting the uploaded date's month
+    report = str(dataset['teams_reports'][0])
+    assert benchmark.pedantic(lambda: event_loop_runner(backend_processor.process_attendance_file(report)),
+                              rounds=3)
+
+    reference = make_processor(copy_dataset(dataset['path'], tmp_path / 'reference'), event_loop_runner)
+    event_loop_runner(reference.process_attendance_file(report))
+    assert normalized(backend_processor.historical_data) == normalized(reference.historical_data)
+
+
+@pytest.mark.benchmark(group='backend-reload')
+def test_reload_changed_single_date_backend(benchmark, backend_processor, event_loop_runner, dataset):
+    files = [backend_processor.history_file]
+    dates = [dataset['dates'][-1]]
+    benchmark.pedantic(lambda: event_loop_runner(backend_processor.reload_changed(files, dates)), rounds=3)
+
+
+@pytest.mark.benchmark(group='backend-queries')
+def test_get_attendance_history_backend(benchmark, backend_processor, event_loop_runner, loaded_processor):
+    result = benchmark(lambda: event_loop_runner(backend_processor.get_attendance_history()))
+    assert result
+    assert normalized(result) == normalized(event_loop_runner(loaded_processor.get_attendance_history()))
+
+
+@pytest.mark.benchmark(group='backend-queries')
+def test_get_at_risk_employees_backend(benchmark, backend_processor, event_loop_runner, loaded_processor):
+    result = benchmark(lambda: event_loop_runner(backend_processor.get_at_risk_employees()))
+    assert result
+    assert normalized(result) == normalized(event_loop_runner(loaded_processor.get_at_risk_employees()))
+
+
+@pytest.mark.benchmark(group='backend-queries')
+def test_get_regional_breakdown_backend(benchmark, backend_processor, event_loop_runner, loaded_processor):
+    result = benchmark(lambda: event_loop_runner(backend_processor.get_regional_breakdown()))
+    assert normalized(result) == normalized(event_loop_runner(loaded_processor.get_regional_breakdown()))
+
+
+@pytest.mark.benchmark(group='backend-queries')
+def test_get_detailed_attendance_oldest_date_backend(benchmark, backend_processor, event_loop_runner,
+                                                     loaded_processor, dataset):
+    # The oldest date is in a cold month under SQLite storage; clearing the caches measures the read
+    date = dataset['dates'][0]
+
+    def fetch():
+        backend_processor._attendee_indexes.clear()
+        backend_processor.cold_months.invalidate()
+        return event_loop_runner(backend_processor.get_detailed_attendance_by_date(date, limit=50))
+
+    result = benchmark(fetch)
+    assert result['detailed_attendees']
+    expected = event_loop_runner(loaded_processor.get_detailed_attendance_by_date(date, limit=50))
+    assert normalized(result) == normalized(expected)
+
+
+@pytest.mark.benchmark(group='backend-cube')
+@pytest.mark.parametrize('query', sorted(CUBE_QUERIES))
+def test_query_attendance_cube_backend(benchmark, backend_processor, event_loop_runner, loaded_processor, dataset,
+                                       query):
+    group_by, filters, start, end = CUBE_QUERIES[query]
+    if query == 'office-absent-quarter':
+        # The last ~13 weeks: month pruning skips most partitions
+        start = dataset['dates'][-13]
+    result = benchmark(lambda: event_loop_runner(backend_processor.query_attendance_cube(group_by, filters, start, end)))
+    assert result['dates']
+    expected = event_loop_runner(loaded_processor.query_attendance_cube(group_by, filters, start, end))
+    assert normalized(result) == normalized(expected)
+
+
+@pytest.mark.benchmark(group='backend-cube-cold')
+def test_query_attendance_cube_cold_backend(benchmark, backend_processor, event_loop_runner, loaded_processor):
+    # A new (group-by, filters) combination each round: no rollup or cached result to reuse
+    combinations = iter([[name] for name in ('office', 'department', 'title', 'manager', 'status')] * 10)
+    queried = []
+
+    def query():
+        group_by = next(combinations)
+        queried.append(group_by)
+        return event_loop_runner(backend_processor.query_attendance_cube(group_by, {'status': ['Present']}))
+
+    result = benchmark.pedantic(query, rounds=5)
+    assert result['rows']
+    expected = event_loop_runner(loaded_processor.query_attendance_cube(queried[-1], {'status': ['Present']}))
+    assert normalized(result) == normalized(expected)
+
+
+@pytest.mark.benchmark(group='backend-export')
+def test_export_attendance_csv_backend(benchmark, backend_processor, loaded_processor):
+    # Consumes the stream the way a response would, without keeping it
+    def export():
+        return sum(len(chunk) for chunk in backend_processor.export_attendance('csv'))
+
+    assert benchmark.pedantic(export, rounds=3)
+    assert b''.join(backend_processor.export_attendance('csv')) == b''.join(loaded_processor.export_attendance('csv'))
+
+
+@pytest.mark.benchmark(group='backend-export')
+@pytest.mark.parametrize('backend_processor', STORAGE_BACKENDS, indirect=True)
+def test_build_excel_report_backend(benchmark, backend_processor, tmp_path):
+    # The report job's build step, run in the foreground
+    def build():
+        path = tmp_path / 'report.xlsx'
+        build_workbook(path, backend_processor._iter_records(None, None), backend_processor.employee_data,
+                       backend_processor.historical_data, {}, lambda fraction, stage: None)
+        return path.stat().st_size
+
+    assert benchmark.pedantic(build, rounds=1)
+
+
+@pytest.mark.benchmark(group='backend-export')
+@pytest.mark.parametrize('backend_processor', STORAGE_BACKENDS, indirect=True)
+def test_start_excel_report_cached_backend(benchmark, backend_processor):
+    job = backend_processor.start_excel_export()
+    deadline = time.time() + 300
+    while job['state'] == 'running' and time.time() < deadline:
+        time.sleep(0.2)
+        job = backend_processor.excel_export_status(job['id'])
+    assert job['state'] == 'done', job
+
+    assert benchmark(backend_processor.start_excel_export)['state'] == 'done'
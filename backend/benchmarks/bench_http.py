@@ -0,0 +1,206 @@
+"""
+HTTP endpoint benchmarks through the Flask and FastAPI test clients.
+
+Both apps are pointed at the synthetic dataset. These measure the full
+request path (routing, processor call, JSON encoding) in-process; use
+``benchmarks/load_test.py``-style tools for throughput under concurrency.
+"""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from core.change_bus import ChangeBus
+
+READ_ENDPOINTS = [
+    '/api/dashboard/data',
+    '/api/analytics/query?group_by=office,status&start=2000-01-01',
+    '/api/dashboard/metrics',
+    '/api/attendance/history',
+    '/api/alerts',
+    '/api/employees/at-risk',
+    '/api/dashboard/available-dates',
+    '/api/dashboard/regional-breakdown',
+    '/health',
+    '/health/ready'
+]
+
+FASTAPI_ENDPOINTS = [
+    '/api/dashboard/data',
+    '/api/analytics/query?group_by=office,status&start=2000-01-01',
+    '/api/dashboard/data?sections=metrics',
+    '/api/dashboard/metrics',
+    '/api/attendance/history',
+    '/api/alerts',
+    '/api/employees/at-risk',
+    '/api/dashboard/available-dates',
+    '/health',
+    '/health/ready'
+]
+
+
+def _point_at(processor, data_dir):
+    processor.data_dir = Path(data_dir)
+    processor.attach_change_bus(ChangeBus(processor.data_dir))
+
+
+@pytest.fixture(scope='module')
+def flask_server(dataset, tmp_path_factory):
+    """The Flask app (dashboard_server) serving the synthetic dataset"""
+    import dashboard_server
+
+    # Let the import's background load of the default data directory finish before repointing
+    dashboard_server.processor.wait_until_warm()
+    _point_at(dashboard_server.processor, dataset['path'])
+    asyncio.run(dashboard_server.processor.initialize())
+    dashboard_server.UPLOAD_FOLDER = tmp_path_factory.mktemp('uploads')
+    return dashboard_server
+
+
+@pytest.fixture
+def flask_client(flask_server):
+    return flask_server.app.test_client()
+
+
+@pytest.fixture
+def flask_admin_client(flask_server, data_dir):
+    """Logged-in admin client whose uploads write to a private copy of the data"""
+    _point_at(flask_server.processor, data_dir)
+    asyncio.run(flask_server.processor.initialize())
+    client = flask_server.app.test_client()
+    with client.session_transaction() as session:
+        session['admin_logged_in'] = True
+    yield client
+    _point_at(flask_server.processor, data_dir.parent)
+
+
+@pytest.fixture(scope='module')
+def fastapi_client(dataset):
+    """The FastAPI app (app.main) serving the synthetic dataset"""
+    pytest.importorskip('httpx')
+    from fastapi.testclient import TestClient
+    from app import main
+
+    _point_at(main.processor, dataset['path'])
+    with TestClient(main.app) as client:
+        yield client
+
+
+# ==== FLASK ====
+
+@pytest.mark.benchmark(group='http-flask')
+@pytest.mark.parametrize('path', READ_ENDPOINTS)
+def test_flask_get(benchmark, flask_client, path):
+    response = benchmark(flask_client.get, path)
+    assert response.status_code == 200
+
+
+@pytest.mark.benchmark(group='http-flask')
+def test_flask_dashboard_data_uncached(benchmark, flask_server, flask_client):
+    """Dashboard payload when every section has to be recomputed (first request after a data change)"""
+    def invalidate():
+        with flask_server._section_cache_lock:
+            flask_server._section_cache['version'] = None
+
+    response = benchmark.pedantic(flask_client.get, args=('/api/dashboard/data',), setup=invalidate, rounds=10)
+    assert response.status_code == 200
+
+
+@pytest.mark.benchmark(group='http-flask')
+def test_flask_dashboard_data_fields_uncached(benchmark, flask_server, flask_client):
+    """Executive view: metrics plus two columns of the regional rows, after a data change"""
+    def invalidate():
+        with flask_server._section_cache_lock:
+            flask_server._section_cache['version'] = None
+
+    path = '/api/dashboard/data?fields=metrics,regional_data.manager_name,regional_data.attendance_rate'
+    response = benchmark.pedantic(flask_client.get, args=(path,), setup=invalidate, rounds=10)
+    assert set(response.get_json()['regional_data'][0]) == {'manager_name', 'attendance_rate'}
+
+
+@pytest.mark.benchmark(group='http-flask')
+def test_flask_detailed_attendance(benchmark, flask_client, dataset):
+    response = benchmark(flask_client.get, f"/api/dashboard/detailed-attendance/{dataset['dates'][-1]}")
+    assert response.status_code == 200
+
+
+@pytest.mark.benchmark(group='http-flask')
+def test_flask_detailed_attendance_page(benchmark, flask_client, dataset):
+    path = f"/api/dashboard/detailed-attendance/{dataset['dates'][-1]}?status=Present&sort=name&limit=50"
+    response = benchmark(flask_client.get, path)
+    assert response.status_code == 200
+    assert len(response.get_json()['data']['detailed_attendees']) <= 50
+
+
+@pytest.mark.benchmark(group='http-flask-admin')
+def test_flask_upload_teams_report(benchmark, flask_admin_client, dataset):
+    report = dataset['teams_reports'][0]
+
+    def upload():
+        with open(report, 'rb') as f:
+            return flask_admin_client.post('/admin/upload/attendance', data={'file': (f, report.name)},
+                                           content_type='multipart/form-data')
+
+    response = benchmark.pedantic(upload, rounds=3)
+    assert response.get_json()['file_info']['status'] == 'processed'
+
+
+@pytest.mark.benchmark(group='http-flask-admin')
+def test_flask_upload_directory(benchmark, flask_admin_client, data_dir):
+    directory = data_dir / 'peoplehubdirectory20250708.csv'
+
+    def upload():
+        with open(directory, 'rb') as f:
+            return flask_admin_client.post('/admin/upload/directory', data={'file': (f, directory.name)},
+                                           content_type='multipart/form-data')
+
+    response = benchmark.pedantic(upload, rounds=3)
+    assert response.status_code == 200
+
+
+@pytest.mark.benchmark(group='http-export')
+@pytest.mark.parametrize('encoding', ['identity', 'gzip'])
+def test_flask_export_attendance_csv(benchmark, flask_client, encoding):
+    """Every record of the dataset as CSV, streamed (and gzip-compressed on the fly)"""
+    assert flask_client.get('/api/export/attendance.csv').status_code == 302  # To the admin login
+    with flask_client.session_transaction() as session:
+        session['admin_logged_in'] = True
+    response = benchmark.pedantic(flask_client.get, args=('/api/export/attendance.csv',),
+                                  kwargs={'headers': {'Accept-Encoding': encoding}}, rounds=3)
+    assert response.status_code == 200
+    assert response.headers.get('Content-Encoding') == (None if encoding == 'identity' else 'gzip')
+
+
+# ==== FASTAPI ====
+
+@pytest.mark.benchmark(group='http-fastapi')
+@pytest.mark.parametrize('path', FASTAPI_ENDPOINTS)
+def test_fastapi_get(benchmark, fastapi_client, path):
+    response = benchmark(fastapi_client.get, path)
+    assert response.status_code == 200
+
+
+@pytest.mark.benchmark(group='http-fastapi')
+def test_fastapi_detailed_attendance(benchmark, fastapi_client, dataset):
+    response = benchmark(fastapi_client.get, f"/api/dashboard/detailed-attendance/{dataset['dates'][-1]}")
+    assert response.status_code == 200
+
+
+@pytest.mark.benchmark(group='http-fastapi')
+def test_fastapi_detailed_attendance_page(benchmark, fastapi_client, dataset):
+    path = f"/api/dashboard/detailed-attendance/{dataset['dates'][-1]}?status=Present&sort=name&limit=50"
+    response = benchmark(fastapi_client.get, path)
+    assert response.status_code == 200
+    assert len(response.json()['data']['detailed_attendees']) <= 50
+
+
+@pytest.mark.benchmark(group='http-export')
+def test_fastapi_export_attendance_ndjson(benchmark, fastapi_client, monkeypatch):
+    from app import main
+
+    monkeypatch.setattr(main, 'EXPORT_TOKEN', 'benchmark')
+    assert fastapi_client.get('/api/export/attendance.ndjson').status_code == 401
+    response = benchmark.pedantic(fastapi_client.get, args=('/api/export/attendance.ndjson',),
+                                  kwargs={'headers': {'X-Export-Token': 'benchmark'}}, rounds=3)
+    assert response.status_code == 200
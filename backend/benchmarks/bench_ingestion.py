@@ -0,0 +1,119 @@
+"""
+Ingestion benchmarks: the sync script (full, unchanged and one-date delta
+syncs), reading the history back, and the streaming parsers it relies on.
+"""
+
+import json
+import logging
+import os
+import shutil
+from itertools import chain
+
+import pytest
+
+import sync_data
+from core.history_delta import HistoryDeltaLog
+from core.json_stream import iter_object_items
+from sync_config import load_config
+from synthetic_data import HISTORY_FILE, iter_attendance_history, generate_directory, write_history
+
+
+@pytest.fixture
+def make_sync(tmp_path):
+    """Factory for an AttendanceDataSync from a source directory into a fresh target"""
+    sync_data.logger = logging.getLogger('benchmark.sync')
+    sync_data.logger.setLevel(logging.WARNING)
+
+    def factory(source_dir):
+        target = tmp_path / 'target'
+        config = load_config()
+        config.update(source_directory=str(source_dir), target_directory=str(target), backup_enabled=False,
+                      metrics_file=None, metrics_db=str(tmp_path / 'sync_metrics.db'),
+                      container_health_check=False, dashboard_url='', email_notifications=False)
+        return sync_data.AttendanceDataSync(source_dir, target, False, config)
+
+    return factory
+
+
+@pytest.fixture
+def alternating_source(tmp_path, dataset, data_dir):
+    """
+    Source directory plus a setup function that flips its history between
+    the dataset and the dataset with one more meeting, so every sync is a
+    one-date change
+    """
+    base = data_dir / HISTORY_FILE
+    extended = tmp_path / 'extended_history.json'
+    directory = generate_directory(dataset['employees'])
+    extra_date = '2099-01-06'
+    with open(base, 'rb') as f:
+        write_history(extended, chain(iter_object_items(f), iter_attendance_history(directory, [extra_date])))
+
+    variants = [extended, tmp_path / 'base_history.json']
+    os.link(base, variants[1])
+    state = {'next': 0}
+
+    def flip():
+        variant = variants[state['next'] % 2]
+        state['next'] += 1
+        staging = data_dir / f"{HISTORY_FILE}.flip"
+        os.link(variant, staging)
+        os.replace(staging, base)
+
+    return data_dir, flip
+
+
+@pytest.mark.benchmark(group='sync')
+def test_sync_all_full(benchmark, make_sync, dataset, tmp_path):
+    def setup():
+        shutil.rmtree(tmp_path / 'target', ignore_errors=True)
+        return (make_sync(dataset['path']),), {}
+
+    assert benchmark.pedantic(lambda sync: sync.sync_all(), setup=setup, rounds=3)
+
+
+@pytest.mark.benchmark(group='sync')
+def test_sync_all_unchanged(benchmark, make_sync, dataset):
+    sync = make_sync(dataset['path'])
+    sync.sync_all()
+    assert benchmark.pedantic(sync.sync_all, rounds=5)
+    assert not sync.files_changed
+
+
+@pytest.mark.benchmark(group='sync')
+def test_sync_all_one_date_delta(benchmark, make_sync, alternating_source):
+    source, flip = alternating_source
+    sync = make_sync(source)
+    sync.sync_all()
+    assert benchmark.pedantic(sync.sync_all, setup=flip, rounds=5)
+    assert sync.history_delta
+
+
+@pytest.mark.benchmark(group='history-read')
+def test_json_load_history(benchmark, dataset):
+    def load():
+        with open(dataset['path'] / HISTORY_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    assert len(benchmark.pedantic(load, rounds=3)) == len(dataset['dates'])
+
+
+@pytest.mark.benchmark(group='history-read')
+def test_history_log_load(benchmark, dataset):
+    log = HistoryDeltaLog(dataset['path'])
+    assert len(benchmark.pedantic(log.load, rounds=3)) == len(dataset['dates'])
+
+
+@pytest.mark.benchmark(group='history-read')
+def test_iter_object_items_streaming(benchmark, dataset):
+    def stream():
+        with open(dataset['path'] / HISTORY_FILE, 'rb') as f:
+            return sum(1 for _ in iter_object_items(f))
+
+    assert benchmark.pedantic(stream, rounds=3) == len(dataset['dates'])
+
+
+@pytest.mark.benchmark(group='directory-read')
+def test_count_csv_rows(benchmark, dataset):
+    path = dataset['path'] / 'peoplehubdirectory20250708.csv'
+    assert benchmark(sync_data.count_csv_rows, path) == dataset['employees'] + 1
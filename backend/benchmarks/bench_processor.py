@@ -0,0 +1,174 @@
+"""
+AttendanceDataProcessor benchmarks: one case per public method.
+
+Read-only methods share a processor loaded once per session; methods that
+load or write data get a fresh processor over a private copy of the data.
+"""
+
+import time
+
+import pytest
+
+from conftest import make_processor
+
+
+# ==== QUERIES ====
+
+@pytest.mark.benchmark(group='processor-queries')
+def test_get_current_metrics(benchmark, loaded_processor, event_loop_runner):
+    result = benchmark(lambda: event_loop_runner(loaded_processor.get_current_metrics()))
+    assert result['data_source'] == 'real'
+
+
+@pytest.mark.benchmark(group='processor-queries')
+def test_get_active_alerts(benchmark, loaded_processor, event_loop_runner):
+    benchmark(lambda: event_loop_runner(loaded_processor.get_active_alerts()))
+
+
+@pytest.mark.benchmark(group='processor-queries')
+def test_get_regional_breakdown(benchmark, loaded_processor, event_loop_runner):
+    result = benchmark(lambda: event_loop_runner(loaded_processor.get_regional_breakdown()))
+    assert result and 'team_size' in result[0]
+
+
+@pytest.mark.benchmark(group='processor-queries')
+def test_get_attendance_history(benchmark, loaded_processor, event_loop_runner, dataset):
+    result = benchmark(lambda: event_loop_runner(loaded_processor.get_attendance_history()))
+    assert len(result['data']) == len(dataset['dates'])
+
+
+@pytest.mark.benchmark(group='processor-queries')
+def test_get_at_risk_employees(benchmark, loaded_processor, event_loop_runner):
+    result = benchmark(lambda: event_loop_runner(loaded_processor.get_at_risk_employees()))
+    assert result
+
+
+@pytest.mark.benchmark(group='processor-queries')
+def test_get_region_detail(benchmark, loaded_processor, event_loop_runner):
+    benchmark(lambda: event_loop_runner(loaded_processor.get_region_detail('Texas')))
+
+
+@pytest.mark.benchmark(group='processor-queries')
+def test_get_detailed_attendance_by_date(benchmark, loaded_processor, event_loop_runner, dataset):
+    date = dataset['dates'][-1]
+    result = benchmark(lambda: event_loop_runner(loaded_processor.get_detailed_attendance_by_date(date)))
+    assert result['total_employees'] == dataset['employees']
+
+
+@pytest.mark.benchmark(group='processor-queries')
+@pytest.mark.parametrize('sort', ['status', '-duration'])
+def test_get_detailed_attendance_page(benchmark, loaded_processor, event_loop_runner, dataset, sort):
+    date = dataset['dates'][-1]
+    first = event_loop_runner(loaded_processor.get_detailed_attendance_by_date(date, sort=sort, limit=50))
+    cursor = first['page']['next_cursor']
+    result = benchmark(lambda: event_loop_runner(loaded_processor.get_detailed_attendance_by_date(
+        date, status='Present', sort=sort, limit=50, cursor=cursor)))
+    assert len(result['detailed_attendees']) <= 50
+
+
+@pytest.mark.benchmark(group='processor-queries')
+@pytest.mark.parametrize('rollups', ['cold', 'warm'])
+def test_query_attendance_cube(benchmark, loaded_processor, event_loop_runner, rollups):
+    """Month x department x status over the whole history, with and without its rollups already built"""
+    def setup():
+        if rollups == 'cold':
+            loaded_processor.cube._rollups.clear()
+
+    result = benchmark.pedantic(lambda: event_loop_runner(loaded_processor.query_attendance_cube(
+        ['month', 'department', 'status'])), setup=setup, rounds=10)
+    assert result['rows']
+
+
+@pytest.mark.benchmark(group='processor-queries')
+def test_get_available_dates(benchmark, loaded_processor, event_loop_runner, dataset):
+    result = benchmark(lambda: event_loop_runner(loaded_processor.get_available_dates()))
+    assert len(result) == len(dataset['dates'])
+
+
+@pytest.mark.benchmark(group='processor-queries')
+def test_acknowledge_alert(benchmark, loaded_processor, event_loop_runner):
+    assert benchmark(lambda: event_loop_runner(loaded_processor.acknowledge_alert('alert_1')))
+
+
+@pytest.mark.benchmark(group='processor-queries')
+def test_readiness(benchmark, loaded_processor):
+    assert benchmark(loaded_processor.readiness)['ready']
+
+
+# ==== LOADING ====
+
+@pytest.mark.benchmark(group='processor-load')
+def test_initialize(benchmark, dataset, event_loop_runner):
+    processor = benchmark.pedantic(make_processor, args=(dataset['path'], event_loop_runner), rounds=3)
+    assert len(processor.attendance_data) == len(dataset['dates'])
+
+
+@pytest.mark.benchmark(group='processor-load')
+def test_load_historical_data(benchmark, writable_processor, event_loop_runner):
+    benchmark.pedantic(lambda: event_loop_runner(writable_processor.load_historical_data()), rounds=3)
+
+
+@pytest.mark.benchmark(group='processor-load')
+def test_load_rm_attendance_data(benchmark, writable_processor, event_loop_runner):
+    benchmark(lambda: event_loop_runner(writable_processor.load_rm_attendance_data()))
+
+
+@pytest.mark.benchmark(group='processor-load')
+def test_load_employee_data(benchmark, writable_processor, event_loop_runner, dataset):
+    benchmark(lambda: event_loop_runner(writable_processor.load_employee_data()))
+    assert len(writable_processor.employee_data) == dataset['employees']
+
+
+@pytest.mark.benchmark(group='processor-load')
+def test_create_sample_data(benchmark, writable_processor, event_loop_runner):
+    benchmark(lambda: event_loop_runner(writable_processor.create_sample_data()))
+
+
+# ==== CHANGES ====
+
+@pytest.mark.benchmark(group='processor-changes')
+def test_refresh_data(benchmark, writable_processor, event_loop_runner):
+    benchmark.pedantic(lambda: event_loop_runner(writable_processor.refresh_data()), rounds=3)
+
+
+@pytest.mark.benchmark(group='processor-changes')
+def test_reload_changed_single_date(benchmark, writable_processor, event_loop_runner, dataset):
+    files = [writable_processor.history_file]
+    dates = [dataset['dates'][-1]]
+    benchmark.pedantic(lambda: event_loop_runner(writable_processor.reload_changed(files, dates)), rounds=3)
+
+
+@pytest.mark.benchmark(group='processor-changes')
+def test_apply_bus_changes_directory(benchmark, writable_processor, event_loop_runner):
+    entry = {'version': 1, 'files': [writable_processor.employee_file], 'dates': [],
+             'sections': ['regional_data'], 'published_at': time.time()}
+    benchmark(lambda: event_loop_runner(writable_processor.apply_bus_changes([entry], True, entry['version'])))
+
+
+@pytest.mark.benchmark(group='processor-changes')
+def test_apply_pushed_change(benchmark, writable_processor):
+    versions = iter(range(writable_processor.data_version + 1, 10 ** 9))
+
+    def push():
+        return writable_processor.apply_pushed_change({
+            'version': next(versions), 'files': [writable_processor.rm_history_file], 'dates': [],
+            'published_at': time.time()
+        })
+
+    benchmark(push)
+
+
+# ==== INGESTION ====
+
+@pytest.mark.benchmark(group='processor-ingestion')
+def test_process_attendance_file_teams(benchmark, writable_processor, event_loop_runner, dataset):
+    report = str(dataset['teams_reports'][0])
+    assert benchmark.pedantic(lambda: event_loop_runner(writable_processor.process_attendance_file(report)),
+                              rounds=3)
+
+
+@pytest.mark.benchmark(group='processor-ingestion')
+def test_process_directory_file(benchmark, writable_processor, event_loop_runner, data_dir):
+    directory = str(data_dir / writable_processor.employee_file)
+    assert benchmark.pedantic(lambda: event_loop_runner(writable_processor.process_directory_file(directory)),
+                              rounds=3)
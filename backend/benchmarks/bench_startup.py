@@ -0,0 +1,29 @@
+"""
+Startup benchmarks: importing the servers and the data processor in a fresh
+interpreter. Heavy modules (pandas, numpy) must not be imported by any of
+them; uploads import pandas when they need it.
+
+Time to first response is measured by benchmarks/startup.py --server, which
+starts real server processes.
+"""
+
+import os
+
+import pytest
+
+from startup import BACKEND_DIR, measure_import
+
+HEAVY_MODULES = ('pandas', 'numpy')
+
+
+@pytest.fixture
+def import_env(dataset, tmp_path):
+    return dict(os.environ, DASHBOARD_DATA_DIR=str(dataset['path']), UPLOAD_FOLDER=str(tmp_path / 'uploads'),
+                LOG_LEVEL='WARNING', PYTHONPATH=str(BACKEND_DIR / 'app'))
+
+
+@pytest.mark.parametrize('module', ['core.data_processor', 'dashboard_server', 'app.main'])
+def test_import(benchmark, import_env, module):
+    result = benchmark.pedantic(measure_import, args=(module, import_env), rounds=3, iterations=1)
+    benchmark.extra_info['import_ms'] = result['import_ms']
+    assert not [name for name in HEAVY_MODULES if name in result['modules']]
@@ -0,0 +1,89 @@
+"""
+Shared fixtures for the pytest-benchmark suite.
+
+The synthetic dataset is generated once per scale and cached under
+``benchmarks/.data``; tests that modify data work on a hard-linked copy.
+
+Usage (from backend/):
+    pip install -r benchmarks/requirements.txt
+    pytest benchmarks                                   # 1k employees x 50 dates
+    pytest benchmarks --employees 20000 --dates 200     # larger scale
+    pytest benchmarks --benchmark-autosave              # keep results for --benchmark-compare
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+for path in (BACKEND_DIR, BACKEND_DIR / 'app', BACKEND_DIR / 'scripts', Path(__file__).resolve().parent):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+from core.change_bus import ChangeBus
+from core.data_processor import AttendanceDataProcessor
+from synthetic_data import cached_dataset, copy_dataset, meeting_dates
+
+CACHE_DIR = Path(__file__).resolve().parent / '.data'
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('attendance benchmarks')
+    group.addoption('--employees', type=int, default=1000, help='Synthetic employees (1k-100k)')
+    group.addoption('--dates', type=int, default=50, help='Synthetic weekly meeting dates (50-1000)')
+    group.addoption('--seed', type=int, default=0, help='Synthetic data seed')
+
+
+@pytest.fixture(scope='session')
+def event_loop_runner():
+    """Run coroutines on one loop for the whole session, so asyncio.run setup is not measured"""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture(scope='session')
+def dataset(request):
+    """Description of the cached synthetic dataset for the requested scale"""
+    employees = request.config.getoption('--employees')
+    dates = request.config.getoption('--dates')
+    seed = request.config.getoption('--seed')
+    target = cached_dataset(CACHE_DIR, employees, dates, seed)
+
+    reports = sorted((target / 'teams_reports').glob('*.csv'))
+    return {
+        'path': target,
+        'employees': employees,
+        'dates': meeting_dates(dates),
+        'teams_reports': reports
+    }
+
+
+@pytest.fixture
+def data_dir(dataset, tmp_path):
+    """Writable copy of the dataset (hard links, so creating it is cheap at any scale)"""
+    return copy_dataset(dataset['path'], tmp_path / 'data')
+
+
+def make_processor(data_dir, run, storage: str = 'files', engine: str = 'memory') -> AttendanceDataProcessor:
+    processor = AttendanceDataProcessor()
+    processor.data_dir = Path(data_dir)
+    processor.storage = storage
+    processor.analytics_engine = engine
+    processor.attach_change_bus(ChangeBus(processor.data_dir))
+    run(processor.initialize())
+    return processor
+
+
+@pytest.fixture(scope='session')
+def loaded_processor(dataset, event_loop_runner):
+    """Processor loaded from the cached dataset, shared by read-only benchmarks"""
+    return make_processor(dataset['path'], event_loop_runner)
+
+
+@pytest.fixture
+def writable_processor(data_dir, event_loop_runner):
+    """Processor over a private copy of the dataset, for benchmarks that write"""
+    return make_processor(data_dir, event_loop_runner)
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+HTTP load test for the dashboard servers
+
+Simulates the traffic a deployment actually sees and reports latency
+percentiles and throughput per endpoint:
+
+- tabs: open dashboards polling ``/api/dashboard/data`` every 30 seconds
+  (the dashboard.html fallback when the event stream is unavailable, so
+  the worst case), started evenly across the first poll interval
+- drill-downs: users opening the attendance modal, which loads
+  ``/api/dashboard/available-dates`` and then
+  ``/api/dashboard/detailed-attendance/<date>`` for a random date
+- admins: logging in and uploading a Teams attendance report every
+  ``--upload-interval`` seconds (Flask only; FastAPI has no upload route)
+
+Every simulated user keeps a fixed schedule, so a slow server does not
+get a lighter load. With ``--server`` the script generates (or reuses) a
+synthetic dataset, copies it to a temporary directory and starts the
+server on it, so runs are reproducible and never touch backend/data.
+
+Usage (from backend/):
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/load_test.py --server flask --tabs 200 --duration 120
+    python benchmarks/load_test.py --server fastapi --tabs 200 --workers 4
+    python benchmarks/load_test.py --server flask --employees 20000 --dates 200 --admins 2 --json flask.json
+    python benchmarks/load_test.py --url http://dashboard.internal:8000 --tabs 500 --admins 0
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from synthetic_data import cached_dataset, copy_dataset
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+CACHE_DIR = Path(__file__).resolve().parent / '.data'
+
+DASHBOARD_DATA = '/api/dashboard/data'
+AVAILABLE_DATES = '/api/dashboard/available-dates'
+DETAILED_ATTENDANCE = '/api/dashboard/detailed-attendance/<date>'
+ADMIN_LOGIN = '/admin/login'
+UPLOAD_ATTENDANCE = '/admin/upload/attendance'
+
+
+# ==== STATISTICS ====
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class EndpointStats:
+    """Latencies and outcomes for one endpoint"""
+
+    def __init__(self):
+        self.latencies_ms = []
+        self.statuses = Counter()
+        self.errors = 0
+        self.bytes = 0
+
+    def record(self, latency_ms: float, status: Optional[int], size: int = 0):
+        self.latencies_ms.append(latency_ms)
+        self.statuses[status or 'error'] += 1
+        self.bytes += size
+        if status is None or status >= 400:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        latencies = sorted(self.latencies_ms)
+        count = len(latencies)
+        return {
+            'requests': count,
+            'errors': self.errors,
+            'rps': round(count / elapsed, 2) if elapsed else 0,
+            'p50_ms': _round(percentile(latencies, 50)),
+            'p95_ms': _round(percentile(latencies, 95)),
+            'p99_ms': _round(percentile(latencies, 99)),
+            'max_ms': _round(latencies[-1] if latencies else None),
+            'mean_ms': _round(sum(latencies) / count if count else None),
+            'avg_kb': round(self.bytes / count / 1024, 1) if count else 0,
+            'statuses': {str(status): n for status, n in sorted(self.statuses.items(), key=str)}
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 1) if value is not None else None
+
+
+# ==== LOAD GENERATOR ====
+
+class LoadTest:
+    """Runs the simulated tabs, drill-down users and admins against one base URL"""
+
+    def __init__(self, base_url: str, args, teams_reports: List[Path]):
+        self.base_url = base_url.rstrip('/')
+        self.args = args
+        self.teams_reports = teams_reports
+        self.stats = {}
+        self.started = None
+        self.deadline = None
+
+    def endpoint(self, label: str) -> EndpointStats:
+        if label not in self.stats:
+            self.stats[label] = EndpointStats()
+        return self.stats[label]
+
+    def new_client(self, connections: int) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.args.timeout,
+            limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+        )
+
+    async def request(self, client: httpx.AsyncClient, label: str, method: str, path: str,
+                      **kwargs) -> Optional[httpx.Response]:
+        """Send one request and record its latency under label"""
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            self.endpoint(label).record((time.perf_counter() - started) * 1000, None)
+            return None
+        self.endpoint(label).record((time.perf_counter() - started) * 1000, response.status_code,
+                                    len(response.content))
+        return response
+
+    async def every(self, interval: float, offset: float, action):
+        """Call action on a fixed schedule until the deadline (skipping, not bunching, missed slots)"""
+        loop = asyncio.get_running_loop()
+        next_at = self.started + offset
+        while next_at < self.deadline:
+            await asyncio.sleep(max(0.0, next_at - loop.time()))
+            await action()
+            next_at = max(next_at + interval, loop.time())
+
+    async def tab(self, client: httpx.AsyncClient, index: int):
+        offset = self.args.poll_interval * index / max(1, self.args.tabs)
+        await self.every(self.args.poll_interval, offset,
+                         lambda: self.request(client, DASHBOARD_DATA, 'GET', DASHBOARD_DATA))
+
+    async def drilldown_user(self, client: httpx.AsyncClient, index: int, rng: random.Random):
+        async def open_modal():
+            response = await self.request(client, AVAILABLE_DATES, 'GET', AVAILABLE_DATES)
+            dates = []
+            if response is not None and response.status_code == 200:
+                body = response.json()
+                dates = body.get('dates', body) if isinstance(body, dict) else body
+            if not dates:
+                return
+            day = rng.choice(dates)
+            if isinstance(day, dict):
+                day = day.get('date')
+            await self.request(client, DETAILED_ATTENDANCE, 'GET',
+                               DETAILED_ATTENDANCE.replace('<date>', str(day)))
+
+        offset = self.args.drilldown_interval * index / max(1, self.args.drilldowns)
+        await self.every(self.args.drilldown_interval, offset, open_modal)
+
+    async def admin(self, index: int):
+        async with self.new_client(1) as client:
+            login = await self.request(client, ADMIN_LOGIN, 'POST', ADMIN_LOGIN, data={
+                'username': self.args.admin_username,
+                'password': self.args.admin_password
+            })
+            if login is None or 'session' not in client.cookies:
+                print(f"⚠️  Admin {index} could not log in; skipping uploads")
+                return
+
+            reports = iter(self.teams_reports * 10000)
+
+            async def upload():
+                report = next(reports)
+                files = {'file': (report.name, report.read_bytes(), 'text/csv')}
+                await self.request(client, UPLOAD_ATTENDANCE, 'POST', UPLOAD_ATTENDANCE, files=files)
+
+            offset = self.args.upload_interval * (index + 0.5) / max(1, self.args.admins)
+            await self.every(self.args.upload_interval, offset, upload)
+
+    async def run(self) -> float:
+        """Run every simulated user until --duration has passed; returns the elapsed seconds"""
+        loop = asyncio.get_running_loop()
+        self.started = loop.time()
+        self.deadline = self.started + self.args.duration
+        rng = random.Random(self.args.seed)
+
+        # Browser tabs each hold their own connection
+        async with self.new_client(self.args.tabs + self.args.drilldowns) as client:
+            tasks = [self.tab(client, i) for i in range(self.args.tabs)]
+            tasks += [self.drilldown_user(client, i, rng) for i in range(self.args.drilldowns)]
+            tasks += [self.admin(i) for i in range(self.args.admins if self.teams_reports else 0)]
+            await asyncio.gather(*tasks)
+        return loop.time() - self.started
+
+    def results(self, elapsed: float) -> Dict[str, Any]:
+        endpoints = {label: stats.summary(elapsed) for label, stats in sorted(self.stats.items())}
+        total = EndpointStats()
+        for stats in self.stats.values():
+            total.latencies_ms.extend(stats.latencies_ms)
+            total.errors += stats.errors
+            total.bytes += stats.bytes
+            total.statuses.update(stats.statuses)
+        return {'elapsed_seconds': round(elapsed, 1), 'endpoints': endpoints, 'total': total.summary(elapsed)}
+
+
+# ==== SERVERS ====
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def server_command(kind: str, port: int, workers: int, run_dir: Path) -> List[str]:
+    if kind == 'flask':
+        # The worker class comes from GUNICORN_WORKER_CLASS, so gunicorn_config.py can patch for gevent
+        return [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py',
+                '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+                '--pid', str(run_dir / 'gunicorn.pid'), 'dashboard_server:app']
+    return [sys.executable, '-m', 'uvicorn', 'app.main:app', '--host', '127.0.0.1', '--port', str(port),
+            '--workers', str(workers), '--no-access-log']
+
+
+def start_server(kind: str, data_dir: Path, run_dir: Path, args) -> (subprocess.Popen, str):
+    """Start the Flask (gunicorn) or FastAPI (uvicorn) app on data_dir; returns the process and base URL"""
+    port = free_port()
+    uploads = run_dir / 'uploads'
+    uploads.mkdir(exist_ok=True)
+    env = dict(os.environ,
+               DASHBOARD_DATA_DIR=str(data_dir),
+               UPLOAD_FOLDER=str(uploads),
+               # The harness talks plain HTTP, so the admin session cookie must not be HTTPS-only
+               SESSION_COOKIE_SECURE='False',
+               ADMIN_USERNAME=args.admin_username,
+               ADMIN_PASSWORD=args.admin_password)
+    if args.worker_class:
+        env['GUNICORN_WORKER_CLASS'] = args.worker_class
+    log = open(run_dir / 'server.log', 'wb')
+    process = subprocess.Popen(server_command(kind, port, args.workers, run_dir),
+                               cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    return process, f'http://127.0.0.1:{port}'
+
+
+def wait_until_ready(base_url: str, process: Optional[subprocess.Popen], timeout: float):
+    """Poll /health/ready until the server has loaded its data"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            if httpx.get(f'{base_url}/health/ready', timeout=5).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Server at {base_url} was not ready after {timeout:.0f}s")
+
+
+def stop_server(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+# ==== REPORT ====
+
+def print_report(name: str, results: Dict[str, Any]):
+    print(f"\n📊 {name}: {results['elapsed_seconds']}s")
+    header = f"{'Endpoint':<44} {'Requests':>9} {'Errors':>7} {'RPS':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    print(header)
+    print('-' * len(header))
+    rows = list(results['endpoints'].items()) + [('TOTAL', results['total'])]
+    for label, row in rows:
+        cells = [_ms(row[key]) for key in ('p50_ms', 'p95_ms', 'p99_ms', 'max_ms')]
+        print(f"{label:<44} {row['requests']:>9,} {row['errors']:>7,} {row['rps']:>8.2f} "
+              + ' '.join(f'{cell:>8}' for cell in cells))
+    print('(latencies in ms)')
+
+
+def _ms(value: Optional[float]) -> str:
+    return '-' if value is None else f'{value:.1f}'
+
+
+def run_against(name: str, base_url: str, args, teams_reports: List[Path]) -> Dict[str, Any]:
+    print(f"🚀 {name}: {args.tabs} tabs every {args.poll_interval:g}s, {args.drilldowns} drill-down users "
+          f"every {args.drilldown_interval:g}s, {args.admins if teams_reports else 0} admins "
+          f"for {args.duration:g}s against {base_url}")
+    load_test = LoadTest(base_url, args, teams_reports)
+    elapsed = asyncio.run(load_test.run())
+    results = load_test.results(elapsed)
+    print_report(name, results)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the attendance dashboard servers')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--server', choices=['flask', 'fastapi', 'both'],
+                        help='Start this server on a synthetic dataset and test it')
+    target.add_argument('--url', help='Test an already running server instead')
+
+    parser.add_argument('--tabs', type=int, default=100, help='Dashboard tabs polling /api/dashboard/data')
+    parser.add_argument('--poll-interval', type=float, default=30, help='Seconds between a tab\'s polls')
+    parser.add_argument('--drilldowns', type=int, default=10, help='Users opening the attendance drill-down')
+    parser.add_argument('--drilldown-interval', type=float, default=15, help='Seconds between drill-downs per user')
+    parser.add_argument('--admins', type=int, default=1, help='Admins uploading Teams reports')
+    parser.add_argument('--upload-interval', type=float, default=60, help='Seconds between uploads per admin')
+    parser.add_argument('--duration', type=float, default=120, help='Test length in seconds')
+    parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for drill-down dates and synthetic data')
+
+    parser.add_argument('--employees', type=int, default=1000, help='Synthetic dataset size (with --server)')
+    parser.add_argument('--dates', type=int, default=50, help='Synthetic meeting dates (with --server)')
+    parser.add_argument('--workers', type=int, default=2, help='Server worker processes (with --server)')
+    parser.add_argument('--worker-class', help='gunicorn worker class for Flask (default gthread, or gevent)')
+    parser.add_argument('--ready-timeout', type=float, default=300, help='Seconds to wait for the server to load')
+
+    parser.add_argument('--admin-username', default=os.getenv('ADMIN_USERNAME', 'admin'))
+    parser.add_argument('--admin-password', default=os.getenv('ADMIN_PASSWORD', 'admin123'))
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    dataset = cached_dataset(CACHE_DIR, args.employees, args.dates, args.seed)
+    teams_reports = sorted((dataset / 'teams_reports').glob('*.csv'))
+    results = {}
+
+    if args.url:
+        wait_until_ready(args.url, None, args.ready_timeout)
+        results[args.url] = run_against(args.url, args.url, args, teams_reports)
+    else:
+        for kind in (['flask', 'fastapi'] if args.server == 'both' else [args.server]):
+            # FastAPI has no admin upload route
+            reports = teams_reports if kind == 'flask' else []
+            with tempfile.TemporaryDirectory(prefix=f'load-test-{kind}-') as run_dir:
+                run_dir = Path(run_dir)
+                data_dir = copy_dataset(dataset, run_dir / 'data')
+                process, base_url = start_server(kind, data_dir, run_dir, args)
+                try:
+                    wait_until_ready(base_url, process, args.ready_timeout)
+                    results[kind] = run_against(kind, base_url, args, reports)
+                except RuntimeError:
+                    print((run_dir / 'server.log').read_text(errors='replace')[-4000:])
+                    raise
+                finally:
+                    stop_server(process)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'config': vars(args), 'results': results}, f, indent=2)
+        print(f"\n💾 Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the dashboard servers
+
+Measures what a worker, test or script pays before it can do anything:
+
+- import time: ``python -X importtime -c "import <module>"`` in a fresh
+  interpreter, repeated, with the slowest top-level packages and a check
+  that heavy modules (pandas, numpy by default) are not imported at all
+- time to first response: starts the server on a synthetic dataset and
+  polls ``/health`` (process up) and ``/api/dashboard/data`` (data loaded)
+  from the moment the process is spawned
+
+``--budget-ms`` and ``--forbid`` make it a gate: the script exits with
+status 1 when the median import time is over budget or a forbidden module
+is imported.
+
+Usage (from backend/):
+    python benchmarks/startup.py
+    python benchmarks/startup.py --module dashboard_server --module core.data_processor --repeat 10
+    python benchmarks/startup.py --server both --workers 2 --employees 20000 --dates 200
+    python benchmarks/startup.py --budget-ms 600 --forbid pandas,numpy --json startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from load_test import BACKEND_DIR, CACHE_DIR, DASHBOARD_DATA, start_server, stop_server
+from synthetic_data import cached_dataset, copy_dataset
+
+
+# ==== IMPORT TIME ====
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Rows of -X importtime output as {'module', 'depth', 'self_us', 'cumulative_us'}"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append({
+            'module': name.strip(),
+            'depth': (len(name) - len(name.lstrip()) - 1) // 2,
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us)
+        })
+    return rows
+
+
+def measure_import(module: str, env: Dict[str, str]) -> Dict[str, Any]:
+    """Import module once in a fresh interpreter"""
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-4000:]}")
+
+    rows = parse_importtime(result.stderr)
+    target = next((row for row in rows if row['module'] == module), None)
+    # First import of each top-level package, e.g. flask or pandas pulled in by a submodule
+    packages = {}
+    for row in rows:
+        package = row['module'].split('.')[0]
+        if row['module'] == package and package not in packages:
+            packages[package] = row['cumulative_us']
+    return {
+        'import_ms': target['cumulative_us'] / 1000 if target else None,
+        'wall_ms': wall_ms,
+        'modules': {row['module'] for row in rows},
+        'packages': packages
+    }
+
+
+def import_report(module: str, repeat: int, env: Dict[str, str], top: int, forbid: List[str]) -> Dict[str, Any]:
+    runs = [measure_import(module, env) for _ in range(repeat)]
+    packages = {}
+    for run in runs:
+        for package, cumulative_us in run['packages'].items():
+            packages.setdefault(package, []).append(cumulative_us / 1000)
+    heaviest = sorted(((package, statistics.median(values)) for package, values in packages.items()
+                       if package != module.split('.')[0]), key=lambda item: item[1], reverse=True)
+    return {
+        'module': module,
+        'runs': repeat,
+        'import_ms': round(statistics.median(run['import_ms'] for run in runs), 1),
+        'import_ms_min': round(min(run['import_ms'] for run in runs), 1),
+        'process_ms': round(statistics.median(run['wall_ms'] for run in runs), 1),
+        'heaviest_packages': [{'package': package, 'ms': round(ms, 1)} for package, ms in heaviest[:top]],
+        'forbidden_imported': sorted({name for name in forbid if any(name in run['modules'] for run in runs)})
+    }
+
+
+# ==== TIME TO FIRST RESPONSE ====
+
+def first_ok(client: httpx.Client, url: str, process: subprocess.Popen, deadline: float) -> float:
+    """Poll url until it answers 200; returns time.monotonic() of that response"""
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            if client.get(url).status_code == 200:
+                return time.monotonic()
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.02)
+    raise RuntimeError(f"No 200 from {url} before the timeout")
+
+
+def first_response_report(kind: str, dataset: Path, args) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix=f'startup-{kind}-') as run_dir:
+        run_dir = Path(run_dir)
+        data_dir = copy_dataset(dataset, run_dir / 'data')
+        spawned = time.monotonic()
+        process, base_url = start_server(kind, data_dir, run_dir, args)
+        try:
+            deadline = spawned + args.ready_timeout
+            with httpx.Client(timeout=args.ready_timeout) as client:
+                health = first_ok(client, f'{base_url}/health', process, deadline)
+                data = first_ok(client, f'{base_url}{DASHBOARD_DATA}', process, deadline)
+        except RuntimeError:
+            print((run_dir / 'server.log').read_text(errors='replace')[-4000:])
+            raise
+        finally:
+            stop_server(process)
+    return {
+        'server': kind,
+        'first_health_ms': round((health - spawned) * 1000, 1),
+        'first_data_ms': round((data - spawned) * 1000, 1)
+    }
+
+
+# ==== REPORT ====
+
+def print_import_report(report: Dict[str, Any], budget_ms: Optional[float]):
+    budget = f" (budget {budget_ms:.0f}ms)" if budget_ms else ''
+    print(f"\n📦 import {report['module']}: {report['import_ms']}ms median, {report['import_ms_min']}ms min, "
+          f"{report['process_ms']}ms interpreter wall time over {report['runs']} runs{budget}")
+    for row in report['heaviest_packages']:
+        print(f"   {row['package']:<32} {row['ms']:>8.1f}ms")
+    if report['forbidden_imported']:
+        print(f"   ❌ imported: {', '.join(report['forbidden_imported'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure import time and time to first response')
+    parser.add_argument('--module', action='append', help='Module to import (repeatable, default dashboard_server)')
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters per module')
+    parser.add_argument('--top', type=int, default=10, help='Heaviest top-level packages to list')
+    parser.add_argument('--budget-ms', type=float, help='Fail when a module\'s median import time exceeds this')
+    parser.add_argument('--forbid', default='pandas,numpy',
+                        help='Comma-separated modules that must not be imported (empty to allow all)')
+    parser.add_argument('--server', choices=['flask', 'fastapi', 'both'],
+                        help='Also measure time to first response of this server')
+
+    parser.add_argument('--employees', type=int, default=1000, help='Synthetic dataset size')
+    parser.add_argument('--dates', type=int, default=50, help='Synthetic meeting dates')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic data')
+    parser.add_argument('--workers', type=int, default=1, help='Server worker processes (with --server)')
+    parser.add_argument('--worker-class', help='gunicorn worker class for Flask (default gthread, or gevent)')
+    parser.add_argument('--ready-timeout', type=float, default=300, help='Seconds to wait for the first response')
+    parser.add_argument('--admin-username', default=os.getenv('ADMIN_USERNAME', 'admin'))
+    parser.add_argument('--admin-password', default=os.getenv('ADMIN_PASSWORD', 'admin123'))
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    dataset = cached_dataset(CACHE_DIR, args.employees, args.dates, args.seed)
+    forbid = [name.strip() for name in args.forbid.split(',') if name.strip()]
+    results = {'imports': [], 'first_response': []}
+    failed = False
+
+    with tempfile.TemporaryDirectory(prefix='startup-import-') as run_dir:
+        # Imports that load data at import time read a private copy of the dataset; backend/app is on
+        # the path the way dashboard_server puts it there, so core.* modules can be measured alone
+        env = dict(os.environ, DASHBOARD_DATA_DIR=str(copy_dataset(dataset, Path(run_dir) / 'data')),
+                   UPLOAD_FOLDER=str(Path(run_dir) / 'uploads'), LOG_LEVEL='WARNING',
+                   PYTHONPATH=os.pathsep.join(filter(None, [str(BACKEND_DIR / 'app'), os.getenv('PYTHONPATH')])))
+        for module in args.module or ['dashboard_server']:
+            report = import_report(module, args.repeat, env, args.top, forbid)
+            print_import_report(report, args.budget_ms)
+            results['imports'].append(report)
+            if report['forbidden_imported'] or (args.budget_ms and report['import_ms'] > args.budget_ms):
+                failed = True
+
+    if args.server:
+        for kind in (['flask', 'fastapi'] if args.server == 'both' else [args.server]):
+            report = first_response_report(kind, dataset, args)
+            print(f"\n⏱️  {kind}: first /health after {report['first_health_ms']}ms, "
+                  f"first {DASHBOARD_DATA} after {report['first_data_ms']}ms")
+            results['first_response'].append(report)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'config': vars(args), 'results': results}, f, indent=2)
+        print(f"\n💾 Results written to {args.json}")
+
+    if failed:
+        print("\n❌ Startup budget exceeded")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Synthetic workforce and attendance data for benchmarks
+
+Generates the files the dashboard reads, in their real layouts:
+
+- ``peoplehubdirectory20250708.csv``: People Hub directory with a manager
+  hierarchy (VP -> Regional Managers -> Area Managers -> community staff)
+- ``attendance_history.json``: one weekly meeting per date, a record for
+  every employee, with stable per-person attendance habits so at-risk
+  employees exist
+- ``rm_attendance_history.json``: the separate Regional Manager meeting
+- Teams attendance reports (UTF-16, tab separated, "2. Participants"
+  section) as produced by the Teams "Download attendance report" button
+
+Output is deterministic for a given seed. The history is written date by
+date, so 100k employees x 1000 dates (about 100M records and tens of GB)
+never has to fit in memory.
+
+Usage:
+    python benchmarks/synthetic_data.py --employees 10000 --dates 200 --out /tmp/attendance-data
+    python benchmarks/synthetic_data.py --employees 1000 --dates 50 --teams 3 --out /tmp/small
+"""
+
+import argparse
+import codecs
+import csv
+import json
+import os
+import random
+import shutil
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+DIRECTORY_FILE = 'peoplehubdirectory20250708.csv'
+HISTORY_FILE = 'attendance_history.json'
+RM_HISTORY_FILE = 'rm_attendance_history.json'
+DIRECTORY_FIELDS = ['name', 'title', 'department', 'office', 'manager', 'email']
+
+FIRST_NAMES = [
+    'James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David', 'Elizabeth',
+    'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah', 'Carlos', 'Karen',
+    'Daniel', 'Lisa', 'Matthew', 'Nancy', 'Anthony', 'Betty', 'Mark', 'Maria', 'Steven', 'Sandra',
+    'Andrew', 'Ashley', 'Joshua', 'Emily', 'Kevin', 'Donna', 'Brian', 'Michelle', 'Jose', 'Carol',
+    'Luis', 'Amanda', 'Kenji', 'Priya', 'Ahmed', 'Mei', 'Olumide', 'Sofia', 'Dmitri', 'Aisha'
+]
+LAST_NAMES = [
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez',
+    'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin',
+    'Lee', 'Perez', 'Thompson', 'White', 'Harris', 'Sanchez', 'Clark', 'Ramirez', 'Lewis', 'Robinson',
+    'Walker', 'Young', 'Allen', 'King', 'Wright', 'Scott', 'Torres', 'Nguyen', 'Hill', 'Flores',
+    'Green', 'Adams', 'Nelson', 'Baker', 'Hall', 'Rivera', 'Campbell', 'Mitchell', 'Carter', "O'Brien"
+]
+REGIONS = ['Texas', 'Florida', 'California', 'Arizona', 'Nevada', 'Georgia', 'Carolinas', 'Colorado', 'Ohio', 'Tennessee']
+COMMUNITY_WORDS = ['Oaks', 'Pointe', 'Crossing', 'Landing', 'Commons', 'Ridge', 'Park', 'Village', 'Heights', 'Station']
+STAFF_ROLES = [
+    ('Community Manager', 'Operations', 0.30),
+    ('Assistant Community Manager', 'Operations', 0.20),
+    ('Leasing Consultant', 'Leasing', 0.25),
+    ('Maintenance Supervisor', 'Maintenance', 0.15),
+    ('Service Technician', 'Maintenance', 0.10)
+]
+
+
+# ==== DIRECTORY ====
+
+def generate_directory(employees: int, seed: int = 0) -> List[Dict[str, str]]:
+    """
+    People Hub rows with a realistic reporting tree.
+
+    Roughly one Regional Manager per 500 people and one Area Manager per 50;
+    the ``manager`` column holds the manager's display name, as in the
+    real export.
+    """
+    rng = random.Random(seed)
+    used_emails = set()
+
+    def person(title: str, department: str, office: str, manager: str) -> Dict[str, str]:
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        base = f"{first}.{last}".lower().replace("'", '')
+        email = f"{base}@redstone.com"
+        suffix = 1
+        while email in used_emails:
+            suffix += 1
+            email = f"{base}{suffix}@redstone.com"
+        used_emails.add(email)
+        name = f"{first} {last}" if suffix == 1 else f"{first} {last} {suffix}"
+        return {'name': name, 'title': title, 'department': department, 'office': office,
+                'manager': manager, 'email': email}
+
+    vp = person('Vice President of Operations', 'Operations', 'Corporate', '')
+    rows = [vp]
+    regional_count = max(1, employees // 500)
+    area_count = max(1, employees // 50)
+
+    regionals = []
+    for i in range(min(regional_count, max(0, employees - len(rows)))):
+        region = REGIONS[i % len(REGIONS)]
+        regionals.append(person('Regional Manager', 'Operations', region, vp['name']))
+    rows.extend(regionals)
+
+    areas = []
+    for i in range(min(area_count, max(0, employees - len(rows)))):
+        regional = regionals[i % len(regionals)] if regionals else vp
+        areas.append(person('Area Manager', 'Operations', regional['office'], regional['name']))
+    rows.extend(areas)
+
+    titles = [role for role, _, _ in STAFF_ROLES]
+    departments = {role: department for role, department, _ in STAFF_ROLES}
+    weights = [weight for _, _, weight in STAFF_ROLES]
+    while len(rows) < employees:
+        area = rng.choice(areas) if areas else vp
+        title = rng.choices(titles, weights)[0]
+        office = f"{rng.choice(LAST_NAMES)} {rng.choice(COMMUNITY_WORDS)}"
+        rows.append(person(title, departments[title], office, area['name']))
+    return rows[:employees]
+
+
+def write_directory(path: Path, directory: List[Dict[str, str]]):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=DIRECTORY_FIELDS)
+        writer.writeheader()
+        writer.writerows(directory)
+
+
+# ==== ATTENDANCE ====
+
+def meeting_dates(count: int, last: date = date(2025, 7, 29)) -> List[str]:
+    """``count`` weekly meeting dates ending at ``last``, oldest first"""
+    return [(last - timedelta(weeks=count - 1 - i)).isoformat() for i in range(count)]
+
+
+def attendance_habits(directory: List[Dict[str, str]], seed: int = 0) -> Dict[str, float]:
+    """Per-person probability of attending; about 8% of people rarely show up"""
+    rng = random.Random(seed + 1)
+    return {row['email']: (rng.uniform(0.05, 0.45) if rng.random() < 0.08 else rng.betavariate(8, 1.5))
+            for row in directory}
+
+
+def attendance_record(rng: random.Random, person: Dict[str, str], likelihood: float) -> Dict[str, Any]:
+    """One attendance record in the layout attendance_tracker_v3 writes"""
+    roll = rng.random()
+    if roll < likelihood:
+        status, minutes = 'Present', rng.randint(48, 65)
+    elif roll < likelihood + (1 - likelihood) * 0.3:
+        status, minutes = 'Partial', rng.randint(3, 47)
+    else:
+        status, minutes = 'Absent', 0
+    engagement = min(100, rng.choice((0, 30, 60)) + rng.randint(0, 3) * 10) if minutes else 0
+    return {
+        'name': person['name'],
+        'status': status,
+        'duration': minutes,
+        'duration_minutes': minutes,
+        'engagement_score': engagement,
+        'location': person['office']
+    }
+
+
+def iter_attendance_history(directory: List[Dict[str, str]], dates: List[str],
+                            seed: int = 0) -> Iterator[Tuple[str, Dict[str, Dict[str, Any]]]]:
+    """Yield (date, records) one meeting at a time"""
+    habits = attendance_habits(directory, seed)
+    for index, meeting_date in enumerate(dates):
+        rng = random.Random(f"{seed}:{meeting_date}:{index}")
+        yield meeting_date, {row['email']: attendance_record(rng, row, habits[row['email']]) for row in directory}
+
+
+def iter_rm_history(directory: List[Dict[str, str]], dates: List[str],
+                    seed: int = 0) -> Iterator[Tuple[str, Dict[str, Dict[str, Any]]]]:
+    """Regional Manager meeting records, same dates as the main meeting"""
+    regionals = [row for row in directory if row['title'] == 'Regional Manager']
+    habits = attendance_habits(regionals, seed + 7)
+    for meeting_date in dates:
+        rng = random.Random(f"rm:{seed}:{meeting_date}")
+        yield meeting_date, {row['email']: attendance_record(rng, row, habits[row['email']]) for row in regionals}
+
+
+def write_history(path: Path, items: Iterator[Tuple[str, Dict[str, Any]]]) -> int:
+    """Stream a {date: records} JSON object to disk; returns the number of dates"""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{')
+        for meeting_date, records in items:
+            f.write(',\n' if count else '\n')
+            f.write(f"{json.dumps(meeting_date)}: {json.dumps(records, ensure_ascii=False)}")
+            count += 1
+        f.write('\n}\n')
+    return count
+
+
+# ==== TEAMS REPORTS ====
+
+def _teams_time(day: date, minutes_after_start: int) -> str:
+    stamp = time.struct_time((day.year, day.month, day.day, 9 + minutes_after_start // 60,
+                              minutes_after_start % 60, 0, 0, 0, -1))
+    return f"{day.month}/{day.day}/{day.year % 100}, {time.strftime('%I:%M:%S %p', stamp).lstrip('0')}"
+
+
+def write_teams_report(path: Path, directory: List[Dict[str, str]], meeting_date: str, seed: int = 0) -> int:
+    """
+    Teams "attendance report" export for one meeting: UTF-16 LE with BOM,
+    tab separated, summary section followed by the participants table.
+    Only people who joined are listed, as in the real export.
+    """
+    day = date.fromisoformat(meeting_date)
+    rng = random.Random(f"teams:{seed}:{meeting_date}")
+    habits = attendance_habits(directory, seed)
+
+    participants = []
+    for row in directory:
+        record = attendance_record(rng, row, habits[row['email']])
+        if record['duration_minutes']:
+            participants.append((row, record['duration_minutes'], rng.randint(0, 4)))
+
+    lines = [
+        '1. Summary',
+        'Meeting title\tWeekly Community Manager Meeting',
+        f"Attended participants\t{len(participants)}",
+        f"Start time\t{_teams_time(day, 0)}",
+        f"End time\t{_teams_time(day, 65)}",
+        'Meeting duration\t1h 5m 0s',
+        '',
+        '2. Participants',
+        'Name\tFirst Join\tLast Leave\tIn-Meeting Duration\tEmail\tParticipant ID (UPN)\tRole'
+    ]
+    for row, minutes, late in participants:
+        duration = f"{minutes // 60}h {minutes % 60}m {rng.randint(0, 59)}s" if minutes >= 60 else \
+            f"{minutes}m {rng.randint(0, 59)}s"
+        lines.append('\t'.join((row['name'], _teams_time(day, late), _teams_time(day, late + minutes),
+                                duration, row['email'], row['email'], 'Attendee')))
+
+    with open(path, 'wb') as f:
+        f.write(codecs.BOM_UTF16_LE)
+        f.write('\n'.join(lines).encode('utf-16-le'))
+    return len(participants)
+
+
+def teams_report_name(meeting_date: str) -> str:
+    """File name the upload handler can read the meeting date from (M-D-YY)"""
+    day = date.fromisoformat(meeting_date)
+    return f"Weekly Community Manager Meeting - Attendance report {day.month}-{day.day}-{day.year % 100}.csv"
+
+
+# ==== DATASET ====
+
+def generate_dataset(out_dir, employees: int = 1000, dates: int = 50, teams_reports: int = 0,
+                     seed: int = 0) -> Dict[str, Any]:
+    """Write a complete data directory and return a description of it"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+
+    directory = generate_directory(employees, seed)
+    write_directory(out_dir / DIRECTORY_FILE, directory)
+
+    all_dates = meeting_dates(dates)
+    write_history(out_dir / HISTORY_FILE, iter_attendance_history(directory, all_dates, seed))
+    write_history(out_dir / RM_HISTORY_FILE, iter_rm_history(directory, all_dates, seed))
+
+    # Reports for the meetings after the last recorded one, i.e. what an admin would upload next
+    reports = []
+    report_dir = out_dir / 'teams_reports'
+    for i in range(teams_reports):
+        report_dir.mkdir(exist_ok=True)
+        meeting_date = (date.fromisoformat(all_dates[-1]) + timedelta(weeks=i + 1)).isoformat()
+        path = report_dir / teams_report_name(meeting_date)
+        write_teams_report(path, directory, meeting_date, seed)
+        reports.append(str(path))
+
+    return {
+        'directory': str(out_dir),
+        'employees': len(directory),
+        'dates': all_dates,
+        'teams_reports': reports,
+        'managers': sum(1 for row in directory if row['title'] in ('Regional Manager', 'Area Manager')),
+        'history_bytes': (out_dir / HISTORY_FILE).stat().st_size,
+        'seconds': round(time.perf_counter() - started, 2)
+    }
+
+
+def cached_dataset(cache_dir, employees: int = 1000, dates: int = 50, seed: int = 0,
+                   teams_reports: int = 2) -> Path:
+    """Dataset directory for this scale under cache_dir, generated on first use"""
+    target = Path(cache_dir) / f"e{employees}-d{dates}-s{seed}"
+    marker = target / '.complete'
+    if not marker.exists():
+        shutil.rmtree(target, ignore_errors=True)
+        info = generate_dataset(target, employees, dates, teams_reports, seed)
+        marker.write_text(str(info['seconds']))
+    return target
+
+
+def copy_dataset(source, target) -> Path:
+    """Writable copy of a dataset's data files (hard links, so it is cheap at any scale)"""
+    target = Path(target)
+    target.mkdir(parents=True, exist_ok=True)
+    for entry in Path(source).iterdir():
+        if entry.is_file() and not entry.name.startswith('.'):
+            try:
+                os.link(entry, target / entry.name)
+            except OSError:
+                shutil.copy2(entry, target / entry.name)
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic attendance dashboard data')
+    parser.add_argument('--out', required=True, help='Output data directory')
+    parser.add_argument('--employees', type=int, default=1000, help='Number of employees (1k-100k)')
+    parser.add_argument('--dates', type=int, default=50, help='Number of weekly meeting dates (50-1000)')
+    parser.add_argument('--teams', type=int, default=1, help='Number of Teams reports for upcoming meetings')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    args = parser.parse_args()
+
+    info = generate_dataset(args.out, args.employees, args.dates, args.teams, args.seed)
+    print(f"Generated {info['employees']:,} employees ({info['managers']} managers) x {len(info['dates'])} dates "
+          f"in {info['seconds']}s")
+    print(f"  History: {info['history_bytes'] / 1024 / 1024:,.1f} MB in {info['directory']}")
+    for report in info['teams_reports']:
+        print(f"  Teams report: {report}")
+
+
+if __name__ == '__main__':
+    main()
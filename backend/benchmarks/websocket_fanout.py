@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+WebSocket fan-out load test
+
+Simulates a few thousand dashboard sockets (mostly fast, some slow, a few
+completely stalled) and pushes a series of dashboard-sized updates through
+``WebSocketBroadcaster``. For comparison the legacy sequential
+``await client.send_json(...)`` loop is run against the same population.
+
+Usage:
+    python benchmarks/websocket_fanout.py --clients 3000 --updates 20
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / 'app'))
+from core.broadcaster import WebSocketBroadcaster
+
+# Send timestamps keyed by payload text, so clients don't pay a json.loads each
+SENT_AT = {}
+
+
+class SimulatedSocket:
+    """Minimal stand-in for a Starlette WebSocket with a configurable link speed"""
+
+    def __init__(self, delay: float, stalled: bool = False):
+        self.delay = delay
+        self.stalled = stalled
+        self.received = 0
+        self.latencies = []
+        self.closed = False
+
+    async def send_text(self, payload: str):
+        if self.stalled:
+            await asyncio.sleep(3600)
+        await asyncio.sleep(self.delay)
+        self.received += 1
+        self.latencies.append(time.perf_counter() - SENT_AT[payload])
+
+    async def send_json(self, data: dict):
+        await self.send_text(WebSocketBroadcaster.serialize(data))
+
+    async def close(self, code: int = 1000):
+        self.closed = True
+
+
+def build_population(clients: int, slow_ratio: float, stalled_ratio: float):
+    """Create a mix of fast, slow and stalled sockets"""
+    sockets = []
+    for _ in range(clients):
+        roll = random.random()
+        if roll < stalled_ratio:
+            sockets.append(SimulatedSocket(0, stalled=True))
+        elif roll < stalled_ratio + slow_ratio:
+            sockets.append(SimulatedSocket(random.uniform(0.2, 0.5)))
+        else:
+            sockets.append(SimulatedSocket(random.uniform(0.0005, 0.003)))
+    return sockets
+
+
+def build_payload(rows: int) -> dict:
+    """Roughly dashboard-sized update body"""
+    return {
+        'type': 'periodic_update',
+        'data': {
+            'regional_data': [
+                {'manager_name': f'Manager {i}', 'attendance_rate': random.uniform(60, 100), 'team_size': 12}
+                for i in range(rows)
+            ]
+        }
+    }
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def run_broadcaster(sockets, updates: int, interval: float, payload: dict):
+    broadcaster = WebSocketBroadcaster(max_queue=4, max_dropped=8, send_timeout=2.0)
+    for sock in sockets:
+        await broadcaster.register(sock)
+
+    broadcast_times = []
+    for seq in range(updates):
+        payload['seq'] = seq
+        SENT_AT[broadcaster.serialize(payload)] = time.perf_counter()
+        started = time.perf_counter()
+        broadcaster.broadcast(payload, coalesce_key='dashboard_data')
+        broadcast_times.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+
+    # Let fast clients drain
+    await asyncio.sleep(max(1.0, interval * 2))
+    stats = broadcaster.get_stats()
+    await broadcaster.close_all()
+    return broadcast_times, stats
+
+
+async def run_sequential(sockets, updates: int, interval: float, payload: dict, deadline: float):
+    """The pre-broadcaster loop: await every client in turn"""
+    connected = set(sockets)
+    broadcast_times = []
+    started_all = time.perf_counter()
+    for seq in range(updates):
+        payload['seq'] = seq
+        SENT_AT[WebSocketBroadcaster.serialize(payload)] = time.perf_counter()
+        started = time.perf_counter()
+        for client in list(connected):
+            try:
+                await asyncio.wait_for(client.send_json(payload), timeout=2.0)
+            except Exception:
+                connected.discard(client)
+            if time.perf_counter() - started_all > deadline:
+                break
+        broadcast_times.append(time.perf_counter() - started)
+        if time.perf_counter() - started_all > deadline:
+            break
+        await asyncio.sleep(interval)
+    return broadcast_times
+
+
+def report(label, sockets, broadcast_times, updates):
+    fast = [s for s in sockets if not s.stalled and s.delay < 0.1]
+    latencies = [lat for s in fast for lat in s.latencies]
+    delivered = sum(s.received for s in fast)
+    print(f"\n{label}")
+    print("-" * 60)
+    print(f"Broadcast call   p50={percentile(broadcast_times, 50) * 1000:9.2f} ms  "
+          f"max={max(broadcast_times) * 1000:9.2f} ms  ({len(broadcast_times)} updates)")
+    print(f"Fast client lat  p50={percentile(latencies, 50) * 1000:9.2f} ms  "
+          f"p99={percentile(latencies, 99) * 1000:9.2f} ms")
+    print(f"Fast deliveries  {delivered}/{len(fast) * updates}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Load test WebSocket fan-out')
+    parser.add_argument('--clients', type=int, default=3000)
+    parser.add_argument('--updates', type=int, default=20)
+    parser.add_argument('--interval', type=float, default=0.1, help='Seconds between updates')
+    parser.add_argument('--rows', type=int, default=200, help='Regional rows per update payload')
+    parser.add_argument('--slow', type=float, default=0.05, help='Fraction of slow clients')
+    parser.add_argument('--stalled', type=float, default=0.01, help='Fraction of stalled clients')
+    parser.add_argument('--skip-sequential', action='store_true')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    payload = build_payload(args.rows)
+    print(f"Clients: {args.clients} ({args.slow:.0%} slow, {args.stalled:.0%} stalled), "
+          f"payload {len(json.dumps(payload)) / 1024:.1f} KB, {args.updates} updates")
+
+    sockets = build_population(args.clients, args.slow, args.stalled)
+    broadcast_times, stats = await run_broadcaster(sockets, args.updates, args.interval, payload)
+    report('WebSocketBroadcaster', sockets, broadcast_times, args.updates)
+    print(f"Slow clients disconnected: {stats['disconnected_slow_clients']}")
+
+    if not args.skip_sequential:
+        random.seed(args.seed)
+        sockets = build_population(args.clients, args.slow, args.stalled)
+        deadline = 30.0
+        broadcast_times = await run_sequential(sockets, args.updates, args.interval, payload, deadline)
+        report(f'Sequential send_json (stopped after {deadline:.0f}s)', sockets, broadcast_times, args.updates)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -1,7 +1,7 @@
-from flask import Flask, request, redirect, url_for, session, flash, jsonify, render_template_string
+from flask import Flask, Response, g, request, redirect, url_for, session, flash, jsonify, render_template_string, send_file, stream_with_context
 from flask.helpers import make_response
-from werkzeug.security import check_password_hash, generate_password_hash
 from werkzeug.utils import secure_filename
+import hmac
 import json
 import os
 import shutil
@@ -9,6 +9,8 @@ from datetime import datetime
 from functools import wraps
 import asyncio
 import sys
+import threading
+import time
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -17,7 +19,21 @@ load_dotenv()
 
 # Add the app directory to sys.path to import data processor
 sys.path.append(str(Path(__file__).parent / 'app'))
-from core.data_processor import AttendanceDataProcessor
+from core.data_processor import AttendanceDataProcessor, DASHBOARD_SECTIONS
+from core.event_stream import ChangeStream, format_event
+from core.change_bus import ChangeBus
+from core.sync_metrics_store import SyncMetricsStore
+from core.request_profiler import RequestProfiler, PROFILE_HEADER
+from core.metrics import BROADCAST_SECONDS, HTTP_REQUEST_SECONDS, STREAM_CLIENTS, record_cache, render_metrics
+from core.attendance_cube import DIMENSIONS as CUBE_DIMENSIONS
+from core.attendance_export import EXPORT_FORMATS, accepts_gzip, export_filename, gzip_chunks
+from core.excel_export import XLSX_CONTENT_TYPE
+from core.fieldsets import FieldSet
+from core.runtime_stats import gc_stats, process_memory
+from core.tracing import chrome_trace, clear_trace, configure_logging, tracing_enabled
+
+# Processor and trace logs go to stdout; LOG_LEVEL / LOG_FORMAT=json tune them
+configure_logging()
 
 app = Flask(__name__, static_folder='app/static', template_folder='app/templates')
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'your-secret-key-here')
@@ -39,8 +55,44 @@ def add_security_headers(response):
     response.headers['Content-Security-Policy'] = "default-src 'self' https://cdn.tailwindcss.com https://cdn.jsdelivr.net; script-src 'self' 'unsafe-inline' https://cdn.tailwindcss.com https://cdn.jsdelivr.net; style-src 'self' 'unsafe-inline' https://fonts.googleapis.com https://cdn.tailwindcss.com; font-src 'self' https://fonts.gstatic.com; img-src 'self' data:;"
     return response
 
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        # Label by route template, not the raw path, so /api/regions/<region_name> stays one series
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_REQUEST_SECONDS.labels(request.method, route, response.status_code).observe(time.perf_counter() - started)
+    return response
+
+# Opt-in request profiling: PROFILE_SAMPLE_PERCENT and/or PROFILE_TOKEN (sent as the X-Profile header)
+request_profiler = RequestProfiler.from_env()
+
+@app.before_request
+def start_request_profile():
+    if request_profiler.enabled:
+        g.request_profile = request_profiler.begin(request.path, request.headers.get(PROFILE_HEADER))
+
+@app.after_request
+def finish_request_profile(response):
+    active = g.pop('request_profile', None)
+    if active:
+        kept = request_profiler.finish(active, request.method, request.path, response.status_code)
+        if kept:
+            response.headers['X-Profile-Id'] = kept['id']
+    return response
+
+@app.teardown_request
+def cancel_request_profile(exc):
+    active = g.pop('request_profile', None)
+    if active:
+        request_profiler.cancel(active)
+
 # Create uploads directory if it doesn't exist
-UPLOAD_FOLDER = Path(__file__).parent / 'uploads'
+UPLOAD_FOLDER = Path(os.getenv('UPLOAD_FOLDER') or Path(__file__).parent / 'uploads')
 UPLOAD_FOLDER.mkdir(exist_ok=True)
 
 # Allowed file extensions
@@ -50,7 +102,34 @@ def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-# SocketIO removed - using HTTP polling for real-time updates
+def admin_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'admin_logged_in' not in session:
+            return redirect(url_for('admin_login'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+# SocketIO removed - dashboards follow /api/dashboard/stream (SSE) with HTTP polling as fallback
+change_stream = ChangeStream()
+SSE_HEARTBEAT_SECONDS = int(os.getenv('SSE_HEARTBEAT_SECONDS', '15'))
+SSE_MAX_STREAM_SECONDS = int(os.getenv('SSE_MAX_STREAM_SECONDS', '1800'))
+# Streams one worker holds open at once; past it dashboards are told to poll and retry later.
+# Under gthread every stream holds one of the worker's GUNICORN_THREADS, so half of them stay
+# free for other requests; gevent streams are greenlets and only cost memory.
+SSE_MAX_STREAMS = int(os.getenv('SSE_MAX_STREAMS') or (1000 if os.getenv('GUNICORN_WORKER_CLASS') == 'gevent'
+                                                      else max(1, int(os.getenv('GUNICORN_THREADS', '16')) // 2)))
+SSE_BUSY_RETRY_SECONDS = int(os.getenv('SSE_BUSY_RETRY_SECONDS', '300'))
+stream_slots = threading.BoundedSemaphore(SSE_MAX_STREAMS)
+# Time to build one SSE version event (the per-client cost of announcing a change)
+SSE_EVENT_SECONDS = BROADCAST_SECONDS.labels('sse', 'event')
+# Shared secret the sync daemon sends to /internal/reload; the hook is disabled when unset
+RELOAD_TOKEN = os.getenv('DASHBOARD_RELOAD_TOKEN', '')
+# DASHBOARD_WARMUP=background loads the data behind the first requests instead of during import
+DASHBOARD_WARMUP = os.getenv('DASHBOARD_WARMUP', 'background').lower()
+WARMUP_WAIT_SECONDS = float(os.getenv('WARMUP_WAIT_SECONDS', '60'))
+# Answered while the data is still loading
+WARMUP_EXEMPT_PATHS = ('/health', '/metrics', '/static/')
 
 # Initialize data processor
 processor = None
@@ -58,18 +137,41 @@ processor = None
 def init_data_processor():
     global processor
     processor = AttendanceDataProcessor()
-    # Initialize the processor asynchronously
-    asyncio.run(processor.initialize())
+    processor.add_change_listener(change_stream.publish)
+    # Uploads in one gunicorn worker (and syncs) are announced to every other worker
+    processor.attach_change_bus(ChangeBus(processor.data_dir))
+    if DASHBOARD_WARMUP == 'background':
+        processor.start_warmup()
+    else:
+        asyncio.run(processor.initialize())
 
 # Initialize processor at startup
 init_data_processor()
 
-# Admin credentials
-ADMIN_USERS = {
-    os.getenv('ADMIN_USERNAME', 'admin'): generate_password_hash(os.getenv('ADMIN_PASSWORD', 'admin123')),
-    os.getenv('MANAGER_USERNAME', 'manager'): generate_password_hash(os.getenv('MANAGER_PASSWORD', 'manager123'))
+@app.before_request
+def follow_data_changes():
+    """Hold requests until the data is loaded, then subscribe this worker to changes from other workers and the sync daemon"""
+    if not processor:
+        return
+    if not processor.warm:
+        if request.path.startswith(WARMUP_EXEMPT_PATHS):
+            return
+        if not processor.wait_until_warm(WARMUP_WAIT_SECONDS):
+            return jsonify({'success': False, 'error': 'Data is still loading, try again shortly'}), 503
+    processor.follow_changes()
+
+# Admin credentials. They come from the environment in plain text, so they are compared in
+# constant time rather than hashed at import (each hash took ~0.3s per process)
+ADMIN_PASSWORDS = {
+    os.getenv('ADMIN_USERNAME', 'admin'): os.getenv('ADMIN_PASSWORD', 'admin123'),
+    os.getenv('MANAGER_USERNAME', 'manager'): os.getenv('MANAGER_PASSWORD', 'manager123')
 }
 
+def check_admin_password(username, password):
+    expected = ADMIN_PASSWORDS.get(username)
+    return expected is not None and password is not None and \
+        hmac.compare_digest(password.encode('utf-8'), expected.encode('utf-8'))
+
 # === DASHBOARD ROUTES ===
 @app.route('/')
 def home():
@@ -106,36 +208,88 @@ def dashboard():
 </html>
         ''')
 
+# Dashboard sections computed once per data version and shared by every request and stream
+_section_cache = {'version': None, 'sections': {}}
+_section_cache_lock = threading.Lock()
+
+def _format_metrics(metrics):
+    """Trim processor metrics to the fields the dashboard renders"""
+    return {
+        'attendance_rate': round(metrics.get('attendance_rate', 0), 1),
+        'present_count': metrics.get('present_count', 0),
+        'total_employees': metrics.get('total_employees', 0),
+        'engagement_score': int(metrics.get('engagement_score', 0)),
+        'week_over_week_change': round(metrics.get('week_over_week_change', 0), 1),
+        'data_source': metrics.get('data_source')
+    }
+
+async def _compute_sections(names):
+    """Run the processor methods behind the requested dashboard sections"""
+    sections = {}
+    if 'metrics' in names:
+        sections['metrics'] = _format_metrics(await processor.get_current_metrics())
+    if 'alerts' in names:
+        sections['alerts'] = await processor.get_active_alerts()
+    if 'regional_data' in names:
+        sections['regional_data'] = await processor.get_regional_breakdown()
+    if 'attendance_history' in names:
+        sections['attendance_history'] = await processor.get_attendance_history()
+    if 'at_risk_employees' in names:
+        sections['at_risk_employees'] = await processor.get_at_risk_employees()
+    return sections
+
+def get_dashboard_sections(names=DASHBOARD_SECTIONS):
+    """Get dashboard sections for the current data version, computing only cache misses"""
+    version = processor.data_version
+    with _section_cache_lock:
+        if _section_cache['version'] != version:
+            _section_cache['version'] = version
+            _section_cache['sections'] = {}
+        cached = dict(_section_cache['sections'])
+    
+    missing = [name for name in names if name not in cached]
+    record_cache('dashboard_sections', len(names) - len(missing), len(missing))
+    if missing:
+        computed = asyncio.run(_compute_sections(missing))
+        cached.update(computed)
+        with _section_cache_lock:
+            if _section_cache['version'] == version:
+                _section_cache['sections'].update(computed)
+    
+    return version, {name: cached[name] for name in names}
+
 @app.route('/api/dashboard/data')
 def dashboard_data():
-    """API endpoint for complete dashboard data"""
+    """API endpoint for dashboard data (all sections, or those named by sections= / fields=)"""
     global processor
     
     try:
-        # Get real metrics from the data processor
+        fieldset = FieldSet.parse(request.args.get('sections'), request.args.get('fields'), DASHBOARD_SECTIONS)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    try:
+        # Get real metrics from the data processor, computing only the requested sections
         if processor:
-            metrics = asyncio.run(processor.get_current_metrics())
-            alerts = asyncio.run(processor.get_active_alerts())
-            regional_data = asyncio.run(processor.get_regional_breakdown())
-            attendance_history = asyncio.run(processor.get_attendance_history())
-            at_risk_employees = asyncio.run(processor.get_at_risk_employees())
+            version, sections = get_dashboard_sections(fieldset.sections)
+            if 'metrics' in sections:
+                metrics = dict(sections['metrics'])
+                data_source = metrics.pop('data_source', None)
+                sections['metrics'] = metrics
+            else:
+                data_source = 'real' if processor.attendance_data else None
             
-            # Format the complete response
-            return jsonify({
-                'metrics': {
-                    'attendance_rate': round(metrics.get('attendance_rate', 0), 1),
-                    'present_count': metrics.get('present_count', 0),
-                    'total_employees': metrics.get('total_employees', 0),
-                    'engagement_score': int(metrics.get('engagement_score', 0)),
-                    'week_over_week_change': round(metrics.get('week_over_week_change', 0), 1)
-                },
-                'alerts': alerts,
-                'regional_data': regional_data,
-                'attendance_history': attendance_history,
-                'at_risk_employees': at_risk_employees,
+            # Format the response
+            response = fieldset.apply(sections)
+            response.update({
+                'data_version': version,
                 'last_updated': datetime.now().isoformat(),
-                'data_source': 'real_data' if metrics.get('data_source') == 'real' else 'sample_data'
+                'data_source': 'real_data' if data_source == 'real' else 'sample_data'
             })
+            return jsonify(response)
         else:
             # Fallback to sample data if processor is not available
             return jsonify({
@@ -172,6 +326,64 @@ def dashboard_data():
             'data_source': 'error_fallback'
         })
 
+@app.route('/api/dashboard/stream')
+def dashboard_stream():
+    """Server-Sent Events stream announcing new data versions with the changed sections"""
+    last_seen = request.headers.get('Last-Event-ID', type=int)
+    if last_seen is None:
+        last_seen = request.args.get('since', type=int)
+    
+    def version_event(version, names):
+        _, sections = get_dashboard_sections(names)
+        if 'metrics' in sections:
+            sections['metrics'] = {k: v for k, v in sections['metrics'].items() if k != 'data_source'}
+        return format_event('version', {
+            'version': version,
+            'sections': sections,
+            'last_updated': datetime.now().isoformat()
+        }, event_id=version)
+    
+    def generate():
+        # Taken inside the generator and released by its finally, which runs however the stream ends
+        if not stream_slots.acquire(blocking=False):
+            # Every stream slot of this worker is in use: the dashboard polls and tries again later
+            yield f"retry: {SSE_BUSY_RETRY_SECONDS * 1000}\n\n"
+            yield format_event('busy', {'retry_seconds': SSE_BUSY_RETRY_SECONDS})
+            return
+        
+        seen = last_seen
+        opened = time.monotonic()
+        STREAM_CLIENTS.labels('sse').inc()
+        try:
+            # Reconnect delay for EventSource, then tell the client where we are
+            yield f"retry: {SSE_HEARTBEAT_SECONDS * 1000}\n\n"
+            yield format_event('hello', {'version': change_stream.version})
+            
+            while time.monotonic() - opened < SSE_MAX_STREAM_SECONDS:
+                if processor and seen is not None and seen != change_stream.version:
+                    changed = change_stream.sections_since(seen)
+                    names = DASHBOARD_SECTIONS if changed is None else [n for n in DASHBOARD_SECTIONS if n in changed]
+                    version = processor.data_version
+                    started = time.perf_counter()
+                    event = version_event(version, names)
+                    SSE_EVENT_SECONDS.observe(time.perf_counter() - started)
+                    yield event
+                    seen = version
+                    continue
+                
+                seen = change_stream.version if seen is None else seen
+                if change_stream.wait_for_change(seen, SSE_HEARTBEAT_SECONDS) == seen:
+                    # Comment frame keeps proxies from closing idle connections
+                    yield ": keep-alive\n\n"
+        finally:
+            STREAM_CLIENTS.labels('sse').dec()
+            stream_slots.release()
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route('/api/dashboard/metrics')
 def dashboard_metrics():
     """Get current dashboard metrics"""
@@ -339,6 +551,26 @@ def refresh_data():
             'error': str(e)
         }), 500
 
+@app.route('/internal/reload', methods=['POST'])
+def internal_reload():
+    """Apply the files and dates the sync daemon just committed, without a restart"""
+    if not RELOAD_TOKEN:
+        return jsonify({'success': False, 'error': 'Reload hook disabled'}), 404
+    token = request.headers.get('X-Reload-Token', '')
+    if not hmac.compare_digest(token.encode('utf-8'), RELOAD_TOKEN.encode('utf-8')):
+        return jsonify({'success': False, 'error': 'Invalid reload token'}), 401
+    
+    change = request.get_json(silent=True)
+    if not isinstance(change, dict) or not isinstance(change.get('files'), list):
+        return jsonify({'success': False, 'error': 'Expected a JSON change with a files list'}), 400
+    
+    try:
+        result = processor.apply_pushed_change(change)
+        return jsonify({'success': True, **result})
+    except Exception as e:
+        print(f"❌ Error applying pushed reload: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/analytics/predictions')
 def get_predictions():
     """Get AI-powered predictions"""
@@ -379,6 +611,149 @@ def get_predictions():
             'error': str(e)
         }), 500
 
+@app.route('/api/analytics/query')
+def query_attendance_cube():
+    """
+    Group-by query over the attendance cube, e.g.
+    ?group_by=office,status&department=Sales&start=2025-06-01&end=2025-07-31
+    (repeat a filter parameter to keep several values)
+    """
+    global processor
+    
+    try:
+        if processor:
+            group_by = [name.strip() for name in request.args.get('group_by', '').split(',') if name.strip()]
+            filters = {name: request.args.getlist(name) for name in CUBE_DIMENSIONS if name in request.args}
+            try:
+                result = asyncio.run(processor.query_attendance_cube(
+                    group_by, filters, request.args.get('start'), request.args.get('end')
+                ))
+            except ValueError as e:
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 400
+            return jsonify({
+                'success': True,
+                'data': result,
+                'data_version': processor.data_version
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'Data processor not available'
+            }), 500
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/export/attendance.<any(csv, ndjson):fmt>')
+@admin_required
+def export_attendance(fmt):
+    """
+    Raw attendance records streamed as CSV or NDJSON, e.g.
+    /api/export/attendance.csv?start=2025-01-01&end=2025-06-30&office=Austin
+    (repeat office / manager to keep several values); gzip-encoded when the client accepts it.
+    Admins only: the rows carry every employee's attendance history
+    """
+    global processor
+    
+    if not processor:
+        return jsonify({
+            'success': False,
+            'error': 'Data processor not available'
+        }), 500
+    
+    start, end = request.args.get('start'), request.args.get('end')
+    try:
+        chunks = processor.export_attendance(fmt, start, end, request.args.getlist('office'),
+                                             request.args.getlist('manager'))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    headers = {
+        'Content-Disposition': f'attachment; filename="{export_filename(fmt, start, end)}"',
+        'Vary': 'Accept-Encoding',
+        'X-Accel-Buffering': 'no',
+        'X-Data-Version': str(processor.data_version)
+    }
+    if accepts_gzip(request.headers.get('Accept-Encoding')):
+        chunks = gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    return Response(stream_with_context(chunks), content_type=EXPORT_FORMATS[fmt], headers=headers)
+
+def excel_job_response(job):
+    return dict(job, status_url=url_for('excel_export_status', job_id=job['id']),
+                download_url=url_for('download_excel_export', job_id=job['id']))
+
+@app.route('/api/export/attendance.xlsx', methods=['POST'])
+@admin_required
+def start_excel_export():
+    """
+    Start building the Excel report of ?start=&end= in the background; 202 with the
+    job (poll its status_url), 200 when the report is already built for this data version,
+    or 429 while EXPORT_MAX_JOBS reports are building
+    """
+    global processor
+    
+    if not processor:
+        return jsonify({
+            'success': False,
+            'error': 'Data processor not available'
+        }), 500
+    
+    try:
+        job = processor.start_excel_export(request.args.get('start'), request.args.get('end'))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Too many Excel reports are being built, try again shortly'
+        }), 429, {'Retry-After': '30'}
+    
+    return jsonify({
+        'success': True,
+        'job': excel_job_response(job)
+    }), 200 if job['state'] == 'done' else 202
+
+@app.route('/api/export/jobs/<job_id>')
+@admin_required
+def excel_export_status(job_id):
+    """Progress of an Excel report job"""
+    global processor
+    
+    job = processor.excel_export_status(job_id) if processor else None
+    if job is None:
+        return jsonify({'success': False, 'error': f'Export job {job_id} not found'}), 404
+    return jsonify({
+        'success': True,
+        'job': excel_job_response(job)
+    })
+
+@app.route('/api/export/jobs/<job_id>/download')
+@admin_required
+def download_excel_export(job_id):
+    """The workbook of a finished Excel report job"""
+    global processor
+    
+    job = processor.excel_export_status(job_id) if processor else None
+    if job is None:
+        return jsonify({'success': False, 'error': f'Export job {job_id} not found'}), 404
+    path = processor.excel_export_path(job_id)
+    if path is None:
+        return jsonify({'success': False, 'error': f"Export job {job_id} is {job['state']}", 'job': job}), 409
+    return send_file(path, mimetype=XLSX_CONTENT_TYPE, as_attachment=True, download_name=job['filename'],
+                     max_age=3600)
+
 @app.route('/api/dashboard/available-dates')
 def get_available_dates():
     """Get available attendance dates"""
@@ -432,8 +807,23 @@ def get_detailed_attendance_by_date(date):
     
     try:
         if processor:
-            # Use the processor's method to fetch detailed attendance info
-            detailed_data = asyncio.run(processor.get_detailed_attendance_by_date(date))
+            # Optional filters, sort and keyset paging (see AttendeeIndex.page)
+            try:
+                detailed_data = asyncio.run(processor.get_detailed_attendance_by_date(
+                    date,
+                    status=request.args.get('status'),
+                    office=request.args.get('office'),
+                    department=request.args.get('department'),
+                    q=request.args.get('q'),
+                    sort=request.args.get('sort', 'status'),
+                    limit=request.args.get('limit', type=int),
+                    cursor=request.args.get('cursor')
+                ))
+            except ValueError as e:
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 400
             
             if detailed_data:
                 return jsonify({
@@ -486,25 +876,40 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'data_version': processor.data_version if processor else None,
+        'reload': processor.reload_stats if processor else None,
+        'pid': os.getpid(),
+        'memory': process_memory(),
+        'gc': gc_stats()
     })
 
-# === ADMIN ROUTES ===
-def admin_required(f):
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if 'admin_logged_in' not in session:
-            return redirect(url_for('admin_login'))
-        return f(*args, **kwargs)
-    return decorated_function
+@app.route('/health/ready')
+def readiness_check():
+    """Readiness probe: data loaded and current, with load time, snapshot age, workers and memory"""
+    if not processor:
+        return jsonify({'ready': False, 'status': 'starting'}), 503
+    try:
+        report = processor.readiness()
+    except Exception as e:
+        return jsonify({'ready': False, 'status': 'error', 'error': str(e)}), 503
+    report['timestamp'] = datetime.now().isoformat()
+    return jsonify(report), 200 if report['ready'] else 503
 
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus exposition, merged across gunicorn workers"""
+    content, content_type = render_metrics(processor)
+    return Response(content, content_type=content_type)
+
+# === ADMIN ROUTES ===
 @app.route('/admin/login', methods=['GET', 'POST'])
 def admin_login():
     if request.method == 'POST':
         username = request.form.get('username')
         password = request.form.get('password')
         
-        if username in ADMIN_USERS and check_password_hash(ADMIN_USERS[username], password):
+        if check_admin_password(username, password):
             session['admin_logged_in'] = True
             session['admin_username'] = username
             flash('Successfully logged in!', 'success')
@@ -1271,6 +1676,71 @@ def list_uploads():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/admin/api/sync-metrics')
+@admin_required
+def sync_metrics():
+    """Sync run history with percentiles, histogram and trend of one metric"""
+    store = SyncMetricsStore(os.getenv('SYNC_METRICS_DB') or processor.data_dir / 'sync_metrics.db')
+    if not store.exists():
+        return jsonify({'success': False, 'error': 'No sync metrics recorded yet'}), 404
+
+    metric = request.args.get('metric', 'duration_ms')
+    file = request.args.get('file') or None
+    try:
+        days = int(request.args.get('days', 30))
+        limit = min(int(request.args.get('limit', 10)), 100)
+        since = time.time() - days * 86400
+        return jsonify({
+            'success': True,
+            'summary': store.summary(),
+            'recent_runs': store.recent_runs(limit),
+            'percentiles': store.percentiles(metric, file=file, since=since),
+            'histogram': store.histogram(metric, file=file, since=since) if metric.endswith('_ms') else None,
+            'trend': store.trend(metric, file=file, days=days, bucket=request.args.get('bucket', 'day'))
+        })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error reading sync metrics: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/admin/api/profiles')
+@admin_required
+def request_profiles():
+    """Slowest profiled requests kept by this worker"""
+    return jsonify({'success': True, **request_profiler.snapshot()})
+
+@app.route('/admin/api/profiles/<profile_id>')
+@admin_required
+def request_profile(profile_id):
+    """One kept profile: ?format=folded (flamegraph.pl/speedscope), text (pstats) or prof (snakeviz)"""
+    fmt = request.args.get('format', 'folded')
+    try:
+        rendered = request_profiler.render(profile_id, fmt)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if rendered is None:
+        return jsonify({'success': False, 'error': f'Profile {profile_id} not found in worker {os.getpid()}'}), 404
+
+    content, mimetype = rendered
+    extension = 'prof' if fmt == 'prof' else 'txt'
+    return Response(content, mimetype=mimetype, headers={
+        'Content-Disposition': f'inline; filename="profile-{profile_id}-{fmt}.{extension}"'
+    })
+
+@app.route('/admin/api/trace')
+@admin_required
+def trace_export():
+    """This worker's buffered spans as Chrome trace JSON (chrome://tracing, Perfetto); ?clear=1 empties the buffer"""
+    if not tracing_enabled():
+        return jsonify({'success': False, 'error': 'Tracing is disabled, set TRACE_SPANS=1'}), 404
+    trace = chrome_trace()
+    if request.args.get('clear') == '1':
+        clear_trace()
+    return Response(json.dumps(trace), mimetype='application/json', headers={
+        'Content-Disposition': f'attachment; filename="trace-{os.getpid()}.json"'
+    })
+
 # === WEBSOCKET EVENTS REMOVED ===
 # WebSocket functionality replaced with HTTP polling for better reliability
 
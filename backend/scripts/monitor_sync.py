@@ -9,13 +9,24 @@ import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 import argparse
+import sqlite3
 
-def load_metrics(metrics_file):
-    """Load sync metrics from file"""
+sys.path.append(str(Path(__file__).parent.parent / 'app'))
+from core.sync_metrics_store import SyncMetricsStore
+
+def open_metrics_store(config, metrics_db=None):
+    """Open the sync metrics database named by --metrics or the config"""
+    path = metrics_db or config.get('metrics_db') or Path(config.get('target_directory', '.')) / 'sync_metrics.db'
+    return SyncMetricsStore(path)
+
+def load_metrics(store):
+    """Load the sync metrics summary from the store"""
+    if not store.exists():
+        print(f"Error loading metrics: {store.path} does not exist")
+        return None
     try:
-        with open(metrics_file, 'r') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError) as e:
+        return store.summary()
+    except sqlite3.Error as e:
         print(f"Error loading metrics: {e}")
         return None
 
@@ -29,7 +40,7 @@ def check_sync_health(metrics, config):
     
     # Check last sync time
     if metrics.get('last_sync'):
-        last_sync = datetime.fromisoformat(metrics['last_sync'])
+        last_sync = datetime.fromtimestamp(metrics['last_sync'])
         time_since_last_sync = datetime.now() - last_sync
         max_age = timedelta(hours=config['alert_thresholds']['data_age_hours'])
         
@@ -44,13 +55,9 @@ def check_sync_health(metrics, config):
         issues.append(f"CRITICAL: {consecutive_failures} consecutive sync failures")
     
     # Check success rate
-    total_syncs = metrics.get('total_syncs', 0)
-    successful_syncs = metrics.get('successful_syncs', 0)
-    
-    if total_syncs > 0:
-        success_rate = (successful_syncs / total_syncs) * 100
-        if success_rate < 90:
-            issues.append(f"WARNING: Low success rate: {success_rate:.1f}%")
+    success_rate = metrics.get('success_rate')
+    if success_rate is not None and success_rate < 90:
+        issues.append(f"WARNING: Low success rate: {success_rate:.1f}%")
     
     return issues
 
@@ -73,7 +80,7 @@ def display_status(metrics, config):
     # Last sync info
     last_sync = metrics.get('last_sync')
     if last_sync:
-        last_sync_dt = datetime.fromisoformat(last_sync)
+        last_sync_dt = datetime.fromtimestamp(last_sync)
         time_ago = datetime.now() - last_sync_dt
         print(f"Last Sync: {last_sync_dt.strftime('%Y-%m-%d %H:%M:%S')} ({time_ago} ago)")
     else:
@@ -82,7 +89,7 @@ def display_status(metrics, config):
     # Last success info
     last_success = metrics.get('last_success')
     if last_success:
-        last_success_dt = datetime.fromisoformat(last_success)
+        last_success_dt = datetime.fromtimestamp(last_success)
         time_ago = datetime.now() - last_success_dt
         print(f"Last Success: {last_success_dt.strftime('%Y-%m-%d %H:%M:%S')} ({time_ago} ago)")
     else:
@@ -101,35 +108,79 @@ def display_status(metrics, config):
     
     print("=" * 60)
 
-def display_recent_runs(metrics, count=5):
-    """Display recent sync runs"""
+def display_recent_runs(store, count=5):
+    """Display recent sync runs with their per-file timings"""
     print(f"\nRECENT SYNC RUNS (last {count}):")
     print("-" * 60)
     
-    recent_runs = metrics.get('sync_runs', [])[-count:]
+    recent_runs = store.recent_runs(count)
     
     if not recent_runs:
         print("No sync runs recorded")
         return
     
-    for run in reversed(recent_runs):
-        timestamp = datetime.fromisoformat(run['timestamp'])
+    for run in recent_runs:
+        timestamp = datetime.fromtimestamp(run['started_at'])
         status = "✅ SUCCESS" if run['success'] else "❌ FAILED"
-        files = ", ".join(run['files_synced']) if run['files_synced'] else "None"
+        synced = [f['file'] for f in run['files'] if f['status'] == 'synced']
+        files = ", ".join(synced) if synced else "None"
         
         print(f"{timestamp.strftime('%Y-%m-%d %H:%M:%S')} | {status} | Files: {files}")
         
-        if run.get('errors'):
-            for error in run['errors']:
-                print(f"  ERROR: {error}")
+        if run.get('duration_ms') is not None:
+            print(f"  Duration: {run['duration_ms'] / 1000:.2f}s | Written: {run['bytes_written'] / 1024:,.1f} KB"
+                  + (f" | Snapshot: v{run['snapshot_version']}" if run.get('snapshot_version') else "")
+                  + (f" | Visible after: {run['visible_ms'] / 1000:.2f}s" if run.get('visible_ms') is not None else ""))
+        for f in run['files']:
+            details = [f['status'] + (f" ({f['mode']})" if f.get('mode') else "")]
+            if f.get('duration_ms') is not None:
+                details.append(f"{f['duration_ms']:.0f} ms")
+            if f.get('bytes_written'):
+                details.append(f"{f['bytes_written'] / 1024:,.1f} KB")
+            if f.get('rows') is not None:
+                details.append(f"{f['rows']:,} rows")
+            if f.get('validation_ms') is not None:
+                details.append(f"validated in {f['validation_ms']:.0f} ms")
+            print(f"  {f['file']}: {' | '.join(details)}")
+        
+        for error in run['errors']:
+            print(f"  ERROR: {error}")
+
+def display_percentiles(store, metric, file=None, days=30):
+    """Display percentiles and a histogram of a sync metric"""
+    since = datetime.now().timestamp() - days * 86400
+    scope = file or 'all runs'
+    result = store.percentiles(metric, file=file, since=since)
+    print(f"\n{metric.upper()} PERCENTILES ({scope}, last {days} days, {result['count']} samples):")
+    print("-" * 60)
+    print("  " + " | ".join(f"{k}: {v if v is not None else '-'}" for k, v in result.items() if k.startswith('p')))
+    
+    if metric.endswith('_ms'):
+        for bucket in store.histogram(metric, file=file, since=since):
+            label = f"<= {bucket['le']:g} ms" if bucket['le'] is not None else "slower"
+            print(f"  {label:>12} {'#' * min(bucket['count'], 50)} {bucket['count']}")
+
+def display_trend(store, metric, file=None, days=30):
+    """Display the per-day trend of a sync metric"""
+    print(f"\n{metric.upper()} TREND ({file or 'all runs'}, last {days} days):")
+    print("-" * 60)
+    rows = store.trend(metric, file=file, days=days)
+    if not rows:
+        print("No data")
+    for row in rows:
+        print(f"  {row['period']} | runs: {row['runs']:>4} | avg: {row['avg']} | max: {row['max']}")
 
 def main():
     """Main function"""
     parser = argparse.ArgumentParser(description='Monitor attendance data sync system')
     parser.add_argument('--config', default='sync_config.json', help='Config file path')
-    parser.add_argument('--metrics', default=None, help='Metrics file path (overrides config)')
+    parser.add_argument('--metrics', default=None, help='Metrics database path (overrides config)')
     parser.add_argument('--recent', type=int, default=5, help='Number of recent runs to show')
     parser.add_argument('--health-check', action='store_true', help='Only perform health check')
+    parser.add_argument('--percentiles', metavar='METRIC', help='Show percentiles of duration_ms, bytes_written, validation_ms, visible_ms or rows')
+    parser.add_argument('--trend', metavar='METRIC', help='Show the daily trend of a metric')
+    parser.add_argument('--file', default=None, help='Restrict --percentiles/--trend to one data file')
+    parser.add_argument('--days', type=int, default=30, help='Time window for --percentiles/--trend')
     
     args = parser.parse_args()
     
@@ -142,8 +193,8 @@ def main():
         sys.exit(1)
     
     # Load metrics
-    metrics_file = args.metrics or config.get('metrics_file', 'sync_metrics.json')
-    metrics = load_metrics(metrics_file)
+    store = open_metrics_store(config, args.metrics)
+    metrics = load_metrics(store)
     
     if args.health_check:
         # Only run health check
@@ -161,7 +212,15 @@ def main():
     display_status(metrics, config)
     
     if metrics:
-        display_recent_runs(metrics, args.recent)
+        display_recent_runs(store, args.recent)
+        try:
+            if args.percentiles:
+                display_percentiles(store, args.percentiles, args.file, args.days)
+            if args.trend:
+                display_trend(store, args.trend, args.file, args.days)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
 
 if __name__ == '__main__':
     main()
@@ -1,6 +1,6 @@
 @echo off
 echo Starting Attendance Data Sync (Daemon Mode)...
-echo This will run continuously every 30 minutes.
+echo Syncs whenever source files change, with a full check every 30 minutes.
 echo Press Ctrl+C to stop.
 echo.
 
@@ -29,7 +29,7 @@ if not exist "sync_config.json" (
 )
 
 echo Starting daemon mode...
-python sync_data.py --config sync_config.json --daemon
+python sync_data.py --config sync_config.json --watch
 
 echo.
 echo Daemon stopped. Press any key to exit...
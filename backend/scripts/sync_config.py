@@ -23,6 +23,13 @@ DEFAULT_CONFIG = {
     'sync_interval_minutes': 30,
     'force_sync': False,
     'validate_data': True,
+    'sync_workers': 3,  # files synced concurrently
+    
+    # Watch mode: sync as soon as source files change (interval above stays as a safety net)
+    'watch_enabled': False,
+    'watch_debounce_seconds': 2,
+    'watch_max_delay_seconds': 15,
+    'watch_poll_seconds': 2,
     
     # File patterns
     'attendance_history_file': 'attendance_history.json',
@@ -30,6 +37,14 @@ DEFAULT_CONFIG = {
     'employee_directory_pattern': 'peoplehub*.csv',
     'employee_directory_target': 'peoplehubdirectory20250708.csv',
     
+    # Attendance history delta sync: fold deltas back into the full file after this many,
+    # or once they add up to this fraction of its size
+    'history_max_deltas': 20,
+    'history_compact_ratio': 0.5,
+    
+    # Synced files are committed as versioned snapshots (data/snapshots/vNNNNNN); older versions kept as backups
+    'snapshot_keep': 5,
+    
     # Logging
     'log_level': 'INFO',
     'log_file': 'data_sync.log',
@@ -46,16 +61,17 @@ DEFAULT_CONFIG = {
     'email_to': '',
     'email_password': '',
     
-    # Docker integration
-    'docker_enabled': True,
-    'docker_compose_file': 'docker-compose.yml',
-    'docker_service_name': 'attendance-dashboard',
-    'restart_container_on_sync': False,
-    'container_health_check': True,
+    # Dashboard integration: the reload hook applies each sync right away (DASHBOARD_RELOAD_TOKEN on both sides)
+    'dashboard_url': 'http://localhost:8000',
+    'dashboard_reload_token': '',
+    'dashboard_timeout_seconds': 5,
+    'container_health_check': True,  # query the dashboard's /health/ready after each sync
     
     # Monitoring
     'metrics_enabled': True,
-    'metrics_file': 'sync_metrics.json',
+    'metrics_file': 'sync_metrics.json',  # legacy JSON metrics, imported once into metrics_db
+    'metrics_db': None,  # defaults to <target_directory>/sync_metrics.db
+    'metrics_retention_days': 180,
     'alert_thresholds': {
         'sync_failure_count': 3,
         'data_age_hours': 24,
@@ -87,6 +103,7 @@ def load_config(config_file=None):
         'SYNC_EMAIL_FROM': 'email_from',
         'SYNC_EMAIL_TO': 'email_to',
         'SYNC_EMAIL_PASSWORD': 'email_password',
+        'DASHBOARD_RELOAD_TOKEN': 'dashboard_reload_token',
     }
     
     for env_var, config_key in env_mappings.items():
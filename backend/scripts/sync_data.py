@@ -8,23 +8,48 @@ to the dashboard's data directory with monitoring, notifications, and Docker int
 import os
 import sys
 import json
-import shutil
 import logging
 import smtplib
-import subprocess
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
+from urllib.parse import urlsplit
 from logging.handlers import RotatingFileHandler
+from concurrent.futures import ThreadPoolExecutor
 import argparse
+import csv
+import fnmatch
+import http.client
+import threading
 import time
 
 # Import configuration
 from sync_config import load_config, validate_config
 
+# Shared with the dashboard server: lets running workers know which files changed
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'app'))
+from core.change_bus import ChangeBus
+from core.history_delta import HistoryDeltaLog, date_hash
+from core.json_stream import iter_object_items
+from core.snapshot import HashingReader, SnapshotStore
+from core.sync_metrics_store import SyncMetricsStore
+
+# watchdog gives native filesystem events (inotify/ReadDirectoryChangesW); fall back to stat polling
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
 # Global variables
 logger = None
 config = None
 
+def count_csv_rows(path):
+    """Count CSV rows (including the header) without holding the file in memory"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return sum(1 for _ in csv.reader(f))
+
 def setup_logging(log_config):
     """Setup logging with rotation"""
     global logger
@@ -112,128 +137,261 @@ This is an automated message from the Attendance Dashboard data sync system.
 
 
 class MetricsCollector:
-    """Collect and store sync metrics"""
+    """Record sync runs and per-file timings in the append-only SyncMetricsStore"""
     
-    def __init__(self, metrics_file):
-        self.metrics_file = Path(metrics_file)
-        self.metrics = self.load_metrics()
-    
-    def load_metrics(self):
-        """Load existing metrics"""
-        if self.metrics_file.exists():
-            try:
-                with open(self.metrics_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.warning(f"Could not load metrics: {e}")
-        
-        return {
-            'sync_runs': [],
-            'total_syncs': 0,
-            'successful_syncs': 0,
-            'failed_syncs': 0,
-            'last_sync': None,
-            'last_success': None,
-            'consecutive_failures': 0
-        }
+    def __init__(self, metrics_db, legacy_metrics_file=None, retention_days=180):
+        self.store = SyncMetricsStore(metrics_db, retention_days=retention_days)
+        if legacy_metrics_file and Path(legacy_metrics_file).exists() and not self.store.exists():
+            imported = self.store.import_json_metrics(legacy_metrics_file)
+            logger.info(f"Imported {imported} sync runs from {legacy_metrics_file}")
     
-    def record_sync(self, success, files_synced, errors=None):
+    def record_sync(self, success, file_stats, errors=None, duration_ms=None, bytes_written=0,
+                    validation_ms=None, visible_ms=None, snapshot_version=None):
         """Record a sync operation"""
-        now = datetime.now().isoformat()
-        
-        sync_record = {
-            'timestamp': now,
-            'success': success,
-            'files_synced': files_synced,
-            'errors': errors or []
-        }
-        
-        self.metrics['sync_runs'].append(sync_record)
-        self.metrics['total_syncs'] += 1
-        self.metrics['last_sync'] = now
-        
-        if success:
-            self.metrics['successful_syncs'] += 1
-            self.metrics['last_success'] = now
-            self.metrics['consecutive_failures'] = 0
-        else:
-            self.metrics['failed_syncs'] += 1
-            self.metrics['consecutive_failures'] += 1
-        
-        # Keep only last 100 runs
-        if len(self.metrics['sync_runs']) > 100:
-            self.metrics['sync_runs'] = self.metrics['sync_runs'][-100:]
-        
-        self.save_metrics()
-    
-    def save_metrics(self):
-        """Save metrics to file"""
         try:
-            with open(self.metrics_file, 'w') as f:
-                json.dump(self.metrics, f, indent=2)
+            self.store.record_run(
+                success,
+                file_stats,
+                duration_ms=duration_ms,
+                bytes_written=bytes_written,
+                validation_ms=validation_ms,
+                visible_ms=visible_ms,
+                snapshot_version=snapshot_version,
+                errors=errors
+            )
         except Exception as e:
             logger.error(f"Could not save metrics: {e}")
     
     def get_metrics(self):
-        """Get current metrics"""
-        return self.metrics.copy()
+        """Get current totals and the failure streak"""
+        try:
+            return self.store.summary()
+        except Exception as e:
+            logger.warning(f"Could not load metrics: {e}")
+            return {'total_syncs': 0, 'consecutive_failures': 0}
 
 
-class DockerManager:
-    """Manage Docker container operations"""
-    
-    def __init__(self, docker_config):
-        self.config = docker_config
-        self.enabled = docker_config.get('docker_enabled', False)
-    
-    def check_container_health(self):
-        """Check if the dashboard container is healthy"""
+class DashboardClient:
+    """
+    Keep-alive HTTP client for the local dashboard.
+
+    One persistent connection is reused across syncs, so pushing a reload
+    costs a request, not a TCP handshake or a process spawn. Every request
+    has a timeout; a connection the server closed while idle is reopened once.
+    """
+    
+    def __init__(self, client_config):
+        url = urlsplit(client_config.get('dashboard_url') or '')
+        self.enabled = bool(url.hostname)
+        self.https = url.scheme == 'https'
+        self.host = url.hostname
+        self.port = url.port
+        self.token = client_config.get('dashboard_reload_token', '')
+        self.timeout = client_config.get('dashboard_timeout_seconds', 5)
+        self._connection = None
+        self._lock = threading.Lock()
+    
+    def request(self, method, path, payload=None, headers=None):
+        """Send a JSON request and return (status, decoded body)"""
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {'Content-Type': 'application/json', **(headers or {})}
+        with self._lock:
+            for attempt in range(2):
+                reused = self._connection is not None
+                if not reused:
+                    connection_class = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+                    self._connection = connection_class(self.host, self.port, timeout=self.timeout)
+                try:
+                    self._connection.request(method, path, body=body, headers=headers)
+                    response = self._connection.getresponse()
+                    data = response.read()
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    self.close()
+                    if reused and attempt == 0:
+                        continue
+                    raise
+                except Exception:
+                    self.close()
+                    raise
+                if response.will_close:
+                    self.close()
+                try:
+                    return response.status, json.loads(data) if data else {}
+                except ValueError:
+                    return response.status, {'error': data[:200].decode('utf-8', 'replace')}
+    
+    def push_reload(self, change):
+        """Ask the dashboard to apply a published change now; returns its response or None"""
+        if not self.enabled or not self.token:
+            return None
+        try:
+            status, result = self.request('POST', '/internal/reload', change, {'X-Reload-Token': self.token})
+        except (OSError, http.client.HTTPException) as e:
+            logger.warning(f"Could not push reload to dashboard: {e}")
+            return None
+        if status != 200:
+            logger.warning(f"Dashboard reload hook returned {status}: {result.get('error') or result.get('detail')}")
+            return None
+        return result
+    
+    def check_health(self):
+        """
+        Query /health/ready; True when the dashboard is up and serving current data.
+        
+        A single request over the kept-alive connection, instead of spawning
+        the docker CLI on every sync.
+        """
         if not self.enabled:
             return True
-        
         try:
-            result = subprocess.run(
-                ['docker', 'ps', '--filter', f'name={self.config["docker_service_name"]}', '--format', '{{.Status}}'],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            if result.returncode == 0 and 'healthy' in result.stdout.lower():
-                return True
-            
-            logger.warning(f"Container health check failed: {result.stdout}")
-            return False
-            
-        except Exception as e:
-            logger.error(f"Error checking container health: {e}")
+            status, report = self.request('GET', '/health/ready')
+        except (OSError, http.client.HTTPException) as e:
+            logger.warning(f"Dashboard health check failed: {e}")
             return False
-    
-    def restart_container(self):
-        """Restart the dashboard container"""
-        if not self.enabled or not self.config.get('restart_container_on_sync', False):
+        
+        if report.get('status') == 'catching_up':
+            # Up, and about to apply a change that was just published
+            logger.info(f"Dashboard catching up: {report.get('versions_behind')} version(s) behind")
             return True
+        if status != 200:
+            logger.warning(f"Dashboard not ready ({status}): {report.get('status') or report.get('error')}")
+            return False
         
-        try:
-            logger.info("Restarting dashboard container...")
+        snapshot = report.get('snapshot') or {}
+        memory = report.get('memory') or {}
+        logger.info(f"Dashboard ready: data version {report.get('data_version')}, "
+                    f"snapshot v{snapshot.get('version')} ({snapshot.get('age_seconds')}s old), "
+                    f"{(report.get('workers') or {}).get('count')} workers, {memory.get('rss_mb')} MB RSS")
+        return True
+    
+    def close(self):
+        if self._connection:
+            self._connection.close()
+            self._connection = None
+
+
+class SourceWatcher:
+    """Watch the source directory and coalesce bursts of writes into a single sync trigger"""
+    
+    def __init__(self, source_dir, watch_config):
+        self.source_dir = Path(source_dir)
+        self.patterns = [
+            watch_config.get('attendance_history_file', 'attendance_history.json'),
+            watch_config.get('rm_attendance_file', 'rm_attendance_history.json'),
+            watch_config.get('employee_directory_pattern', 'peoplehub*.csv')
+        ]
+        self.debounce_seconds = watch_config.get('watch_debounce_seconds', 2)
+        self.max_delay_seconds = watch_config.get('watch_max_delay_seconds', 15)
+        self.poll_seconds = watch_config.get('watch_poll_seconds', 2)
+        
+        self.condition = threading.Condition()
+        self.pending = set()
+        self.events = 0
+        self.observer = None
+        self.snapshot = {}
+    
+    def matches(self, path):
+        """Check whether a path is one of the files we sync"""
+        name = Path(path).name
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.patterns)
+    
+    def start(self):
+        """Start watching for filesystem events"""
+        if WATCHDOG_AVAILABLE:
+            watcher = self
             
-            result = subprocess.run(
-                ['docker-compose', 'restart', self.config['docker_service_name']],
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            class Handler(FileSystemEventHandler):
+                def on_any_event(self, event):
+                    if event.is_directory:
+                        return
+                    # Trackers often write a temp file and rename it into place
+                    for path in (getattr(event, 'dest_path', None), event.src_path):
+                        if path and watcher.matches(path):
+                            watcher.notify(Path(path).name)
             
-            if result.returncode == 0:
-                logger.info("Container restarted successfully")
-                return True
-            else:
-                logger.error(f"Container restart failed: {result.stderr}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Error restarting container: {e}")
-            return False
+            self.observer = Observer()
+            self.observer.schedule(Handler(), str(self.source_dir), recursive=False)
+            self.observer.start()
+            logger.info(f"Watching {self.source_dir} for changes (filesystem events)")
+        else:
+            self.snapshot = self.scan()
+            logger.info(f"Watching {self.source_dir} for changes (polling every {self.poll_seconds}s, install watchdog for native events)")
+    
+    def stop(self):
+        if self.observer:
+            self.observer.stop()
+            self.observer.join(timeout=5)
+    
+    def notify(self, name):
+        """Record a changed file and wake the daemon"""
+        with self.condition:
+            self.pending.add(name)
+            self.events += 1
+            self.condition.notify_all()
+    
+    def scan(self):
+        """Stat the watched files (polling fallback)"""
+        snapshot = {}
+        try:
+            for entry in os.scandir(self.source_dir):
+                if entry.is_file() and self.matches(entry.name):
+                    stat = entry.stat()
+                    snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        except OSError as e:
+            logger.error(f"Error scanning source directory: {e}")
+        return snapshot
+    
+    def poll(self):
+        """Compare a fresh scan with the previous one and notify about differences"""
+        current = self.scan()
+        for name in set(current) | set(self.snapshot):
+            if current.get(name) != self.snapshot.get(name):
+                self.notify(name)
+        self.snapshot = current
+    
+    def _wait(self, timeout):
+        """Wait up to timeout seconds for a change notification (returns at once if one is pending)"""
+        if self.observer:
+            # pending is checked and waited on under the lock notify() takes, so no event is missed
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending, timeout)
+        else:
+            deadline = time.monotonic() + timeout
+            while not self.pending and time.monotonic() < deadline:
+                time.sleep(min(self.poll_seconds, max(0, deadline - time.monotonic())))
+                self.poll()
+    
+    def wait_for_changes(self, timeout):
+        """
+        Block until watched files change (or the timeout expires).
+        
+        After the first change, keep waiting until writes have been quiet for
+        ``debounce_seconds`` (capped at ``max_delay_seconds``), so a tracker
+        rewriting several files results in a single sync. Returns the set of
+        changed file names, empty on timeout.
+        """
+        self._wait(timeout)
+        with self.condition:
+            if not self.pending:
+                return set()
+        
+        first_change = time.monotonic()
+        while True:
+            with self.condition:
+                seen = self.events
+            quiet_for = min(self.debounce_seconds, self.max_delay_seconds - (time.monotonic() - first_change))
+            if quiet_for <= 0:
+                break
+            time.sleep(quiet_for)
+            if not self.observer:
+                self.poll()
+            with self.condition:
+                if self.events == seen:
+                    break
+        
+        with self.condition:
+            changed, self.pending = self.pending, set()
+        return changed
 
 
 class AttendanceDataSync:
@@ -254,8 +412,13 @@ class AttendanceDataSync:
         
         # Initialize managers
         self.notification_manager = NotificationManager(self.config)
-        self.metrics_collector = MetricsCollector(self.config.get('metrics_file', 'sync_metrics.json'))
-        self.docker_manager = DockerManager(self.config)
+        self.metrics_collector = MetricsCollector(
+            self.config.get('metrics_db') or self.target_dir / 'sync_metrics.db',
+            legacy_metrics_file=self.config.get('metrics_file'),
+            retention_days=self.config.get('metrics_retention_days', 180)
+        )
+        self.dashboard = DashboardClient(self.config)
+        self.snapshots = SnapshotStore(self.target_dir, keep=self.config.get('snapshot_keep', 5))
         
         # Ensure target directory exists
         if not self.dry_run:
@@ -263,43 +426,92 @@ class AttendanceDataSync:
         
         # Initialize sync state
         self.files_synced = []
+        self.files_changed = []
+        # Set when only manifest metadata moved (a touched but unchanged source), which
+        # still needs a snapshot version of its own, or the next sync re-reads the source
+        self.metadata_changed = False
         self.errors = []
+        self.dates_changed = []
+        self.history_delta = None
+        self.file_stats = {}
+        self.validation_ms = None
+        self.bytes_written = 0
+        self.snapshot = None
+        self.visible_ms = None
+        # Where this run reads and writes target files: the staged snapshot version
+        self.work_dir = self.target_dir
+        self.staged = None
+        self.state_lock = threading.Lock()
     
     def sync_attendance_history(self):
-        """Sync the main attendance history file"""
+        """
+        Sync the main attendance history file date by date.
+        
+        Compares per-date content hashes of the source with the manifest of
+        the target and writes only the changed dates as a delta file (see
+        HistoryDeltaLog), which the dashboard applies without re-reading the
+        whole history.
+        """
         source_file = self.source_dir / 'attendance_history.json'
-        target_file = self.target_dir / 'attendance_history.json'
+        history_log = HistoryDeltaLog(
+            self.work_dir,
+            max_deltas=self.config.get('history_max_deltas', 20),
+            compact_ratio=self.config.get('history_compact_ratio', 0.5)
+        )
         
         if not source_file.exists():
             logger.warning(f"Source file not found: {source_file}")
             return False
         
         try:
-            # Check if source is newer than target
-            if target_file.exists():
-                source_mtime = source_file.stat().st_mtime
-                target_mtime = target_file.stat().st_mtime
-                
-                if source_mtime <= target_mtime:
-                    logger.info("Attendance history is up to date")
-                    return True
+            # Skip unchanged sources without parsing them
+            source_stat = source_file.stat()
+            source_signature = [source_stat.st_mtime_ns, source_stat.st_size]
+            manifest = history_log.read_manifest()
+            if manifest and manifest.get('source_signature') == source_signature and not self.config.get('force_sync'):
+                logger.info("Attendance history is up to date")
+                return True
             
-            logger.info(f"Syncing attendance history: {source_file} -> {target_file}")
+            # Validate and diff in one streaming pass, keeping only the changed dates in memory
+            target_hashes = history_log.current_hashes()
+            source_hashes = {}
+            upserts = {}
+            with open(source_file, 'rb') as f:
+                reader = HashingReader(f)
+                for date, date_data in iter_object_items(reader):
+                    if not isinstance(date_data, dict):
+                        logger.error(f"Source attendance history has invalid data for date {date}")
+                        return False
+                    digest = date_hash(date_data)
+                    source_hashes[date] = digest
+                    if target_hashes.get(date) != digest:
+                        upserts[date] = date_data
+            changed = list(upserts)
+            removed = [date for date in target_hashes if date not in source_hashes]
+            
+            if not changed and not removed and history_log.base_path.exists():
+                logger.info("Attendance history content is up to date")
+                if not self.dry_run:
+                    history_log.update_meta(hashes=source_hashes, source_signature=source_signature)
+                    self.metadata_changed = True
+                return True
+            
+            logger.info(f"Syncing attendance history: {len(changed)} changed, {len(removed)} removed dates "
+                        f"({source_file} -> {history_log.base_path})")
             
             if not self.dry_run:
-                # Validate JSON before copying
-                with open(source_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # Create backup of existing file
-                if target_file.exists():
-                    backup_file = target_file.with_suffix('.json.backup')
-                    shutil.copy2(target_file, backup_file)
-                    logger.info(f"Backed up existing file to {backup_file}")
-                
-                # Copy new file
-                shutil.copy2(source_file, target_file)
-                logger.info(f"Successfully synced {len(data)} dates of attendance data")
+                result = history_log.commit(upserts, removed, hashes=source_hashes,
+                                            base_source=source_file, base_sha256=reader.hexdigest(),
+                                            source_signature=source_signature)
+                self._record_write(history_log.base_path.name, result['bytes_written'])
+                if result['mode'] == 'full':
+                    # The new base is a verified copy of the source
+                    self.staged.checksums[history_log.base_path.name] = reader.hexdigest()
+                self.history_delta = result['delta']
+                self._file_stat(history_log.base_path.name, mode=result['mode'], rows=len(source_hashes))
+                self.dates_changed = changed + removed
+                logger.info(f"Successfully synced attendance data ({result['mode']}, "
+                            f"{result['bytes_written']:,} bytes written, {len(source_hashes)} dates total)")
             
             return True
             
@@ -310,7 +522,7 @@ class AttendanceDataSync:
     def sync_rm_attendance(self):
         """Sync the regional manager attendance file"""
         source_file = self.source_dir / 'rm_attendance_history.json'
-        target_file = self.target_dir / 'rm_attendance_history.json'
+        target_file = self.work_dir / 'rm_attendance_history.json'
         
         if not source_file.exists():
             logger.info("Regional manager attendance file not found, skipping")
@@ -329,18 +541,14 @@ class AttendanceDataSync:
             logger.info(f"Syncing RM attendance: {source_file} -> {target_file}")
             
             if not self.dry_run:
-                # Validate JSON before copying
-                with open(source_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # Create backup of existing file
-                if target_file.exists():
-                    backup_file = target_file.with_suffix('.json.backup')
-                    shutil.copy2(target_file, backup_file)
-                
-                # Copy new file
-                shutil.copy2(source_file, target_file)
-                logger.info(f"Successfully synced {len(data)} dates of RM attendance data")
+                # Validated by an incremental parser while it streams in; previous snapshot versions are the backups
+                copied = self._copy_into_snapshot(source_file, target_file,
+                                                  inspect=lambda f: sum(1 for _ in iter_object_items(f)))
+                self._file_stat(target_file.name, rows=copied['result'])
+                if copied['changed']:
+                    logger.info(f"Successfully synced {copied['result']} dates of RM attendance data")
+                else:
+                    logger.info("Regional manager attendance content is unchanged")
             
             return True
             
@@ -359,7 +567,7 @@ class AttendanceDataSync:
         
         # Get the most recent file
         source_file = max(source_files, key=lambda f: f.stat().st_mtime)
-        target_file = self.target_dir / 'peoplehubdirectory20250708.csv'
+        target_file = self.work_dir / 'peoplehubdirectory20250708.csv'
         
         try:
             # Check if source is newer than target
@@ -374,14 +582,12 @@ class AttendanceDataSync:
             logger.info(f"Syncing employee directory: {source_file} -> {target_file}")
             
             if not self.dry_run:
-                # Create backup of existing file
-                if target_file.exists():
-                    backup_file = target_file.with_suffix('.csv.backup')
-                    shutil.copy2(target_file, backup_file)
-                
-                # Copy new file
-                shutil.copy2(source_file, target_file)
-                logger.info("Successfully synced employee directory")
+                # Previous snapshot versions are kept as backups
+                copied = self._copy_into_snapshot(source_file, target_file)
+                if copied['changed']:
+                    logger.info("Successfully synced employee directory")
+                else:
+                    logger.info("Employee directory content is unchanged")
             
             return True
             
@@ -389,96 +595,230 @@ class AttendanceDataSync:
             logger.error(f"Error syncing employee directory: {e}")
             return False
     
+    def _copy_into_snapshot(self, source_file, target_file, inspect=None):
+        """Stream a source file into the staged version, checksumming it on the way"""
+        copied = self.staged.copy_in(source_file, target_file.name, inspect=inspect)
+        if copied['changed']:
+            self._record_write(target_file.name, copied['bytes_written'])
+        return copied
+    
+    def _record_write(self, name, bytes_written):
+        """Note a changed target file (called from the sync worker threads)"""
+        with self.state_lock:
+            self.files_changed.append(name)
+            self.bytes_written += bytes_written
+            stats = self.file_stats.setdefault(name, {'file': name})
+            stats['bytes_written'] = stats.get('bytes_written', 0) + bytes_written
+    
+    def _file_stat(self, name, **values):
+        """Set per-file metrics for this run"""
+        with self.state_lock:
+            self.file_stats.setdefault(name, {'file': name}).update(values)
+    
     def validate_data_integrity(self):
-        """Validate the integrity of synced data"""
+        """
+        Validate the files this run changed before they go live.
+        
+        Both checks stream their file (an incremental JSON parser, a CSV row
+        counter) and run concurrently. Unchanged files were validated when
+        their version was committed.
+        """
         logger.info("Validating data integrity...")
         
-        # Check attendance history
-        attendance_file = self.target_dir / 'attendance_history.json'
-        if attendance_file.exists():
-            try:
-                with open(attendance_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                if not isinstance(data, dict):
-                    logger.error("Attendance history is not a valid dictionary")
-                    return False
-                
-                # Check for required structure
-                for date, date_data in data.items():
-                    if not isinstance(date_data, dict):
-                        logger.error(f"Invalid data structure for date {date}")
-                        return False
-                
-                logger.info(f"Attendance history validation passed: {len(data)} dates")
-                
-            except Exception as e:
-                logger.error(f"Error validating attendance history: {e}")
-                return False
+        checks = []
+        if 'attendance_history.json' in self.files_changed:
+            checks.append(('attendance_history.json', self._validate_attendance_history))
+        if 'peoplehubdirectory20250708.csv' in self.files_changed:
+            checks.append(('peoplehubdirectory20250708.csv', self._validate_employee_directory))
         
-        # Check employee directory
-        employee_file = self.target_dir / 'peoplehubdirectory20250708.csv'
-        if employee_file.exists():
+        def timed(check):
+            name, validate = check
+            started = time.perf_counter()
             try:
-                with open(employee_file, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                
-                if len(lines) < 2:  # Header + at least one data row
-                    logger.error("Employee directory file is empty or has no data")
-                    return False
-                
-                logger.info(f"Employee directory validation passed: {len(lines)-1} employees")
-                
-            except Exception as e:
-                logger.error(f"Error validating employee directory: {e}")
-                return False
+                return validate()
+            finally:
+                self._file_stat(name, validation_ms=round((time.perf_counter() - started) * 1000, 2))
+        
+        with ThreadPoolExecutor(max_workers=max(1, len(checks))) as pool:
+            results = list(pool.map(timed, checks))
+        if not all(results):
+            return False
         
         logger.info("Data integrity validation completed successfully")
         return True
     
-    def sync_all(self):
-        """Sync all data files"""
-        logger.info("Starting data synchronization...")
+    def _validate_attendance_history(self):
+        """Check that every synced date holds a dictionary of employee records"""
+        history_log = HistoryDeltaLog(self.work_dir)
+        try:
+            if self.history_delta:
+                upserts, _ = history_log.read_delta(self.history_delta)
+                items = upserts.items()
+            else:
+                items = history_log.iter_dates()
+            
+            count = 0
+            for date, date_data in items:
+                if not isinstance(date_data, dict):
+                    logger.error(f"Invalid data structure for date {date}")
+                    return False
+                count += 1
+            
+            logger.info(f"Attendance history validation passed: {count} dates checked")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error validating attendance history: {e}")
+            return False
+    
+    def _validate_employee_directory(self):
+        """Check that the directory has a header and at least one employee"""
+        employee_file = self.work_dir / 'peoplehubdirectory20250708.csv'
+        try:
+            rows = count_csv_rows(employee_file)
+            if rows < 2:  # Header + at least one data row
+                logger.error("Employee directory file is empty or has no data")
+                return False
+            
+            self._file_stat(employee_file.name, rows=rows - 1)
+            logger.info(f"Employee directory validation passed: {rows - 1} employees")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error validating employee directory: {e}")
+            return False
+    
+    def notify_dashboard(self, started):
+        """
+        Publish the changed files on the dashboard's change bus and push them to the server.
         
-        success_count = 0
-        total_count = 3
+        Every worker picks the change up from the bus within a poll interval;
+        the push makes the receiving worker apply it immediately, and its
+        answer tells us when the new data became visible.
+        """
+        extra = {'delta': self.history_delta} if self.history_delta else {}
+        try:
+            version = ChangeBus(self.target_dir).publish(self.files_changed, self.dates_changed, origin='sync',
+                                                         snapshot=self.snapshot['path'], **extra)
+            logger.info(f"Published data version {version} for {', '.join(self.files_changed)}")
+        except Exception as e:
+            logger.error(f"Could not notify dashboard of changes: {e}")
+            return
         
-        # Sync attendance history
-        if self.sync_attendance_history():
-            success_count += 1
-            self.files_synced.append('attendance_history.json')
-        else:
-            self.errors.append('Failed to sync attendance history')
+        change = {
+            'version': version,
+            'files': sorted(set(self.files_changed)),
+            'dates': sorted(set(self.dates_changed)),
+            'snapshot': self.snapshot['path'],
+            'origin': 'sync',
+            'published_at': time.time(),
+            **extra
+        }
+        result = self.dashboard.push_reload(change)
+        if result and result.get('version', 0) >= version:
+            self.visible_ms = round((time.perf_counter() - started) * 1000, 2)
+            logger.info(f"Dashboard serving data version {version} {self.visible_ms:.0f} ms after sync start "
+                        f"(applied in {result.get('apply_ms')} ms)")
+    
+    def _sync_files(self):
+        """Sync each data file into the work directory and validate the result"""
+        # The files are independent, so sync them concurrently: wall time is the slowest file, not the sum
+        tasks = [
+            (self.sync_attendance_history, 'attendance_history.json', 'attendance_history.json',
+             'Failed to sync attendance history'),
+            (self.sync_rm_attendance, 'rm_attendance_history.json', 'rm_attendance_history.json',
+             'Failed to sync RM attendance'),
+            (self.sync_employee_directory, 'employee_directory.csv', 'peoplehubdirectory20250708.csv',
+             'Failed to sync employee directory')
+        ]
+        
+        def timed(task, target_name):
+            started = time.perf_counter()
+            try:
+                return task()
+            finally:
+                self._file_stat(target_name, duration_ms=round((time.perf_counter() - started) * 1000, 2))
         
-        # Sync RM attendance
-        if self.sync_rm_attendance():
-            success_count += 1
-            self.files_synced.append('rm_attendance_history.json')
-        else:
-            self.errors.append('Failed to sync RM attendance')
+        with ThreadPoolExecutor(max_workers=self.config.get('sync_workers', len(tasks))) as pool:
+            futures = [pool.submit(timed, task, target_name) for task, _, target_name, _ in tasks]
         
-        # Sync employee directory
-        if self.sync_employee_directory():
-            success_count += 1
-            self.files_synced.append('employee_directory.csv')
-        else:
-            self.errors.append('Failed to sync employee directory')
+        success_count = 0
+        for future, (_, name, target_name, error) in zip(futures, tasks):
+            if future.result():
+                success_count += 1
+                self.files_synced.append(name)
+                status = 'synced' if target_name in self.files_changed else 'unchanged'
+            else:
+                self.errors.append(error)
+                status = 'failed'
+            self._file_stat(target_name, status=status)
         
-        # Validate data integrity
+        # Validate data integrity before the new version goes live
         validation_success = True
         if not self.dry_run and success_count > 0:
-            if not self.validate_data_integrity():
-                logger.error("Data integrity validation failed")
+            validation_started = time.perf_counter()
+            valid = self.validate_data_integrity()
+            self.validation_ms = round((time.perf_counter() - validation_started) * 1000, 2)
+            if not valid:
+                logger.error("Data integrity validation failed, keeping the current data version")
                 self.errors.append('Data integrity validation failed')
                 validation_success = False
         
+        return success_count, validation_success
+    
+    def sync_all(self):
+        """Sync all data files into a new snapshot version"""
+        logger.info("Starting data synchronization...")
+        started = time.perf_counter()
+        
+        # Reset per-run state (the daemon reuses this instance)
+        self.files_synced = []
+        self.files_changed = []
+        self.metadata_changed = False
+        self.errors = []
+        self.dates_changed = []
+        self.history_delta = None
+        self.file_stats = {}
+        self.validation_ms = None
+        self.bytes_written = 0
+        self.snapshot = None
+        self.visible_ms = None
+        total_count = 3
+        
+        if self.dry_run:
+            self.work_dir = self.snapshots.current_dir()
+            success_count, validation_success = self._sync_files()
+        else:
+            # Build the new version next to the live one; the dashboard only sees it once complete
+            with self.snapshots.stage() as staged:
+                self.staged = staged
+                self.work_dir = staged.path
+                success_count, validation_success = self._sync_files()
+                if not (self.files_changed or self.metadata_changed) or not validation_success:
+                    staged.discard()
+            self.staged = None
+            self.work_dir = self.snapshots.current_dir()
+            if staged.version:
+                self.snapshot = self.snapshots.current()
+                logger.info(f"Committed data snapshot v{staged.version}")
+        
         # Record metrics
         overall_success = success_count == total_count and validation_success
+        
+        # Tell the running dashboard workers what changed so they reload just those files
+        # (this replaces restarting the container, which cost a full cold start)
+        if self.snapshot and self.files_changed:
+            self.notify_dashboard(started)
         if self.config.get('metrics_enabled', True):
             self.metrics_collector.record_sync(
                 overall_success, 
-                self.files_synced, 
-                self.errors if not overall_success else None
+                list(self.file_stats.values()), 
+                self.errors if not overall_success else None,
+                duration_ms=round((time.perf_counter() - started) * 1000, 2),
+                bytes_written=self.bytes_written,
+                validation_ms=self.validation_ms,
+                visible_ms=self.visible_ms,
+                snapshot_version=self.snapshot['version'] if self.snapshot else None
             )
         
         # Send notifications
@@ -489,10 +829,10 @@ class AttendanceDataSync:
             message = f"Sync failed. Errors: {'; '.join(self.errors)}"
             self.notification_manager.send_notification("Data Sync Failed", message, is_error=True)
         
-        # Docker container health check
-        if self.config.get('container_health_check', True):
-            if not self.docker_manager.check_container_health():
-                logger.warning("Container health check failed")
+        # Dashboard health check over HTTP
+        if self.config.get('container_health_check', True) and not self.dry_run:
+            if not self.dashboard.check_health():
+                logger.warning("Dashboard health check failed")
         
         logger.info(f"Synchronization completed: {success_count}/{total_count} successful")
         return overall_success
@@ -506,6 +846,7 @@ def main():
     parser.add_argument('--config', help='Configuration file path', default='sync_config.json')
     parser.add_argument('--dry-run', action='store_true', help='Show what would be done without making changes')
     parser.add_argument('--daemon', action='store_true', help='Run as daemon (continuous sync)')
+    parser.add_argument('--watch', action='store_true', help='Run as daemon that syncs as soon as source files change')
     parser.add_argument('--once', action='store_true', help='Run once and exit')
     
     args = parser.parse_args()
@@ -544,10 +885,11 @@ def main():
         config
     )
     
-    if args.daemon and not args.once:
+    watch = args.watch or config.get('watch_enabled', False)
+    if (args.daemon or args.watch) and not args.once:
         # Run as daemon
         logger.info(f"Starting daemon mode with {config['sync_interval_minutes']} minute intervals")
-        run_daemon(sync, config)
+        run_daemon(sync, config, watch=watch)
     else:
         # Run once
         success = sync.sync_all()
@@ -560,15 +902,27 @@ def main():
             sys.exit(1)
 
 
-def run_daemon(sync, config):
-    """Run the sync process as a daemon"""
+def run_daemon(sync, config, watch=False):
+    """
+    Run the sync process as a daemon.
+    
+    In watch mode syncs are triggered by source file changes; the regular
+    interval still runs as a safety net in case an event is missed.
+    """
     interval = config['sync_interval_minutes'] * 60  # Convert to seconds
     
-    logger.info(f"Daemon started, syncing every {config['sync_interval_minutes']} minutes")
+    watcher = None
+    if watch:
+        watcher = SourceWatcher(sync.source_dir, config)
+        watcher.start()
+        logger.info(f"Daemon started in watch mode, full sync at least every {config['sync_interval_minutes']} minutes")
+    else:
+        logger.info(f"Daemon started, syncing every {config['sync_interval_minutes']} minutes")
     
+    trigger = "scheduled"
     while True:
         try:
-            logger.info("Starting scheduled sync...")
+            logger.info(f"Starting {trigger} sync...")
             success = sync.sync_all()
             
             if success:
@@ -586,8 +940,12 @@ def run_daemon(sync, config):
                         is_error=True
                     )
             
-            logger.info(f"Waiting {config['sync_interval_minutes']} minutes until next sync...")
-            time.sleep(interval)
+            if watcher:
+                changed = watcher.wait_for_changes(interval)
+                trigger = f"change-triggered ({', '.join(sorted(changed))})" if changed else "scheduled"
+            else:
+                logger.info(f"Waiting {config['sync_interval_minutes']} minutes until next sync...")
+                time.sleep(interval)
             
         except KeyboardInterrupt:
             logger.info("Daemon stopped by user")
@@ -595,6 +953,10 @@ def run_daemon(sync, config):
         except Exception as e:
             logger.error(f"Daemon error: {e}")
             time.sleep(60)  # Wait 1 minute before retrying
+    
+    if watcher:
+        watcher.stop()
+    sync.dashboard.close()
 
 
 if __name__ == '__main__':